@@ -0,0 +1,63 @@
+"""
+Benchmark NPCs speaking and moving directly against going through the command handler.
+
+This isn't part of the test suite, since its timings depend on the machine. Run it with
+
+    evennia test --settings settings.py benchmarks.npc_actions
+
+"""
+
+import timeit
+from unittest.mock import patch
+
+from evennia.utils.create import create_object
+from evennia.utils.test_resources import EvenniaTest
+
+from typeclasses.npcs import WanderingNPC
+
+# calls per run, and runs per action, of which the fastest counts
+NUMBER = 200
+REPEAT = 5
+
+
+def best_time(action, number=NUMBER, repeat=REPEAT):
+    """ Best time of a few runs of `action`, in seconds per call. """
+    return min(timeit.repeat(action, number=number, repeat=repeat)) / number
+
+
+class BenchmarkNPCActions(EvenniaTest):
+    """ Time NPC actions against the commands they replace. """
+
+    def setUp(self):
+        super().setUp()
+        with patch("typeclasses.npcs.npc_scheduler"):
+            self.npc = create_object(WanderingNPC, key="wander", location=self.room1)
+        self.back = create_object(
+            "typeclasses.exits.Exit", key="back", location=self.room2, destination=self.room1
+        )
+
+    def test_npc_actions(self):
+        """ Print how long saying something and stepping through an exit take both ways. """
+        def step_commands():
+            self.npc.execute_cmd("out")
+            self.npc.execute_cmd("back")
+
+        def step_direct():
+            self.npc.step(self.exit)
+            self.npc.step(self.back)
+
+        timings = {
+            "say": (
+                best_time(lambda: self.npc.execute_cmd("say Hello!")),
+                best_time(lambda: self.npc.say("Hello!")),
+            ),
+            "step": (best_time(step_commands) / 2, best_time(step_direct) / 2),
+        }
+        print("\nNPC action      command     direct    speedup")
+        for action, (command, direct) in timings.items():
+            print(
+                f"{action:<12} {command * 1000:8.3f}ms {direct * 1000:8.3f}ms "
+                f"{command / direct:8.1f}x"
+            )
+        # both paths take the NPC back where it started
+        self.assertEqual(self.npc.location, self.room1)
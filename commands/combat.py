@@ -6,6 +6,7 @@ from random import choice
 
 from world.combat import CombatHandler
 from world.enums import CombatRange
+from world.messages import COMBAT_MESSAGES
 from .command import Command
 
 
@@ -16,6 +17,8 @@ class CombatCommand(Command):
 
     in_combat_only = True
     requires_target = True
+    # range to pick a default target in, None for any range
+    attack_range = None
 
     def __init__(self, **kwargs):
         self.target = None  # This line is to avoid the IDE complaints
@@ -29,8 +32,9 @@ class CombatCommand(Command):
     def get_target(self):
         """ Get default target if none specified. """
         if not self.args:
-            # TODO Use the last hit enemy OR
-            # TODO Find the closest enemy in combat.
+            # whoever the caller has been trading blows with, or else the closest enemy
+            if combat := self.caller.combat:
+                return combat.get_target(self.caller, self.attack_range)
             return None
 
         return self.caller.search(self.args)
@@ -52,6 +56,9 @@ class CombatCommand(Command):
         if self.caller.combat:
             self.caller.combat.update()
 
+        # send this command's combat messages now rather than on the next tick
+        COMBAT_MESSAGES.flush()
+
 
 class CmdInitiateCombat(CombatCommand):
     """Engage an opponent in combat."""
@@ -162,6 +169,8 @@ class CmdHit(CombatCommand):
     key = "hit"
     locks = "cmd:in_combat() and melee_equipped()"
 
+    attack_range = CombatRange.MELEE
+
     def func(self):
         caller = self.caller
         target = self.target
@@ -235,9 +244,7 @@ class CmdFlee(CombatCommand):
         # this is the actual fleeing bit
         caller.msg("You flee!")
         caller.combat.remove(caller)
-        target = choice(exits)
-        # using execute_cmd instead of duplicating all the checks in ExitCommand
-        caller.execute_cmd(target.key)
+        caller.step(choice(exits))
 
     def get_target(self):
         return None
@@ -26,6 +26,7 @@ from .game import (
     CmdWieldOrWear,
     CmdRemove,
     CmdTalk,
+    CmdTravel,
     CmdUse
 )
 from .look import CmdLook
@@ -57,6 +58,7 @@ class CharacterCmdSet(default_cmds.CharacterCmdSet):
         self.add(CmdWieldOrWear())
         self.add(CmdRemove())
         self.add(CmdTalk())
+        self.add(CmdTravel())
         self.add(CmdTrade())
         self.add(CmdUse())
 
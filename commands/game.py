@@ -7,14 +7,19 @@ be needed.
 
 """
 
+import math
+import time
+
 from evennia.commands.cmdhandler import InterruptCommand
 from evennia.utils import evform, evtable
+from evennia.utils.search import search_object
 from evennia.utils.utils import inherits_from
 
 from typeclasses.npcs import TalkativeNPC, ShoutNPC
 from typeclasses.objects import QuantumLatticeObject
 
 from world.enums import WieldLocation
+from world.travel import get_route_table, travel
 
 from .command import Command
 
@@ -55,7 +60,8 @@ class CmdCharSheet(Command):
         cur_status.add_row("|cSystem Load|n: ", self.caller.mana_level)
         cur_status.add_row("|cStamina|n: ", self.caller.stamina_level)
         status_effects = evtable.EvTable(border=None)
-        status_effects.add_row("No Status Effects")
+        for effect in self.get_status_effects() or ["No Status Effects"]:
+            status_effects.add_row(effect)
         charsheet.map(
             tables={
                 "2": base_info,
@@ -70,12 +76,30 @@ class CmdCharSheet(Command):
         )
         self.caller.msg(charsheet)
 
+    def get_status_effects(self):
+        """ Describe the caller's active buffs, one line each. """
+        now = time.time()
+        effects = []
+        for buff in self.caller.buffs.all():
+            effect = f"{buff.amount:+} {buff.stat}"
+            if buff.versus and (versus := search_object(f"#{buff.versus}")):
+                effect += f" vs {versus[0].get_display_name(self.caller)}"
+            if buff.expires:
+                effect += f" ({max(1, math.ceil(buff.expires - now))}s)"
+            effects.append(effect)
+
+        return effects
+
 class CmdCombine(Command):
     """
     Combine 3 quantum lattices into a lattice of the next tier
 
     Usage:
       combine <quantum_lattice>
+      combine all [<quantum_lattice>]
+
+    With 'all', combines all your quantum lattices as far up the tiers as they go, starting
+    from the given kind, or the lowest one.
 
     """
 
@@ -86,6 +110,10 @@ class CmdCombine(Command):
             self.caller.msg("You must specify something to combine.")
             return
 
+        if self.args.split(maxsplit=1)[0].lower() == "all":
+            self.caller.msg(QuantumLatticeObject.combine_all(self.caller, self.args[3:].strip()))
+            return
+
         ql = self.caller.search(
             self.args,
             quiet=True,
@@ -381,3 +409,49 @@ class CmdTalk(Command):
             )
             return
         target.at_talk(self.caller)
+
+class CmdTravel(Command):
+    """
+    Travel straight to a landmark, without stopping to look around on the way.
+
+    Usage:
+      travel
+      travel <landmark>
+
+    Without a landmark, lists the landmarks you can travel to from here.
+
+    """
+
+    key = "travel"
+
+    def func(self):
+        caller = self.caller
+        location = caller.location
+        xymap = getattr(location, "xymap", None)
+        if not xymap:
+            caller.msg("There are no landmarks to travel to from here.")
+            return
+
+        route_table = get_route_table(xymap)
+        if not self.args:
+            caller.msg("You can travel to: " + ", ".join(route_table.landmark_keys))
+            return
+
+        if not (landmark := route_table.find_landmark(self.args)):
+            caller.msg(f"There is no landmark called '{self.args.strip()}' around here.")
+            return
+
+        route = route_table.route(tuple(location.xyz[:2]), landmark)
+        if route is None:
+            caller.msg("You can't find a way there from here.")
+            return
+        if not route:
+            caller.msg("You are already there.")
+            return
+        if getattr(caller, "combat", None):
+            caller.msg("You can't travel in the middle of a fight!")
+            return
+
+        if not travel(caller, route):
+            caller.msg("Something blocks your way, so you stop to look around.")
+            caller.execute_cmd("look")
@@ -19,6 +19,8 @@ from evennia.contrib.grid.xyzgrid.launchcmd import xyzcommand
 from evennia.contrib.grid.xyzgrid.xyzgrid import get_xyzgrid
 from evennia.utils.create import create_script
 
+from world.xyzgrid_sync import spawn_changed
+
 def at_initial_setup():
     """ When server starts for the first time """
     maps_list = settings.XYZGRID_MAP_LIST
@@ -31,7 +33,8 @@ def at_initial_setup():
         print(msg)
 
     grid.log = _log
-    grid.spawn(xyz=("*", "*", "*"))
+    # stores the spawn hashes, so later reloads only spawn what changed
+    spawn_changed(grid, force=True)
 
     create_script(
         typeclass="typeclasses.scripts.GlobalRecoveryScript",
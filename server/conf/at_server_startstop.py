@@ -27,6 +27,24 @@ def at_server_start():
     This is called every time the server starts up, regardless of
     how it was shut down.
     """
+    # pylint: disable=import-outside-toplevel
+    from typeclasses.mobs.mob import EphemeralMob
+    from world.npc_scheduler import schedule_npcs
+    from world.occupancy import occupancy
+    from world.registry import vendors
+    from world.xyzgrid_sync import spawn_changed
+
+    # ephemeral mobs kept everything in memory, so whatever is left of them is useless now
+    for mob in EphemeralMob.objects.all_family():
+        mob.delete()
+
+    # bring the rooms and exits in line with any map edits since the last start
+    spawn_changed()
+
+    # these only live in memory; players are still puppeting after a reload
+    occupancy.rebuild()
+    vendors.rebuild()
+    schedule_npcs()
 
 def at_server_stop():
     """
@@ -50,6 +50,24 @@ GLOBAL_SCRIPTS = {
         "persistent": True,
         "desc": "Global Vendor Restock Script",
     },
+    "encounters": {
+        "typeclass": "world.encounters.script.EncounterScript",
+        "key": "Encounters",
+        "repeats": -1,
+        "interval": 43200,
+        "autostart": True,
+        "persistent": True,
+        "desc": "Global Encounter Repopulation Script",
+    },
+    "stock_sweeper": {
+        "typeclass": "typeclasses.scripts.StockSweeperScript",
+        "key": "StockSweeper",
+        "repeats": -1,
+        "interval": 60,
+        "autostart": True,
+        "persistent": True,
+        "desc": "Global Vendor Stock Sweeper Script",
+    },
 }
 
 
@@ -0,0 +1,54 @@
+"""
+Test the batching attribute handler.
+
+"""
+
+from evennia.utils.test_resources import EvenniaTest
+
+
+class TestBatchAttributeHandler(EvenniaTest):
+    """ Test BatchAttributeHandler. """
+
+    def saved(self, key, category=None):
+        """ Get the value of an Attribute straight from the database. """
+        attr = self.char1.db_attributes.filter(db_key=key, db_category=category).first()
+        return attr.value if attr else None
+
+    def test_batch(self):
+        """ Test that writes are held back until the end of the batch, but can be read. """
+        self.char1.strength = 3
+        with self.char1.attributes.batch():
+            self.char1.strength += 2
+            self.char1.attributes.add("mood", "grumpy", category="feelings")
+            self.assertEqual(self.char1.strength, 5)
+            self.assertEqual(self.char1.attributes.get("mood", category="feelings"), "grumpy")
+            self.assertTrue(self.char1.attributes.has("mood", category="feelings"))
+            self.assertEqual(self.saved("strength"), 3)
+            self.assertIsNone(self.saved("mood", "feelings"))
+
+        self.assertEqual(self.saved("strength"), 5)
+        self.assertEqual(self.saved("mood", "feelings"), "grumpy")
+        self.assertEqual(self.char1.strength, 5)
+
+    def test_nested(self):
+        """ Test that only the outermost batch saves. """
+        with self.char1.attributes.batch():
+            with self.char1.attributes.batch():
+                self.char1.will = 7
+            self.assertNotEqual(self.saved("will"), 7)
+        self.assertEqual(self.saved("will"), 7)
+
+    def test_remove(self):
+        """ Test that removing an Attribute drops its held back write. """
+        self.char1.attributes.add("mood", "happy")
+        with self.char1.attributes.batch():
+            self.char1.attributes.add("mood", "grumpy")
+            self.char1.attributes.remove("mood")
+            self.assertIsNone(self.char1.attributes.get("mood"))
+        self.assertIsNone(self.saved("mood"))
+
+    def test_level_up(self):
+        """ Test that levelling up saves everything it changed. """
+        self.char1.levels.at_level_up()
+        self.assertEqual(self.saved("level", "levels"), 2)
+        self.assertEqual(self.saved("hp_max"), self.char1.hp_max)
@@ -0,0 +1,113 @@
+"""
+Test buffs.
+
+"""
+
+from unittest.mock import patch
+
+from evennia.utils.test_resources import EvenniaTest
+
+from world import buffs
+from .mixins import AinneveTestMixin
+
+
+class TestTimingWheel(EvenniaTest):
+    """ Test TimingWheel. """
+
+    def setUp(self):
+        super().setUp()
+        self.now = 1000.0
+        self.wheel = buffs.TimingWheel(slots=4, levels=2, clock=lambda: self.now)
+        self.fired = []
+
+    def test_advance(self):
+        """ Test that entries fire once they are due, and not before. """
+        for delay in (0, 0.5, 3, 5, 14, 40):
+            self.wheel.schedule(self.now + delay, self.fired.append, delay)
+        self.assertEqual(len(self.wheel), 6)
+
+        self.now += 1
+        self.assertEqual(self.wheel.advance(), 2)
+        self.assertCountEqual(self.fired, [0, 0.5])
+
+        self.now += 1.5
+        self.wheel.advance()
+        self.assertCountEqual(self.fired, [0, 0.5])
+        self.now += 0.5
+        self.wheel.advance()
+        self.assertCountEqual(self.fired, [0, 0.5, 3])
+
+        # 14 seconds is past the inner wheel, 40 past the whole wheel
+        for now in range(1005, 1045):
+            self.now = now
+            self.wheel.advance()
+            self.assertCountEqual(
+                self.fired, [delay for delay in (0, 0.5, 3, 5, 14, 40) if delay <= now - 1000]
+            )
+        self.assertEqual(len(self.wheel), 0)
+
+    def test_advance_gap(self):
+        """ Test catching up on a lot of time at once. """
+        self.wheel.schedule(self.now + 100, self.fired.append, 100)
+        self.now += 1000
+        self.assertEqual(self.wheel.advance(), 1)
+        self.assertEqual(self.fired, [100])
+
+
+class TestBuffHandler(AinneveTestMixin, EvenniaTest):
+    """ Test BuffHandler. """
+
+    def setUp(self):
+        super().setUp()
+        self.now = 1000.0
+        wheel_patch = patch("world.buffs.BUFF_WHEEL", buffs.TimingWheel(clock=lambda: self.now))
+        wheel_patch.start()
+        self.addCleanup(wheel_patch.stop)
+
+    def test_add_buff(self):
+        """ Test that buffs add up, count only against their opponent and run out. """
+        self.char1.buffs.add_buff("attack", 2)
+        self.char1.buffs.add_buff("attack", 3, duration=5)
+        self.char1.buffs.add_buff("attack", -1, versus=self.char2, duration=1)
+        self.char1.buffs.add_buff("armor", 4, versus=self.char2)
+
+        self.assertEqual(self.char1.buffs.get("attack"), 5)
+        self.assertEqual(self.char1.buffs.get("attack", versus=self.char2), 4)
+        self.assertEqual(self.char1.buffs.get("armor"), 0)
+        self.assertEqual(self.char1.buffs.get("armor", versus=self.char2), 4)
+
+        self.now += 1
+        self.assertEqual(self.char1.buffs.get("attack", versus=self.char2), 5)
+        self.now += 4
+        self.assertEqual(self.char1.buffs.get("attack", versus=self.char2), 2)
+        self.assertEqual(len(self.char1.buffs.all()), 2)
+
+    def test_remove_buff(self):
+        """ Test removing buffs by id and by source. """
+        buff_id = self.char1.buffs.add_buff("attack", 2, duration=5)
+        self.char1.buffs.add_buff("armor", 1, source="helmet")
+        self.char1.buffs.add_buff("attack", 1, source="helmet")
+
+        self.char1.buffs.remove_buff(buff_id)
+        self.char1.buffs.remove_buff(buff_id)
+        self.assertEqual(self.char1.buffs.get("attack"), 1)
+
+        self.char1.buffs.remove_source("helmet")
+        self.assertFalse(self.char1.buffs)
+        self.assertIsNone(self.char1.attributes.get("buffs", category="buffs"))
+
+        # expiring a removed buff does nothing
+        self.now += 5
+        self.assertEqual(self.char1.buffs.get("attack"), 0)
+
+    def test_saved(self):
+        """ Test that buffs are reloaded, without the ones that ran out meanwhile. """
+        self.char1.buffs.add_buff("attack", 2)
+        self.char1.buffs.add_buff("armor", 1, duration=5)
+        self.char1.buffs.add_buff("attack", 1, duration=50)
+
+        self.now += 10
+        handler = buffs.BuffHandler(self.char1)
+        self.assertEqual(handler.get("attack"), 3)
+        self.assertEqual(handler.get("armor"), 0)
+        self.assertEqual(len(self.char1.attributes.get("buffs", category="buffs")), 2)
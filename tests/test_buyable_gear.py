@@ -0,0 +1,70 @@
+"""
+Test keeping the stock shop keepers have on offer for characters.
+
+"""
+
+import time
+
+from evennia.utils.create import create_object
+from evennia.utils.test_resources import EvenniaTest
+
+from world.buyable_gear import BuyableGear
+
+
+class TestBuyableGear(EvenniaTest):
+    """ Test BuyableGear. """
+
+    def setUp(self):
+        super().setUp()
+        self.vendors = [create_object("typeclasses.npcs.ShopKeeper", key=f"vendor {i}")
+                        for i in range(3)]
+        self.gear = BuyableGear(size=2, ttl=60)
+
+    def stock(self, vendor, amount=2):
+        """ Spawn stock in a vendor's inventory and offer it. """
+        items = [create_object("typeclasses.objects.Object", key="item", location=vendor)
+                 for _ in range(amount)]
+        self.gear[vendor] = items
+        return items
+
+    def test_evict(self):
+        """ Test that the least recently visited vendor's unbought stock is deleted. """
+        first = self.stock(self.vendors[0])
+        first[0].location = self.char1
+        second = self.stock(self.vendors[1])
+        self.assertIs(self.gear[self.vendors[0]], first)
+
+        self.stock(self.vendors[2])
+        self.assertEqual(list(self.gear), [self.vendors[0], self.vendors[2]])
+        self.assertTrue(all(not item.pk for item in second))
+        self.assertTrue(first[1].pk)
+
+        # bought stock is kept
+        self.gear.clear()
+        self.assertFalse(self.gear)
+        self.assertTrue(first[0].pk)
+        self.assertFalse(first[1].pk)
+
+    def test_expire(self):
+        """ Test that stock is only kept for so long. """
+        items = self.stock(self.vendors[0])
+        self.gear.prune(now=time.time() + 10)
+        self.assertIn(self.vendors[0], self.gear)
+
+        self.gear.prune(now=time.time() + 61)
+        self.assertNotIn(self.vendors[0], self.gear)
+        self.assertTrue(all(not item.pk for item in items))
+
+        items = self.stock(self.vendors[1])
+        self.gear.ttl = -1
+        self.assertEqual(self.gear.get(self.vendors[1], []), [])
+        self.assertTrue(all(not item.pk for item in items))
+
+    def test_character(self):
+        """ Test that characters let go of their stock when unpuppeted. """
+        items = self.stock(self.vendors[0])
+        self.char1.buyable_gear = self.gear
+        self.assertEqual(self.char1.buyable_gear, {self.vendors[0]: items})
+        self.char1.at_post_unpuppet()
+        self.assertFalse(self.char1.buyable_gear)
+        self.assertTrue(all(not item.pk for item in items))
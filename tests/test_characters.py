@@ -163,6 +163,25 @@ Body: |narmor|n
 Head: |nhelmet|n
 """)
 
+    def test_say(self):
+        """ Test saying something without the say command. """
+        with patch.object(self.char2, "msg") as mock_msg:
+            self.char1.say("Hello!")
+        self.assertIn("Hello!", str(mock_msg.call_args))
+
+    def test_step(self):
+        """ Test going through an exit without its exit command. """
+        self.assertTrue(self.char1.step(self.exit))
+        self.assertEqual(self.char1.location, self.room2)
+
+        self.exit.location = self.room2
+        self.exit.locks.add("traverse:false()")
+        self.exit.db.err_traverse = "You can't go there."
+        with patch.object(self.char1, "msg") as mock_msg:
+            self.assertFalse(self.char1.step(self.exit))
+        mock_msg.assert_called_once_with("You can't go there.")
+        self.assertEqual(self.char1.location, self.room2)
+
     def test_clear_buyable_gear(self):
         """ test that we can clear out the buyable_gear hash """
         shopkeeper = ShopKeeper.create(
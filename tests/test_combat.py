@@ -68,6 +68,33 @@ class TestCombatHandler(AinneveTestMixin, EvenniaTest):
         self.combat.positions[self.char2] = 5
         self.assertEqual(self.combat.get_range(self.char1, self.char2), CombatRange.MEDIUM_RANGE)
 
+    def test_get_target(self):
+        """ Test picking targets by threat, then by distance. """
+        rat = create_object(BaseMob, key="rat", location=self.room1, attributes=[("hp", 100)])
+        self.combat.add(rat)
+        self.combat.positions[rat] = 4
+
+        # the closest mob, not the closer player
+        self.assertEqual(self.combat.get_target(self.char1), rat)
+        self.assertIsNone(self.combat.get_target(self.char1, CombatRange.MELEE))
+        self.assertEqual(self.combat.get_target(rat), self.char2)
+        # nobody is in reach of the rat's bare hands
+        self.assertIsNone(rat.choose_target())
+
+        self.combat.deal_damage(self.char1, rat, 5)
+        self.assertEqual(rat.hp, 95)
+        self.assertEqual(self.combat.get_target(self.char1), rat)
+        self.assertEqual(self.combat.get_target(rat, CombatRange.LONG_RANGE), self.char1)
+
+        # healing the rat's target draws its attention too
+        self.char1.hp = 1
+        self.char1.hp_max = 100
+        self.char1.heal(50, healer=self.char2)
+        self.assertEqual(self.combat.get_target(rat, CombatRange.LONG_RANGE), self.char2)
+
+        self.combat.remove(self.char2)
+        self.assertEqual(self.combat.get_target(rat, CombatRange.LONG_RANGE), self.char1)
+
 
 class TestCombatCommands(AinneveTestMixin, EvenniaCommandTest):
     """ Test Combat Commands. """
@@ -120,6 +147,14 @@ class TestCombatCommands(AinneveTestMixin, EvenniaCommandTest):
         )
         self.char1.cooldowns.clear()
 
+        # without a target, hit whoever the caller is fighting
+        self.call(
+            combat.CmdHit(),
+            "",
+            "You hit rat with your bare hands",
+        )
+        self.char1.cooldowns.clear()
+
     def test_shoot(self):
         """ Test combat shoot command. """
         self.char1.strength = 100 # guarantee a hit
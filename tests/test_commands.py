@@ -128,6 +128,15 @@ ______________________________________________________________________________
         self.call(game.CmdCombine(), "dust shard")
         mock_combine.assert_called_with(self.char1)
 
+    @patch("typeclasses.objects.QuantumLatticeObject.combine_all", return_value="")
+    def test_combine_all(self, mock_combine_all):
+        """ Test the command for combining all quantum lattices. """
+
+        self.call(game.CmdCombine(), "all")
+        mock_combine_all.assert_called_with(self.char1, "")
+        self.call(game.CmdCombine(), "all dust shards")
+        mock_combine_all.assert_called_with(self.char1, "dust shards")
+
     def test_inventory(self):
         """ Test that the inventory command shows your inventory. """
 
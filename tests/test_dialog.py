@@ -1,9 +1,14 @@
 """ test generating insults """
 
+from unittest.mock import patch
+
 from evennia.utils.test_resources import EvenniaTest
+from twisted.internet import defer
 
 from world.common.dialog.ads import Advertisement
+from world.common.dialog.dialog_base import DialogBase
 from world.common.dialog.insults import Insult
+from world.common.dialog.pool import TARGET, LinePool, PlaceholderTarget, take_line
 
 class Testadvertisement(EvenniaTest):
     """ test generating advertisements """
@@ -18,3 +23,61 @@ class TestInsult(EvenniaTest):
     def test_generate_insult(self):
         """ test that we get a string """
         self.assertTrue(Insult(self.char1).generate_insult())
+
+class TestDialogBase(EvenniaTest):
+    """ test sharing grammars between dialogs """
+
+    def test_grammar_cache(self):
+        """ test that grammars are built once per variant, and bindings don't stick """
+        self.char2.gender = "female"
+        grammar = Insult(self.char1)._grammar()  # pylint: disable=protected-access
+        self.assertIs(Insult(self.char1)._grammar(), grammar)  # pylint: disable=protected-access
+        self.assertIsNot(Insult(self.char2)._grammar(), grammar)  # pylint: disable=protected-access
+
+        for _ in range(20):
+            self.assertIn(f" {self.char2} ", Insult(self.char2).generate_insult())
+        self.assertEqual(grammar.symbols["amount"].stack, [grammar.symbols["amount"].base_rules])
+        self.assertFalse(grammar.symbols["story"].uses)
+
+    def test_build_grammar(self):
+        """ test that dialogs need rules, and get the modifiers they ask for """
+        with self.assertRaises(TypeError):
+            DialogBase()  # pylint: disable=abstract-class-instantiated
+        grammar = Insult(self.char1)._grammar()  # pylint: disable=protected-access
+        self.assertIn("pronoun", grammar.modifiers)
+        self.assertIn("capitalize", grammar.modifiers)
+        ad_grammar = Advertisement(self.char1)._grammar()  # pylint: disable=protected-access
+        self.assertNotIn("pronoun", ad_grammar.modifiers)
+
+class TestLinePool(EvenniaTest):
+    """ test pools of pre-generated lines """
+
+    def test_take(self):
+        """ test that lines are taken from the pool, and refilled when it runs low """
+        pool = LinePool(Insult(PlaceholderTarget("male")), "generate_insult", size=4, low_water=2)
+        with patch("world.common.dialog.pool.deferToThread") as mock_defer:
+            mock_defer.return_value = defer.Deferred()
+            # nothing pooled yet, so the line is generated on the spot
+            line = pool.take(self.char1)
+            self.assertIn(f" {self.char1} ", line)
+            self.assertNotIn(TARGET, line)
+            mock_defer.assert_called_once_with(pool._generate, 4)  # pylint: disable=protected-access
+
+            # only one refill at a time
+            pool.take(self.char1)
+            self.assertEqual(mock_defer.call_count, 1)
+            mock_defer.return_value.callback([f"Hey {TARGET}!"] * 4)
+            self.assertFalse(pool.refilling)
+
+            self.assertEqual(pool.take(self.char2), f"Hey {self.char2}!")
+            self.assertEqual(len(pool.lines), 3)
+            self.assertEqual(mock_defer.call_count, 1)
+
+    def test_take_line(self):
+        """ test that there is a pool per dialog and grammar variant """
+        with patch("world.common.dialog.pool.deferToThread",
+                   side_effect=lambda func, *args: defer.succeed(func(*args))):
+            self.char2.gender = "female"
+            self.assertIn(str(self.char1), take_line(Insult, "generate_insult", self.char1))
+            self.assertTrue(take_line(Insult, "generate_insult", self.char2))
+            self.assertTrue(take_line(Advertisement, "generate_advertisement", self.char1))
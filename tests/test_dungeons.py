@@ -0,0 +1,146 @@
+"""
+Test procedural dungeons.
+
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from evennia.utils.create import create_object, create_script
+from evennia.utils.test_resources import EvenniaTest
+
+from world.dungeons import DIRECTIONS, create_dungeon, entrance_cell, generate_layout
+from world.encounters.script import EncounterScript
+from world.occupancy import occupancy
+
+
+class TestGenerateLayout(EvenniaTest):
+    """ Test generate_layout. """
+
+    def test_layout(self):
+        """ Test that layouts are repeatable, two-way and reach every cell. """
+        layout = generate_layout(1234, 8, 6)
+        self.assertEqual(layout, generate_layout.__wrapped__(1234, 8, 6))
+        self.assertEqual(len(layout), 48)
+
+        for (x, y), directions in layout.items():
+            for direction in directions:
+                dx, dy, opposite = DIRECTIONS[direction]
+                self.assertIn(opposite, layout[(x + dx, y + dy)])
+
+        seen = {entrance_cell(6)}
+        stack = list(seen)
+        while stack:
+            x, y = stack.pop()
+            for direction in layout[(x, y)]:
+                dx, dy, _ = DIRECTIONS[direction]
+                if (neighbor := (x + dx, y + dy)) not in seen:
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+        self.assertEqual(len(seen), 48)
+
+
+class TestDungeon(EvenniaTest):
+    """ Test DungeonScript and its rooms. """
+
+    def setUp(self):
+        super().setUp()
+        patcher = patch(
+            "world.encounters.script.get_xyzgrid",
+            return_value=SimpleNamespace(all_maps=lambda: []),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.encounters = create_script(EncounterScript, key="encounters", autostart=False)
+        for target in ("world.dungeons.GLOBAL_SCRIPTS", "typeclasses.characters.GLOBAL_SCRIPTS"):
+            patcher = patch(target, SimpleNamespace(encounters=self.encounters))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch("world.encounters.script.choose_encounter", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.dungeon = create_dungeon(self.room1, seed=42)
+        self.entrance = self.dungeon.room_at(entrance_cell(self.dungeon.height))
+
+    def test_create(self):
+        """ Test that a new dungeon is just its entrance, with encounters waiting. """
+        self.assertEqual(len(self.dungeon.rooms), 1)
+        self.assertFalse(self.entrance.exits)
+        self.assertEqual(len(self.encounters.grid.pending), 16)
+
+    def test_explore(self):
+        """ Test that rooms only get their exits once a player walks in. """
+        self.char1.move_to(self.entrance)
+        self.assertTrue(self.entrance.explored)
+        directions = self.dungeon.layout[entrance_cell(self.dungeon.height)]
+        self.assertEqual(
+            sorted(exit.key for exit in self.entrance.exits), sorted([*directions, "leave"])
+        )
+        self.assertEqual(len(self.dungeon.rooms), len(directions) + 1)
+
+        # the rooms next door exist, but haven't been explored yet
+        neighbor = self.entrance.exits[0].destination
+        self.assertFalse(neighbor.explored)
+        self.assertFalse(neighbor.exits)
+        self.char1.execute_cmd(self.entrance.exits[0].key)
+        self.assertEqual(self.char1.location, neighbor)
+        self.assertTrue(neighbor.exits)
+
+        # the rooms are found again after a reload
+        del self.dungeon.__dict__["rooms"]
+        self.assertIn(neighbor, self.dungeon.rooms.values())
+
+    def test_collapse(self):
+        """ Test that a dungeon collapses once no players are in it. """
+        self.char1.move_to(self.entrance)
+        rooms = list(self.dungeon.rooms.values())
+
+        occupancy.puppet(self.char1)
+        self.dungeon.at_repeat()
+        self.assertTrue(self.dungeon.pk)
+        occupancy.unpuppet(self.char1)
+        self.dungeon.at_repeat()
+
+        self.assertFalse(self.dungeon.pk)
+        self.assertTrue(all(not room.pk for room in rooms))
+        self.assertEqual(self.char1.location, self.room1)
+        self.assertFalse(self.encounters.grid.pending)
+
+    def test_collapse_linkdead(self):
+        """ Test that players who logged off in a collapsed dungeon log back in at the gate. """
+        self.char1.move_to(self.entrance)
+        with patch.object(self.char1.sessions, "count", return_value=0):
+            self.char1.at_post_unpuppet()
+        self.assertIsNone(self.char1.location)
+        self.assertEqual(self.dungeon.linkdead, [self.char1])
+
+        self.dungeon.at_repeat()
+        self.assertFalse(self.dungeon.pk)
+        self.assertEqual(self.char1.db.prelogout_location, self.room1)
+
+    def test_gate(self):
+        """ Test that going through the gate puts you in a fresh dungeon. """
+        gate = create_object("typeclasses.rooms.ForbiddenZoneGate", key="gate")
+        self.char1.move_to(gate)
+        self.char1.execute_cmd("forbidden zone")
+        self.assertTrue(self.char1.location.is_typeclass("typeclasses.rooms.DungeonRoom"))
+        self.assertEqual(self.char1.location.dungeon.origin, gate)
+        self.char1.execute_cmd("leave")
+        self.assertEqual(self.char1.location, gate)
+
+    def test_gate_group(self):
+        """ Test that players going through the gate together end up in the same dungeon. """
+        gate = create_object("typeclasses.rooms.ForbiddenZoneGate", key="gate")
+        self.char1.move_to(gate)
+        self.char2.move_to(gate)
+        self.char1.execute_cmd("forbidden zone")
+        self.char2.execute_cmd("forbidden zone")
+        dungeon = self.char1.location.dungeon
+        self.assertEqual(self.char2.location, self.char1.location)
+
+        # later on, the next one through gets a dungeon of their own
+        self.char2.move_to(gate)
+        with patch("world.dungeons.DUNGEON_JOIN_WINDOW", 0):
+            self.char2.execute_cmd("forbidden zone")
+        self.assertNotEqual(self.char2.location.dungeon, dungeon)
@@ -0,0 +1,99 @@
+"""
+Test encounters.
+
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from evennia.prototypes.prototypes import save_prototype
+from evennia.utils.create import create_script
+from evennia.utils.test_resources import EvenniaTest
+
+from world.encounters.data import ENCOUNTERS, EncounterEntry, EncounterType
+from world.encounters.script import EncounterGrid, EncounterScript
+
+
+class TestEncounterGrid(EvenniaTest):
+    """ Test EncounterGrid. """
+
+    def setUp(self):
+        super().setUp()
+        self.grid = EncounterGrid()
+        self.grid.add_zone("wastes", 25, 25, 10)
+
+    def test_cell(self):
+        """ Test finding the cell of a coordinate. """
+        self.assertEqual(self.grid.cell((12, 3, "wastes")), ("wastes", 1, 0))
+        self.assertEqual(self.grid.cell((24, 24, "wastes")), ("wastes", 2, 2))
+        self.assertIsNone(self.grid.cell((12, 3, "town")))
+
+    def test_empty_cells(self):
+        """ Test that cells with an encounter waiting aren't empty. """
+        self.assertEqual(len(list(self.grid.empty_cells())), 9)
+        self.grid.pending[("wastes", 1, 1)] = 1
+        self.assertNotIn(("wastes", 1, 1), self.grid.empty_cells())
+        self.assertEqual(len(list(self.grid.empty_cells())), 8)
+
+        self.grid.remove_zone("wastes")
+        self.assertFalse(self.grid.pending)
+        self.assertFalse(list(self.grid.empty_cells()))
+
+    def test_encounter_level(self):
+        """ Test that encounters are tougher near the edges. """
+        self.grid.add_zone("desert", 70, 70, 10)
+        self.assertEqual(self.grid.encounter_level(("desert", 0, 3)), 3)
+        self.assertEqual(self.grid.encounter_level(("desert", 3, 3)), 1)
+
+
+class TestEncounterScript(EvenniaTest):
+    """ Test EncounterScript. """
+
+    def setUp(self):
+        super().setUp()
+        xymap = SimpleNamespace(Z="wastes", max_x=29, max_y=29, options={"encounter_cell_size": 10})
+        patcher = patch(
+            "world.encounters.script.get_xyzgrid",
+            return_value=SimpleNamespace(all_maps=lambda: [xymap]),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.script = create_script(EncounterScript, key="encounters", autostart=False)
+        self.room1.xyz = (15, 15, "wastes")
+
+        save_prototype({
+            "prototype_key": "test_rat",
+            "typeclass": "typeclasses.mobs.mob.BaseMob",
+            "key": "rat",
+        })
+        self.encounter_type = EncounterType(
+            "test_rats", "a swarm of rats", 1, (EncounterEntry("test_rat", amount=(2, 2)),)
+        )
+        self.addCleanup(ENCOUNTERS.pop, "test_rats")
+
+    def test_repopulate(self):
+        """ Test that repopulating is capped, and fills up every cell eventually. """
+        self.assertEqual(self.script.repopulate(amount=5), 5)
+        self.assertEqual(self.script.repopulate(), 4)
+        self.assertEqual(self.script.repopulate(), 0)
+        self.assertEqual(len(self.script.grid.pending), 9)
+        self.assertEqual(
+            len(self.script.attributes.get(category="encounters", return_list=True)), 9
+        )
+
+    def test_check_encounter(self):
+        """ Test springing an encounter, which is then gone. """
+        self.script.repopulate()
+        with patch("world.encounters.script.choose_encounter", return_value=self.encounter_type):
+            mobs = self.script.check_encounter(self.room1)
+
+        # 2 rats, and one more for each of the two players in the room
+        self.assertEqual(len(mobs), 4)
+        self.assertTrue(all(mob.location == self.room1 for mob in mobs))
+        self.assertNotIn(("wastes", 1, 1), self.script.grid.pending)
+        self.assertEqual(len(self.script.grid.pending), 8)
+        self.assertEqual(self.script.check_encounter(self.room1), [])
+
+        # rooms outside of encounter zones never have any
+        self.room2.xyz = (15, 15, "town")
+        self.assertEqual(self.script.check_encounter(self.room2), [])
@@ -324,3 +324,35 @@ Head: |nhelmet|n
         self.assertEqual(self.char1.equipment.weapon, self.weapon)
         self.char1.equipment.move(self.big_weapon)
         self.assertEqual(self.char1.equipment.weapon, self.big_weapon)
+
+    def test_transaction(self):
+        """ Test that changes in a transaction are saved once, or not at all on errors. """
+        equipment = self.char1.equipment
+        with patch.object(self.char1.attributes, "add", wraps=self.char1.attributes.add) as add:
+            with equipment.transaction():
+                equipment.move(self.shield)
+                equipment.add(self.helmet)
+                equipment.add(self.weapon)
+            add.assert_called_once()
+        self.char1.attributes.reset_cache()
+        equipment._load()  # pylint: disable=protected-access
+        self.assertEqual(equipment.slots[WieldLocation.SHIELD_HAND], self.shield)
+        self.assertEqual(equipment.backpack, [self.helmet, self.weapon])
+
+        with self.assertRaises(EquipmentError):
+            with equipment.transaction():
+                equipment.remove(self.helmet)
+                raise EquipmentError("Oops")
+        self.assertEqual(equipment.backpack, [self.helmet, self.weapon])
+
+    def test_delete(self):
+        """ Test deleting many items at once. """
+        equipment = self.char1.equipment
+        equipment.move(self.shield)
+        equipment.add(self.helmet)
+        equipment.add(self.weapon)
+        equipment.delete([self.shield, self.helmet])
+        self.assertFalse(self.shield.pk)
+        self.assertFalse(self.helmet.pk)
+        self.assertEqual(equipment.slots[WieldLocation.SHIELD_HAND], NoneObject())
+        self.assertEqual(equipment.backpack, [self.weapon])
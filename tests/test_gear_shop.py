@@ -2,13 +2,18 @@
 test the gear shop
 """
 
+import time
+from types import SimpleNamespace
 from unittest.mock import patch, PropertyMock
 
+from evennia.objects.models import ObjectDB
 from evennia.prototypes.spawner import spawn
 from evennia.utils.create import create_object
 
 from typeclasses.npcs import ShopKeeper
-from world.npcs.gear_shop import ShoppingSession
+from world.buyable_gear import BUYABLE_GEAR_TTL
+from world.equipment import EquipmentError
+from world.npcs.gear_shop import ShoppingSession, node_sell_all
 from world.quantum_lattices import DustShard, StaticBloom, EchoStone
 
 from .mixins import AinneveTestMixin
@@ -40,7 +45,10 @@ class TestShoppingSession(AinneveTestMixin):
         self.assertEqual(self.shopping_session.buyable_gear, ["a", "b"])
         mock_item_spawner.side_effect = [9, 8, 7, 6, 5, 5, 4, 3, 2, 1]
         self.char1.buyable_gear = {"different shopkeeper": ["b", "a"]}
-        self.assertEqual(self.shopping_session.buyable_gear, [1, 2, 3, 4, 5, 5, 6, 7, 8, 9])
+        with patch("world.stock.StockIndex.add") as mock_stock:
+            self.assertEqual(self.shopping_session.buyable_gear, [1, 2, 3, 4, 5, 5, 6, 7, 8, 9])
+        # new stock is indexed to expire
+        self.assertEqual(mock_stock.call_count, 10)
 
     def test_display_vendor_price(self):
         """ test displaying vendor price in a user friendly manner """
@@ -109,3 +117,65 @@ class TestShoppingSession(AinneveTestMixin):
             self.char1.equipment.move(dust)
         self.shopping_session.buy_item(self.weapon)
         self.assertEqual(self.weapon.location, self.char1)
+        # the price was paid
+        self.assertTrue(all(not obj.pk for obj in scraps + dusts))
+        self.assertEqual(self.char1.equipment.backpack, [self.weapon])
+        self.assertEqual(self.char1.buyable_gear[self.shopkeeper], [])
+
+    def test_buy_item_expired(self):
+        """ test buying once the offer expired, with the shop menu open or not """
+        self.mock_vendor_price.return_value = {}
+        other = create_object("typeclasses.objects.Object", key="other", location=self.shopkeeper)
+        self.char1.buyable_gear = {self.shopkeeper: [self.weapon, other]}
+        self.char1.ndb._evmenu = SimpleNamespace(npc=self.shopkeeper)
+        later = time.time() + BUYABLE_GEAR_TTL + 1
+
+        # the open shop's offer doesn't expire from under its menu
+        with patch("world.buyable_gear.time.time", return_value=later):
+            self.shopping_session.buy_item(self.weapon)
+        self.assertEqual(self.weapon.location, self.char1)
+        self.assertEqual(self.char1.buyable_gear[self.shopkeeper], [other])
+        self.assertTrue(other.pk)
+
+        # outside of it, the offer is let go of without the purchase failing
+        self.char1.ndb._evmenu = None
+        self.weapon.location = self.shopkeeper
+        self.char1.equipment.remove(self.weapon)
+        with patch("world.buyable_gear.time.time", return_value=later):
+            self.shopping_session.buy_item(self.weapon)
+        self.assertEqual(self.weapon.location, self.char1)
+        self.assertFalse(self.char1.buyable_gear)
+
+    def test_buy_item_failed(self):
+        """ test that a purchase that fails halfway leaves the item on offer """
+        self.mock_vendor_price.return_value = {"scrap": {"count": 1, "ql": None}}
+        scrap = spawn("scrap")[0]
+        scrap.location = self.char1
+        self.char1.equipment.move(scrap)
+        scrap_id = scrap.id
+        with patch.object(self.char1.equipment, "add", side_effect=EquipmentError("full")):
+            with self.assertRaises(EquipmentError):
+                self.shopping_session.buy_item(self.weapon)
+        self.assertEqual(self.char1.buyable_gear[self.shopkeeper], [self.weapon])
+        # the price wasn't paid
+        self.assertTrue(ObjectDB.objects.filter(id=scrap_id).exists())
+
+    @patch("world.npcs.gear_shop.node_start")
+    def test_sell_all(self, mock_node_start):
+        """ test that selling everything swaps the gear for scrap in one go """
+        gear = [self.weapon, self.helmet]
+        for item in gear:
+            item.location = self.char1
+            self.char1.equipment.add(item)
+        scrap_value = sum(item.scrap_value for item in gear)
+        self.assertTrue(scrap_value)
+
+        node_sell_all(self.char1, "", shopping_session=self.shopping_session)
+        mock_node_start.assert_called_once()
+        self.assertTrue(self.shopping_session.made_sale)
+        self.assertTrue(all(not item.pk for item in gear))
+        self.char1.attributes.reset_cache()
+        self.char1.equipment._load()  # pylint: disable=protected-access
+        self.assertEqual([str(item) for item in self.char1.equipment.backpack],
+                         scrap_value * ["scrap"])
+        self.assertTrue(all(item.location == self.char1 for item in self.char1.equipment.backpack))
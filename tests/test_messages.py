@@ -0,0 +1,110 @@
+"""
+Test buffered room messages.
+
+"""
+
+from unittest.mock import Mock, call, patch
+
+from evennia.objects.objects import _MSG_CONTENTS_PARSER
+from evennia.utils.test_resources import EvenniaTest
+
+from world import messages
+
+
+class TestRender(EvenniaTest):
+    """ Test compiling and rendering templates. """
+
+    def test_compile_template(self):
+        """ Test that simple actor-stance templates are split, and anything else isn't. """
+        segments = messages.compile_template("$You() $conj(hit) {target}.")
+        self.assertEqual(len(segments), 4)
+        self.assertEqual(segments[2][1], ("hit",))
+        self.assertEqual(segments[3], " {target}.")
+
+        self.assertIsNone(messages.compile_template("$You() $conj(have) $eval(1 + 1) hands."))
+        self.assertIsNone(messages.compile_template("$You() $conj(say) '$toint(2)'."))
+        self.assertEqual(messages.compile_template("no markup"), ("no markup",))
+
+    def test_render(self):
+        """ Test that rendering matches msg_contents for everyone in the room. """
+        templates = (
+            "$You() $conj(hit) {target} with $pron(your) {weapon}.",
+            "$pron(your) attack fails to pierce {target}'s {armor}.",
+            "$You() swiftly $conj(dodge) a pathetic attack from $You(attacker).",
+            "$You() $conj(have) $eval(1 + 1) hands.",
+        )
+        mapping = {
+            "you": self.char1, "target": self.char2, "attacker": self.char2,
+            "weapon": self.obj1, "armor": 2,
+        }
+        for template in templates:
+            for receiver in (self.char1, self.char2, self.obj2):
+                expected = _MSG_CONTENTS_PARSER.parse(
+                    template, return_string=True, caller=self.char1, receiver=receiver,
+                    mapping=mapping,
+                ).format_map({
+                    key: obj.get_display_name(looker=receiver) if key != "armor" else str(obj)
+                    for key, obj in mapping.items()
+                })
+                self.assertEqual(messages.render(template, receiver, mapping), expected)
+
+
+class TestMessageBuffer(EvenniaTest):
+    """ Test MessageBuffer. """
+
+    def setUp(self):
+        super().setUp()
+        self.buffer = messages.MessageBuffer()
+        for obj in (self.char1, self.char2):
+            obj.msg = Mock()
+
+    @patch("world.messages.delay")
+    def test_flush(self, mock_delay):
+        """ Test that each recipient gets one message with all of their lines. """
+        self.buffer.msg_contents(self.room1, "$You() $conj(swing).", from_obj=self.char1)
+        self.buffer.msg_contents(
+            self.room1, "$You() $conj(dodge) {attacker}.", from_obj=self.char2,
+            mapping={"attacker": self.char1}, exclude=self.char1,
+        )
+        mock_delay.assert_called_once_with(0, self.buffer.flush, self.room1)
+        self.assertIn(self.room1, self.buffer)
+        self.char1.msg.assert_not_called()
+
+        self.buffer.flush(self.room1)
+        self.char1.msg.assert_called_once_with(text=("You swing.", {}), from_obj=self.char1)
+        self.assertEqual(self.char2.msg.mock_calls, [
+            call(text=("Char swings.", {}), from_obj=self.char1),
+            call(text=("You dodge Char.", {}), from_obj=self.char2),
+        ])
+        self.assertNotIn(self.room1, self.buffer)
+
+        # the delayed flush finds nothing left to send
+        self.buffer.flush(self.room1)
+        self.char1.msg.assert_called_once()
+
+    @patch("world.messages.delay")
+    def test_flush_options(self, _mock_delay):
+        """ Test that lines are joined per sender and tagged, and only reach who's still there. """
+        buffer = messages.MessageBuffer(msg_type="combat")
+        buffer.msg_contents(self.room1, "$You() $conj(swing).", from_obj=self.char1)
+        buffer.msg_contents(self.room1, "$You() $conj(miss).", from_obj=self.char1)
+        self.char2.location = self.room2
+        buffer.flush(self.room1)
+        self.char1.msg.assert_called_once_with(
+            text=("You swing.\nYou miss.", {"type": "combat"}), from_obj=self.char1
+        )
+        self.char2.msg.assert_not_called()
+
+    @patch("world.messages.delay")
+    def test_flush_on_room_message(self, _mock_delay):
+        """ Test that saying anything else in the room sends the buffered messages first. """
+        with patch("world.messages.COMBAT_MESSAGES", self.buffer), \
+             patch("typeclasses.rooms.COMBAT_MESSAGES", self.buffer):
+            self.buffer.msg_contents(self.room1, "$You() $conj(die).", from_obj=self.char2)
+            self.room1.msg_contents("Loot dropped.")
+
+        self.assertEqual(
+            [msg_call.kwargs["text"][0] for msg_call in self.char1.msg.mock_calls][:1],
+            ["Char2 dies."]
+        )
+        self.assertNotIn(self.room1, self.buffer)
@@ -0,0 +1,79 @@
+"""
+Test the mob pool.
+
+"""
+
+from evennia.prototypes.prototypes import save_prototype
+from evennia.utils.create import create_object
+from evennia.utils.test_resources import EvenniaTest
+
+from typeclasses.mobs.mob import BaseMob
+from world.mob_pool import MobPool, POOL_TAG_CATEGORY, mob_pool
+
+
+class TestMobPool(EvenniaTest):
+    """ Test MobPool. """
+
+    def setUp(self):
+        super().setUp()
+        save_prototype({
+            "prototype_key": "test_sword",
+            "typeclass": "typeclasses.objects.WeaponObject",
+            "key": "sword",
+        })
+        save_prototype({
+            "prototype_key": "test_mob",
+            "typeclass": "typeclasses.mobs.mob.BaseMob",
+            "key": "goblin",
+            "hp_max": "$randint(5, 7)",
+            "starting_equipment_prototypes": ["test_sword"],
+            "mob_scaling": {"strength": 1, "hp": 1},
+        })
+        self.pool = MobPool(max_pooled=1)
+
+    def test_recycle(self):
+        """ Test that a released mob comes back reset and rescaled, with its equipment. """
+        mob = self.pool.acquire("test_mob", level=6, location=self.room1)
+        self.assertEqual(mob.location, self.room1)
+        self.assertEqual(mob.strength, 2)
+        self.assertEqual(mob.hp, mob.hp_max)
+        sword = mob.equipment.all(only_objs=True)[0]
+        self.assertEqual(sword.key, "sword")
+
+        mob.hp = 0
+        mob.buffs.add_buff("armor", 5)
+        self.assertTrue(self.pool.release(mob))
+        self.assertIsNone(mob.location)
+        self.assertFalse(mob.buffs)
+        self.assertEqual(len(self.pool), 1)
+
+        recycled = self.pool.acquire("test_mob", level=1, location=self.room2)
+        self.assertEqual(recycled, mob)
+        self.assertEqual(len(self.pool), 0)
+        self.assertEqual(recycled.location, self.room2)
+        self.assertEqual(recycled.strength, 1)
+        self.assertEqual(recycled.levels.level, 1)
+        self.assertTrue(5 <= recycled.hp_max <= 7)
+        self.assertEqual(recycled.hp, recycled.hp_max)
+        self.assertEqual(recycled.equipment.all(only_objs=True), [sword])
+        self.assertFalse(recycled.tags.has("test_mob", category=POOL_TAG_CATEGORY))
+
+    def test_release(self):
+        """ Test which mobs can be pooled, and that the pool is rebuilt from tags. """
+        mob = create_object(BaseMob, key="rat", location=self.room1)
+        self.assertFalse(self.pool.release(mob))
+
+        first, second = (self.pool.acquire("test_mob") for _ in range(2))
+        self.assertTrue(self.pool.release(first))
+        self.assertFalse(self.pool.release(second))
+
+        self.assertEqual(MobPool().acquire("test_mob"), first)
+
+    def test_death(self):
+        """ Test that dead mobs go to the shared pool instead of being deleted. """
+        self.addCleanup(mob_pool.pools.clear)
+        mob = self.pool.acquire("test_mob", location=self.room1)
+        mob.at_death()
+        self.assertTrue(mob.pk)
+        self.assertIsNone(mob.location)
+        self.assertEqual(mob_pool.pools["test_mob"], [mob])
@@ -0,0 +1,81 @@
+"""
+Test mobs.
+
+"""
+
+from evennia.prototypes.prototypes import save_prototype
+from evennia.utils.test_resources import EvenniaTest
+
+from typeclasses.objects import ObjectSpec
+from world.combat import CombatHandler
+from world.enums import CombatRange
+from world.item_spawner import item_spawner
+from world.mob_pool import MobPool
+
+
+class TestEphemeralMob(EvenniaTest):
+    """ Test EphemeralMob. """
+
+    def setUp(self):
+        super().setUp()
+        save_prototype({
+            "prototype_key": "test_spear",
+            "typeclass": "typeclasses.objects.WeaponObject",
+            "key": "spear",
+            "damage_roll": "1d8",
+        })
+        save_prototype({
+            "prototype_key": "test_ephemeral_mob",
+            "typeclass": "typeclasses.mobs.mob.EphemeralMob",
+            "key": "goblin",
+            "cclass_key": "gym_bro",
+            "race_key": "goblin",
+            "hp_max": 10,
+            "starting_equipment_prototypes": ["test_spear"],
+            "mob_scaling": {"strength": 1, "hp": 1},
+        })
+        self.mob = MobPool().acquire("test_ephemeral_mob", level=6, location=self.room1)
+
+    def test_no_attributes_saved(self):
+        """ Test that the mob keeps its stats in memory. """
+        self.assertEqual(self.mob.hp, self.mob.hp_max)
+        self.assertEqual(self.mob.strength, 2)
+        self.assertEqual(self.mob.levels.level, 6)
+        self.assertEqual(self.mob.attributes.get("hp_max"), self.mob.hp_max)
+        self.assertFalse(self.mob.db_attributes.exists())
+
+    def test_equipment(self):
+        """ Test that equipment is held as specs with the prototype's and typeclass' values. """
+        weapon = self.mob.weapon
+        self.assertIsInstance(weapon, ObjectSpec)
+        self.assertEqual(str(weapon), "spear")
+        self.assertEqual(weapon.damage_roll, "1d8")
+        self.assertEqual(weapon.attack_range, CombatRange.MELEE)
+        self.assertFalse(weapon.can_parry())
+
+        # equipping again doesn't add another spear
+        self.mob.equip_starting_equipment()
+        self.assertEqual(self.mob.equipment.all(only_objs=True), [weapon])
+
+    def test_combat(self):
+        """ Test that the mob can fight and be fought. """
+        self.mob.strength = 100
+        self.char1.strength = 100
+        combat = CombatHandler(self.char1, self.mob)
+        combat.positions[self.mob] = CombatRange.MELEE
+        self.assertEqual(combat.get_target(self.mob, self.mob.weapon.attack_range), self.char1)
+
+        self.char1.hp_max = self.char1.hp = 1000
+        combat.at_melee_attack(self.mob, self.char1)
+        self.assertLess(self.char1.hp, 1000)
+
+        self.mob.hp_max = self.mob.hp = 1000
+        combat.at_melee_attack(self.char1, self.mob)
+        self.assertLess(self.mob.hp, 1000)
+        self.assertFalse(self.mob.db_attributes.exists())
+
+    def test_loot(self):
+        """ Test that loot can be rolled for the mob. """
+        item = item_spawner.spawn_item(1, caller=self.mob)
+        if item:
+            self.assertEqual(item.location, self.room1)
@@ -0,0 +1,85 @@
+"""
+Test the shared NPC scheduler.
+
+"""
+
+from unittest.mock import MagicMock, patch
+
+from evennia.utils.create import create_object
+from evennia.utils.test_resources import EvenniaTest
+from twisted.internet.task import Clock
+
+from typeclasses.npcs import WanderingNPC
+from world.npc_scheduler import NPCScheduler
+from world.occupancy import occupancy
+
+
+class TestNPCScheduler(EvenniaTest):
+    """ Test NPCScheduler. """
+
+    def setUp(self):
+        super().setUp()
+        self.clock = Clock()
+        self.scheduler = NPCScheduler(clock=self.clock)
+        with patch("typeclasses.npcs.npc_scheduler"):
+            self.npc = create_object(WanderingNPC, key="wanderer", location=self.room1)
+        self.npc.wander = MagicMock()
+        self.exit = create_object(
+            "typeclasses.exits.Exit", key="out", location=self.room1, destination=self.room2
+        )
+        self.addCleanup(occupancy.unpuppet, self.char1)
+
+    def test_buckets(self):
+        """ Test that NPCs acting about as often share a bucket. """
+        occupancy.puppet(self.char1)
+        self.assertEqual(self.scheduler.add(self.npc, "wander", 58), 60)
+        self.assertEqual(self.scheduler.add(self.npc, "wander", 61), 60)
+        self.assertEqual(len(self.scheduler.buckets), 1)
+        self.assertEqual(len(self.scheduler.buckets[60].members), 1)
+
+        self.clock.advance(60)
+        self.npc.wander.assert_called_once_with()
+
+        self.scheduler.remove(self.npc)
+        self.clock.advance(60)
+        self.npc.wander.assert_called_once_with()
+        self.assertFalse(self.scheduler.buckets)
+
+    @patch("world.npc_scheduler.logger.log_trace")
+    def test_error(self, mock_log_trace):
+        """ Test that an NPC failing to act doesn't stop the others in its bucket. """
+        occupancy.puppet(self.char1)
+        with patch("typeclasses.npcs.npc_scheduler"):
+            broken = create_object(WanderingNPC, key="broken", location=self.room1)
+        broken.wander = MagicMock(side_effect=TypeError)
+        self.scheduler.add(broken, "wander", 30)
+        self.scheduler.add(self.npc, "wander", 30)
+
+        self.clock.advance(30)
+        mock_log_trace.assert_called_once()
+        self.clock.advance(30)
+        self.assertEqual(broken.wander.call_count, 2)
+        self.assertEqual(self.npc.wander.call_count, 2)
+        self.assertTrue(self.scheduler.buckets[30].loop.running)
+
+    def test_sleep(self):
+        """ Test that unobserved NPCs sleep until a player comes near. """
+        self.scheduler.add(self.npc, "wander", 30)
+        self.clock.advance(30)
+        self.npc.wander.assert_not_called()
+        self.assertIn(self.room1.id, self.scheduler.asleep)
+
+        # someone arriving next door wakes the NPC up
+        self.scheduler.wake(self.room2)
+        self.assertFalse(self.scheduler.asleep)
+        occupancy.puppet(self.char1)
+        self.clock.advance(30)
+        self.npc.wander.assert_called_once_with()
+
+    def test_deleted(self):
+        """ Test that deleted NPCs are dropped. """
+        self.scheduler.add(self.npc, "wander", 30)
+        self.npc.delete()
+        self.clock.advance(30)
+        self.assertFalse(self.scheduler.buckets)
+        self.assertFalse(self.scheduler.where)
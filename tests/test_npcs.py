@@ -4,11 +4,13 @@ test NPC behavior
 
 from unittest.mock import patch
 
+from evennia.utils.ansi import strip_ansi
 from evennia.utils.create import create_object
 from evennia.utils.test_resources import EvenniaTest
 
 from typeclasses.npcs import InsultNPC, WanderingNPC
 from world.enums import CardinalDirections
+from world.occupancy import occupancy
 
 class TestWanderingNPC(EvenniaTest):
     """ test WanderingNPC behavior """
@@ -23,22 +25,21 @@ class TestWanderingNPC(EvenniaTest):
     def test_creation(self, mock_randrange):
         """ test that creating npc creates the timer """
         mock_randrange.side_effect = [66, 250]
-        with patch("typeclasses.npcs.repeat") as mock_repeat:
-            mock_repeat.return_value = True
+        with patch("typeclasses.npcs.npc_scheduler") as mock_scheduler:
             npc = create_object(
                 WanderingNPC,
                 key="wander"
             )
-            mock_repeat.assert_called_once_with(66, npc.wander)
+            mock_scheduler.add.assert_called_once_with(npc, "wander", 66)
         self.assertEqual(npc.wander_rate, 66)
         self.assertEqual(npc.wander_chance, 0.25)
 
     def test_deletion(self):
-        """ test that deleting npc disables their timer """
-        timer = self.wandering_npc.wander_timer
-        with patch("typeclasses.npcs.unrepeat") as mock_unrepeat:
-            self.wandering_npc.delete()
-            mock_unrepeat.assert_called_once_with(timer)
+        """ test that deleting npc takes them off the scheduler """
+        npc = self.wandering_npc
+        with patch("typeclasses.npcs.npc_scheduler") as mock_scheduler:
+            npc.delete()
+            mock_scheduler.remove.assert_called_once_with(npc)
 
     @patch("random.random")
     def test_wander(self, mock_random):
@@ -62,22 +63,21 @@ class TestShoutNPC(EvenniaTest):
     def test_creation(self, mock_randrange):
         """ test creating npc creates the timer """
         mock_randrange.side_effect = [66, 250]
-        with patch("typeclasses.npcs.repeat") as mock_repeat:
-            mock_repeat.return_value = True
+        with patch("typeclasses.npcs.npc_scheduler") as mock_scheduler:
             npc = create_object(
                 InsultNPC,
                 key="insult"
             )
-            mock_repeat.assert_called_once_with(66, npc.shout)
+            mock_scheduler.add.assert_called_once_with(npc, "shout", 66)
         self.assertEqual(npc.shout_rate, 66)
         self.assertEqual(npc.shout_chance, 0.25)
 
     def test_deletion(self):
-        """ test that deleting npc disables their timer """
-        timer = self.insult_npc.shout_timer
-        with patch("typeclasses.npcs.unrepeat") as mock_unrepeat:
-            self.insult_npc.delete()
-            mock_unrepeat.assert_called_once_with(timer)
+        """ test that deleting npc takes them off the scheduler """
+        npc = self.insult_npc
+        with patch("typeclasses.npcs.npc_scheduler") as mock_scheduler:
+            npc.delete()
+            mock_scheduler.remove.assert_called_once_with(npc)
 
     def test_at_talk(self):
         """ test shout NPC being talked to """
@@ -104,6 +104,45 @@ class TestShoutNPC(EvenniaTest):
         """ test shout """
         mock_random.return_value = 0.01
         mock_choice.return_value = self.char2
+        occupancy.puppet(self.char2)
+        self.addCleanup(occupancy.unpuppet, self.char2)
         with patch("typeclasses.npcs.InsultNPC._do_shout") as mock_do_shout:
             self.insult_npc.shout()
             mock_do_shout.assert_called_once_with(self.char2)
+        mock_choice.assert_called_once_with([self.char2])
+
+class TestNPCActions(EvenniaTest):
+    """ test NPCs speaking and moving without going through the command handler """
+
+    def setUp(self):
+        super().setUp()
+        with patch("typeclasses.npcs.npc_scheduler"):
+            self.npc = create_object(WanderingNPC, key="wander", location=self.room1)
+
+    def test_say(self):
+        """ test that what the NPC says reaches the room, worded for each listener """
+        with patch.object(self.char1, "msg") as mock_char_msg, \
+                patch.object(self.npc, "msg") as mock_npc_msg:
+            self.npc.say("Hello!")
+        self.assertEqual(
+            strip_ansi(mock_char_msg.call_args.kwargs["text"][0]), 'wander says, "Hello!"'
+        )
+        self.assertEqual(
+            strip_ansi(mock_npc_msg.call_args.kwargs["text"][0]), 'You say, "Hello!"'
+        )
+
+    def test_step(self):
+        """ test that the NPC goes through the exit, running its hooks and checking its locks """
+        with patch.object(self.exit, "at_post_traverse") as mock_post_traverse:
+            self.assertTrue(self.npc.step(self.exit))
+        self.assertEqual(self.npc.location, self.room2)
+        mock_post_traverse.assert_called_once_with(self.npc, self.room1)
+
+        back = create_object(
+            "typeclasses.exits.Exit", key="back", location=self.room2, destination=self.room1
+        )
+        back.locks.add("traverse:false()")
+        with patch.object(back, "at_failed_traverse") as mock_failed_traverse:
+            self.assertFalse(self.npc.step(back))
+        mock_failed_traverse.assert_called_once_with(self.npc)
+        self.assertEqual(self.npc.location, self.room2)
@@ -7,7 +7,8 @@ from unittest.mock import patch
 from evennia.prototypes.spawner import spawn
 from evennia.utils.ansi import strip_ansi
 
-from world.enums import WieldLocation
+from typeclasses.objects import QuantumLatticeObject
+from world.enums import QuantumLatticeType, WieldLocation
 from .mixins import AinneveTestMixin
 
 class TestObject(AinneveTestMixin):
@@ -90,6 +91,67 @@ class TestQuantumLatticeObject(AinneveTestMixin):
             ["dust shard", "static bloom"]
         )
 
+    def test_cascade(self):
+        """ test working out what is left after combining up the tiers. """
+
+        cascade = QuantumLatticeObject.cascade
+        self.assertEqual(
+            cascade({QuantumLatticeType.DUST_SHARD: 10, QuantumLatticeType.STATIC_BLOOM: 2}),
+            {
+                QuantumLatticeType.DUST_SHARD: 1,
+                QuantumLatticeType.STATIC_BLOOM: 2,
+                QuantumLatticeType.ECHO_STONE: 1,
+            } | {ql_type: 0 for ql_type in list(QuantumLatticeType)[3:]}
+        )
+        # everything ends up as nexus diamonds, which can't be combined any further
+        counts = cascade({QuantumLatticeType.DUST_SHARD: 3 ** 9})
+        self.assertEqual(counts[QuantumLatticeType.NEXUS_DIAMOND], 3)
+        self.assertEqual(sum(counts.values()), 3)
+        # lower tiers are left alone
+        self.assertEqual(
+            cascade(
+                {QuantumLatticeType.DUST_SHARD: 3, QuantumLatticeType.STATIC_BLOOM: 3},
+                QuantumLatticeType.STATIC_BLOOM
+            )[QuantumLatticeType.DUST_SHARD],
+            3
+        )
+
+    def test_combine_all(self):
+        """ test combining all quantum lattices at once. """
+
+        self.assertEqual(
+            QuantumLatticeObject.combine_all(self.char1),
+            "You don't have enough quantum lattices to combine."
+        )
+        self.assertEqual(
+            QuantumLatticeObject.combine_all(self.char1, "junk"),
+            "'junk' is not a kind of quantum lattice."
+        )
+        self.assertEqual(
+            QuantumLatticeObject.combine_all(self.char1, "nexus diamonds"),
+            "|[w|xnexus diamonds|n cannot be combined."
+        )
+
+        for ql in spawn(*["dust_shard"] * 10, *["static_bloom"] * 2):
+            ql.location = self.char1
+            self.char1.equipment.add(ql)
+
+        self.assertEqual(
+            QuantumLatticeObject.combine_all(self.char1, "static blooms"),
+            "You need 3 |cstatic blooms|n to combine."
+        )
+        with patch.object(
+            self.char1.attributes, "add", wraps=self.char1.attributes.add
+        ) as mock_add:
+            msg = QuantumLatticeObject.combine_all(self.char1)
+        mock_add.assert_called_once()
+        self.assertEqual(msg, "You combine 9 |xdust shards|n into 1 |Gecho stone|n.")
+        self.assertEqual(
+            sorted(item.name for item in self.char1.equipment.slots[WieldLocation.BACKPACK]),
+            ["dust shard", "echo stone", "static bloom", "static bloom"]
+        )
+        self.assertTrue(all(item.location == self.char1 for item in self.char1.equipment.backpack))
+
 class TestScrapObject(AinneveTestMixin):
     """ test scrap items used to repair gear """
     def setUp(self):
@@ -0,0 +1,51 @@
+"""
+Test keeping track of where the players are.
+
+"""
+
+from evennia.utils.test_resources import EvenniaTest
+
+from world.occupancy import Occupancy, occupancy
+
+
+class TestOccupancy(EvenniaTest):
+    """ Test Occupancy. """
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(occupancy.unpuppet, self.char1)
+
+    def test_puppet(self):
+        """ Test that only puppeted characters are tracked. """
+        tracker = Occupancy()
+        self.assertFalse(tracker.arrive(self.char2, self.room1))
+        tracker.puppet(self.char1)
+        self.assertEqual(tracker.online, {self.char1.id: self.char1})
+        self.assertEqual(tracker.players_in(self.room1), [self.char1])
+
+        tracker.unpuppet(self.char1)
+        self.assertFalse(tracker.online)
+        self.assertEqual(tracker.players_in(self.room1), [])
+        self.assertFalse(tracker.rooms)
+
+    def test_moving(self):
+        """ Test that rooms keep track of the players coming and going. """
+        occupancy.puppet(self.char1)
+        self.char1.move_to(self.room2, quiet=True)
+        self.assertEqual(occupancy.players_in(self.room1), [])
+        self.assertEqual(occupancy.players_in(self.room2), [self.char1])
+
+        # moved without the rooms knowing about it
+        self.char1.location = self.room1
+        self.assertEqual(occupancy.players_in(self.room2), [])
+        self.assertNotIn(self.room2.id, occupancy.rooms)
+
+    def test_hooks(self):
+        """ Test that characters are tracked from when they're puppeted until unpuppeted. """
+        self.char1.at_post_puppet()
+        self.assertIn(self.char1.id, occupancy.online)
+        self.assertEqual(occupancy.players_in(self.room1), [self.char1])
+
+        self.char1.at_post_unpuppet()
+        self.assertNotIn(self.char1.id, occupancy.online)
+        self.assertFalse(self.char1.location)
@@ -2,10 +2,27 @@
 Test rooms.
 """
 
+from unittest.mock import patch
+
+from evennia.contrib.grid.xyzgrid.xymap import XYMap
+from evennia.contrib.grid.xyzgrid.xyzgrid import get_xyzgrid
 from evennia.utils import create
 from evennia.utils.test_resources import EvenniaTest
 
 from typeclasses.rooms import Room, TownRoom
+from world.minimap import minimap_cache
+
+MAP = """
+
+ + 0 1 2
+
+ 1 #-#
+   | |
+ 0 #-#
+
+ + 0 1 2
+
+"""
 
 class TestRooms(EvenniaTest):
     """ Test Rooms. """
@@ -22,6 +39,38 @@ class TestRooms(EvenniaTest):
             "Desc with an empty line\n\nLine 2"
         )
 
+    def test_return_appearance(self):
+        """ Test that the desc is cached, and the contents kept up to date. """
+        self.room1.db.desc = "Dusty."
+        cache = self.room1.appearance_cache
+        self.assertIn("Dusty.", self.room1.return_appearance(self.char1))
+        self.assertEqual(cache.descs, {True: "Dusty."})
+        self.room1.db.desc = "Still dusty."
+        self.assertIn("Still dusty.", self.room1.return_appearance(self.char1))
+
+        # descs that depend on the looker aren't cached
+        with patch.object(Room, "get_display_desc", autospec=True, return_value="Mine.") as desc:
+            self.room1.return_appearance(self.char1)
+            self.room1.return_appearance(self.char1)
+            self.assertEqual(desc.call_count, 2)
+
+        # exits are filtered for every looker
+        self.exit.locks.add(f"view:id({self.char1.id})")
+        self.assertIn("out", self.room1.return_appearance(self.char1))
+        self.assertNotIn("out", self.room1.return_appearance(self.char2))
+
+        self.assertIn("Char2", self.room1.return_appearance(self.char1))
+        self.assertNotIn("Char1", self.room1.return_appearance(self.char1))
+        self.char2.move_to(self.room2, quiet=True)
+        self.assertNotIn("Char2", self.room1.return_appearance(self.char1))
+
+        appearance = self.room1.return_appearance(self.char1)
+        self.assertIn("Obj", appearance)
+        obj3 = create.create_object(key="Obj", location=self.room1)
+        self.assertIn("two Objs", self.room1.return_appearance(self.char1))
+        obj3.delete()
+        self.assertEqual(self.room1.return_appearance(self.char1), appearance)
+
 class TestTownRooms(EvenniaTest):
     """ Test TownRooms. """
     def test_get_display_desc(self):
@@ -42,3 +91,47 @@ class TestTownRooms(EvenniaTest):
             room.get_display_desc(None, show_desc=False),
             ""
         )
+
+
+class TestGridRooms(EvenniaTest):
+    """ Test GridRoom map displays. """
+
+    def setUp(self):
+        super().setUp()
+        self.grid = get_xyzgrid()
+        self.grid.add_maps({"map": MAP, "zcoord": "testmap"})
+        self.grid.reload()
+        self.town_room, _ = TownRoom.create("west", xyz=(0, 0, "testmap"))
+        self.other_room, _ = TownRoom.create("east", xyz=(1, 0, "testmap"))
+
+    def tearDown(self):
+        self.grid.delete()
+        super().tearDown()
+
+    def test_get_map_display(self):
+        """ Test that maps are only rendered once, until the cache is invalidated. """
+        with patch.object(XYMap, "get_visual_range", autospec=True, return_value="#-#") as render:
+            map_display = self.town_room.get_map_display(self.char1)
+            self.assertIn("#-#", map_display)
+            self.assertEqual(self.town_room.get_map_display(self.char1), map_display)
+            self.assertEqual(render.call_count, 1)
+
+            self.other_room.get_map_display(self.char1)
+            self.assertEqual(render.call_count, 2)
+
+            minimap_cache.invalidate("testmap")
+            self.town_room.get_map_display(self.char1)
+            self.assertEqual(render.call_count, 3)
+
+    def test_map_payload(self):
+        """ Test that looking sends the full map every time, even if it didn't change. """
+        self.char1.location = self.town_room
+        with patch.object(self.char1, "msg") as mock_msg:
+            self.char1.execute_cmd("look")
+            self.char1.execute_cmd("look")
+        maps = [
+            msg_call.kwargs["map"] for msg_call in mock_msg.mock_calls if "map" in msg_call.kwargs
+        ]
+        self.assertEqual(len(maps), 2)
+        self.assertIn("@", maps[0])
+        self.assertEqual(maps[0], maps[1])
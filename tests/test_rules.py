@@ -0,0 +1,70 @@
+"""
+Test the dice roll engine.
+"""
+
+from unittest.mock import patch
+
+from evennia.utils.test_resources import BaseEvenniaTest
+
+from world.rules import CompiledDice, DiceRollEngine
+
+
+class TestDiceRollEngine(BaseEvenniaTest):
+    """ Test DiceRollEngine. """
+
+    def setUp(self):
+        super().setUp()
+        self.dice = DiceRollEngine()
+
+    def test_compile(self):
+        """ Test that dice expressions are parsed once and cached. """
+        compiled = self.dice.compile("2D6+3")
+        self.assertIsInstance(compiled, CompiledDice)
+        self.assertEqual(
+            (compiled.number, compiled.diesize, compiled.modifier), (2, 6, 3)
+        )
+        self.assertIs(self.dice.compile("2D6+3"), compiled)
+        self.assertIs(self.dice.compile(compiled), compiled)
+        self.assertEqual(self.dice.compile("1d4 - 1").modifier, -1)
+
+    def test_compile_invalid(self):
+        """ Test that malformed dice expressions raise TypeError. """
+        for roll_string in ("20", "xd6", "1dx", "1d6+x", "11d6", "1d1001"):
+            with self.assertRaises(TypeError):
+                self.dice.compile(roll_string)
+
+    @patch("world.rules.randint")
+    def test_roll(self, mock_randint):
+        """ Test rolling, with and without modifiers. """
+        mock_randint.return_value = 4
+        self.assertEqual(self.dice.roll("1d20"), 4)
+        self.assertEqual(self.dice.roll("3d6"), 12)
+        self.assertEqual(self.dice.roll("2d6+3"), 11)
+        self.assertEqual(self.dice.roll("1d6-5"), -1)
+        mock_randint.assert_called_with(1, 6)
+
+    def test_roll_many(self):
+        """ Test bulk rolls return an array within the expression's bounds. """
+        rolls = self.dice.roll_many("2d6+3", 1000)
+        self.assertEqual(rolls.shape, (1000,))
+        self.assertGreaterEqual(rolls.min(), 5)
+        self.assertLessEqual(rolls.max(), 15)
+
+        compiled = self.dice.compile("2d6+3")
+        self.assertEqual((compiled.minimum, compiled.maximum), (5, 15))
+
+    @patch("world.rules.randint")
+    def test_roll_random_table(self, mock_randint):
+        """ Test rolling on range tables, including the edges. """
+        table = [("1-5", "blue"), ("6-9", "red"), ("10", "purple")]
+        mock_randint.return_value = 7
+        self.assertEqual(self.dice.roll_random_table("1d10", table), "red")
+        mock_randint.return_value = 10
+        self.assertEqual(self.dice.roll_random_table("1d10", table), "purple")
+        mock_randint.return_value = 20
+        self.assertEqual(self.dice.roll_random_table("1d20", table), "purple")
+        self.assertIs(self.dice.compile_table(table), self.dice.compile_table(table))
+
+        mock_randint.return_value = 3
+        self.assertEqual(self.dice.roll_random_table("1d6", ["a", "b", "c"]), "c")
+        self.assertIsNone(self.dice.roll_random_table("1d6", []))
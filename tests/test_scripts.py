@@ -7,6 +7,9 @@ from evennia.utils.create import create_script
 from evennia.utils.test_resources import EvenniaTest
 
 from typeclasses.npcs import ShopKeeper
+from world.occupancy import occupancy
+from world.registry import vendors
+from world.stock import SWEEP_BATCH
 
 class TestGlobalRecoveryScript(EvenniaTest):
     """ Test GlobalRecoveryScript """
@@ -57,11 +60,55 @@ class TestVendorRestockScript(EvenniaTest):
             mock_start.assert_called_once()
 
     def test_at_repeat(self):
-        """ Test that the script repeats. """
+        """ Test that the script repeats, for online characters. """
+        vendors.rebuild()
+        occupancy.puppet(self.char1)
+        self.addCleanup(occupancy.unpuppet, self.char1)
         self.char1.clear_buyable_gear = MagicMock()
+        self.char2.clear_buyable_gear = MagicMock()
         self.vrs.force_repeat()
         self.char1.clear_buyable_gear.assert_called_once_with([self.shopkeeper])
+        self.char2.clear_buyable_gear.assert_not_called()
 
-        self.shopkeeper.clean_old_inventory = MagicMock()
-        self.vrs.force_repeat()
-        self.shopkeeper.clean_old_inventory.assert_called_once()
+class TestStockSweeperScript(EvenniaTest):
+    """ Test StockSweeperScript """
+    def setUp(self):
+        super().setUp()
+        vendors.rebuild()
+        self.shopkeepers = [
+            ShopKeeper.create(key=f"shopkeeper {i}", menudata="world.npcs.your_mom")[0]
+            for i in range(2)
+        ]
+        self.sss = create_script(
+            typeclass="typeclasses.scripts.StockSweeperScript",
+            key="sss",
+            obj=None,
+            interval=60,
+            persistent=True,
+            autostart=True
+        )
+
+    def test_at_repeat(self):
+        """ Test that each repeat deletes at most a batch of old gear. """
+        for shopkeeper in self.shopkeepers:
+            shopkeeper.clean_old_inventory = MagicMock(return_value=SWEEP_BATCH)
+        self.sss.force_repeat()
+        self.shopkeepers[0].clean_old_inventory.assert_called_once_with(SWEEP_BATCH)
+        self.shopkeepers[1].clean_old_inventory.assert_not_called()
+
+        self.shopkeepers[0].clean_old_inventory.return_value = 3
+        self.sss.force_repeat()
+        self.shopkeepers[1].clean_old_inventory.assert_called_once_with(SWEEP_BATCH - 3)
+
+class TestVendors(EvenniaTest):
+    """ Test the vendor registry """
+
+    def test_vendors(self):
+        """ Test that shopkeepers are registered while they exist. """
+        vendors.rebuild()
+        shopkeeper = ShopKeeper.create(key="shopkeeper", menudata="world.npcs.your_mom")[0]
+        self.assertIn(shopkeeper, list(vendors))
+        vendors.rebuild()
+        self.assertEqual(list(vendors), [shopkeeper])
+        shopkeeper.delete()
+        self.assertFalse(vendors)
@@ -0,0 +1,195 @@
+"""
+Test the offline balance simulators.
+"""
+
+import numpy as np
+from evennia.utils.test_resources import BaseEvenniaTest
+
+from world import combat as combat_rules
+from world.enums import Ability, CombatRange
+from world.simulation import combat, loot
+from world.simulation.prototypes import PrototypeLibrary, get_library
+
+
+class TestPrototypeLibrary(BaseEvenniaTest):
+    """ Test PrototypeLibrary. """
+
+    def test_get(self):
+        """ Test that parents are merged and keys are matched like the spawner does. """
+        library = get_library()
+        bike_lock = library.get("bike_lock")
+        self.assertEqual(bike_lock["prototype_key"], "weapon_bike_lock")
+        self.assertEqual(bike_lock["attack_range"], CombatRange.MELEE)
+        self.assertEqual(bike_lock["damage_roll"], "1d6")
+        self.assertNotIn("prototype_parent", bike_lock)
+        self.assertIsNone(library.get("no_such_prototype"))
+        # "weapon" matches many prototypes, so it matches none
+        self.assertIsNone(library.get("weapon"))
+
+    def test_modules(self):
+        """ Test loading only some modules. """
+        library = PrototypeLibrary(["world.common.mob_prototypes", "world.no_such_module"])
+        self.assertEqual(library.get("goblin_weak")["prototype_key"], "mob_goblin_weak")
+        self.assertIsNone(library.get("bike_lock"))
+
+
+class TestCombatSimulation(BaseEvenniaTest):
+    """ Test the combat simulator. """
+
+    def test_apply_aggro(self):
+        """ Test the shared aggro scaling. """
+        self.assertEqual(combat_rules.apply_aggro(5, "defensive"), 2)
+        self.assertEqual(combat_rules.apply_aggro(5, "aggressive"), 7)
+        self.assertEqual(combat_rules.apply_aggro(5, "n"), 5)
+
+    def test_build_character(self):
+        """ Test building a levelled character in its starting gear. """
+        fighter = combat.build_character("antifa_rioter", level=5)
+        self.assertEqual(fighter.hp_max, 60)
+        self.assertEqual(fighter.stamina_max, 70)
+        self.assertEqual((fighter.strength, fighter.cunning, fighter.will), (4, 3, 1))
+        self.assertEqual(fighter.weapon.key, "bike lock")
+        # chest plate, garbage lid and hockey mask
+        self.assertEqual(fighter.armor, 3)
+        self.assertTrue(fighter.can_defend)
+
+    def test_build_mob(self):
+        """ Test building a mob scaled to a level. """
+        fighter = combat.build_mob("mob_goblin_common", level=10)
+        # its dagger prototype doesn't exist, so it fights bare handed
+        self.assertEqual(fighter.weapon, combat.WeaponStats())
+        self.assertEqual(fighter.cunning, 1 + int(int(10 / 6) * 0.5))
+        hp = fighter.sample_hp(1000)
+        self.assertTrue(np.all((hp >= 2 + int(2 * 10 * 0.5)) & (hp <= 5 + int(5 * 10 * 0.5))))
+
+        with self.assertRaises(KeyError):
+            combat.build_mob("no_such_mob")
+
+    def test_simulate_duels(self):
+        """ Test that duels are resolved and reported. """
+        first = combat.Fighter(
+            "first", hp_max=20, stamina_max=50, strength=30,
+            weapon=combat.WeaponStats(damage_roll="1d1"),
+        )
+        # can never afford an attack
+        second = combat.Fighter("second", hp_max=10, stamina_max=1)
+
+        results = combat.simulate_duels(first, second, duels=1000, seed=1)
+        self.assertEqual(results.duels, 1000)
+        self.assertEqual(results.win_rate(0), 1.0)
+        self.assertEqual(results.win_rate(1), 0.0)
+        # every attack hits for 1 + 30 - 1 armor, so the first blow kills
+        np.testing.assert_array_equal(results.time_to_kill(0), np.zeros(1000))
+        self.assertEqual(results.percentiles(), dict.fromkeys((5, 25, 50, 75, 95), 0.0))
+
+        # the same seed gives the same duels
+        rerun = combat.simulate_duels(first, second, duels=1000, seed=1)
+        np.testing.assert_array_equal(results.seconds, rerun.seconds)
+
+    def test_simulate_duels_blocked(self):
+        """ Test that a shield blocks every attack while the defender has stamina. """
+        attacker = combat.Fighter(
+            "attacker", hp_max=10, stamina_max=10, strength=30, weapon=combat.WeaponStats(),
+        )
+        defender = combat.Fighter("defender", hp_max=10, stamina_max=9, has_shield=True)
+
+        results = combat.simulate_duels(attacker, defender, duels=100, max_seconds=5, seed=1)
+        self.assertEqual(results.timeout_rate, 1.0)
+        self.assertEqual(results.percentiles(), {})
+
+        results = combat.simulate_duels(attacker, defender, duels=100, max_seconds=30, seed=1)
+        self.assertEqual(results.win_rate(0), 1.0)
+
+    def test_ranged_attack(self):
+        """ Test that ranged weapons roll against the ranged defense and add strength. """
+        attacker = combat.Fighter(
+            "attacker", stamina_max=10, strength=2, will=combat_rules.RANGED_DEFENSE_BASE - 1,
+            weapon=combat.WeaponStats(
+                attack_range=CombatRange.LONG_RANGE, attack_type=Ability.WIL, damage_roll="1d1"
+            ),
+        )
+        target = combat.Fighter("target", hp_max=2, armor=50)
+
+        # the huge armor doesn't matter for hitting, but soaks all the damage
+        results = combat.simulate_duels(attacker, target, duels=100, max_seconds=20, seed=1)
+        self.assertEqual(results.timeout_rate, 1.0)
+
+        target = combat.Fighter("target", hp_max=2, armor=1)
+        results = combat.simulate_duels(attacker, target, duels=100, seed=1)
+        self.assertEqual(results.win_rate(0), 1.0)
+        np.testing.assert_array_equal(results.time_to_kill(0), np.zeros(100))
+
+    def test_sweep(self):
+        """ Test sweeping classes against mobs and reporting it. """
+        results = combat.sweep(
+            class_keys=["antifa_rioter", "hacker"],
+            mob_keys=["mob_goblin_weak"],
+            levels=(1, 3),
+            duels=100,
+            seed=1,
+        )
+        self.assertEqual(len(results), 4)
+        report = combat.format_report(results)
+        self.assertIn("Antifa Rioter 3", report)
+        self.assertIn("small goblin 1", report)
+
+
+class TestLootSimulation(BaseEvenniaTest):
+    """ Test the loot simulator. """
+
+    def setUp(self):
+        super().setUp()
+        self.model = loot.LootModel()
+        self.rng = np.random.default_rng(1)
+
+    def test_walk(self):
+        """ Test walking nested tables and weighting the caller's class. """
+        model = loot.LootModel(drop_tables={
+            "generic": [("thing", 1), ("cclass", 1)],
+            "cclass": [("hacker", 1)],
+        })
+        leaves = model.walk("generic", 10000, self.rng, cclass="gooner")
+        self.assertEqual(set(leaves), {"thing", "hacker", "gooner"})
+        self.assertAlmostEqual(np.mean(leaves == "thing"), 0.5, delta=0.02)
+        self.assertAlmostEqual(np.mean(leaves == "gooner"), 0.5 * 5 / 6, delta=0.02)
+
+    def test_roll_affixes(self):
+        """ Test affix counts per tier and that exclusive affixes never roll together. """
+        tiers = np.array([1, 2, 4] * 1000)
+        rolled = self.model.roll_affixes("typeclasses.objects.Helmet", tiers, self.rng)
+        counts = rolled.sum(axis=1)
+        self.assertTrue(np.all(counts[tiers == 1] == 0))
+        self.assertTrue(np.all((counts[tiers == 2] >= 1) & (counts[tiers == 2] <= 2)))
+
+        development = [
+            self.model.affix_keys.index(key)
+            for key in (
+                "suffix_assembler_development",
+                "suffix_python_development",
+                "suffix_ruby_development",
+            )
+        ]
+        self.assertTrue(np.all(rolled[:, development].sum(axis=1) <= 1))
+        # helmets can't take weapon-only affixes
+        self.assertFalse(rolled[:, self.model.affix_keys.index("prefix_acidic")].any())
+
+    def test_simulate(self):
+        """ Test that every drop is accounted for. """
+        report = self.model.simulate(1, 20000, cclass="antifa_rioter", seed=1)
+        self.assertEqual(report.nothing + sum(report.drops.values()), 20000)
+        self.assertGreater(report.nothing_rate, 0)
+        self.assertIn("dust_shard", report.quantum_lattices)
+        self.assertEqual(report.quantum_lattices["dust_shard"], report.drops["dust_shard"])
+        self.assertEqual(sum(report.tiers.values()), sum(report.affix_counts.values()))
+        self.assertEqual(
+            report.quantum_lattices_per_hour(100)["dust_shard"],
+            report.quantum_lattices["dust_shard"] / 20000 * 100,
+        )
+        self.assertGreater(report.dust_shard_value_per_hour(100), 0)
+
+    def test_sweep(self):
+        """ Test sweeping levels and classes and reporting it. """
+        reports = loot.sweep(levels=(1, 10), cclasses=["hacker"], samples=1000, seed=1)
+        self.assertEqual([(report.level, report.cclass) for report in reports],
+                         [(1, "hacker"), (10, "hacker")])
+        self.assertIn("hacker", loot.format_report(reports))
@@ -0,0 +1,54 @@
+"""
+Test the expiry of vendor stock.
+
+"""
+
+import time
+
+from evennia.utils.create import create_object
+from evennia.utils.test_resources import EvenniaTest
+
+from typeclasses.npcs import ShopKeeper
+from world.stock import STOCK_TTL
+
+
+class TestStockIndex(EvenniaTest):
+    """ Test StockIndex. """
+
+    def setUp(self):
+        super().setUp()
+        self.shopkeeper = ShopKeeper.create(key="shopkeeper", menudata="world.npcs.your_mom")[0]
+        self.now = time.time()
+        self.old = [self.stock(f"old {i}", self.now - STOCK_TTL - 10) for i in range(3)]
+        self.new = self.stock("new", self.now)
+
+    def stock(self, key, created_at):
+        """ Give the shopkeeper an item created at `created_at`. """
+        item = create_object("typeclasses.objects.Object", key=key)
+        item.created_at = created_at
+        item.move_to(self.shopkeeper, quiet=True)
+        return item
+
+    def test_sweep(self):
+        """ Test that only expired items are deleted, a batch at a time. """
+        self.assertEqual(len(self.shopkeeper.stock), 4)
+        self.assertEqual(self.shopkeeper.clean_old_inventory(2), 2)
+        self.assertEqual(self.shopkeeper.clean_old_inventory(2), 1)
+        self.assertEqual(self.shopkeeper.clean_old_inventory(2), 0)
+        self.assertTrue(all(not item.pk for item in self.old))
+        self.assertEqual(self.shopkeeper.contents, [self.new])
+
+        self.assertEqual(self.shopkeeper.stock.sweep(now=self.now + STOCK_TTL + 1), 1)
+        self.assertFalse(self.new.pk)
+
+    def test_sold(self):
+        """ Test that items that left the shopkeeper are left alone. """
+        self.old[0].move_to(self.char1, quiet=True)
+        self.assertEqual(self.shopkeeper.clean_old_inventory(), 2)
+        self.assertTrue(self.old[0].pk)
+
+    def test_reload(self):
+        """ Test that the index is built from the inventory after a reload. """
+        del self.shopkeeper.__dict__["stock"]
+        self.assertEqual(len(self.shopkeeper.stock), 4)
+        self.assertEqual(self.shopkeeper.clean_old_inventory(), 3)
@@ -0,0 +1,90 @@
+"""
+Test threat tables.
+
+"""
+
+import random
+
+from evennia.utils.test_resources import BaseEvenniaTest
+
+from world.threat import IndexedMaxHeap, ThreatTable
+
+
+class TestIndexedMaxHeap(BaseEvenniaTest):
+    """ Test IndexedMaxHeap. """
+
+    def test_heap(self):
+        """ Test that the heap stays ordered through updates and removals. """
+        rng = random.Random(1)
+        heap = IndexedMaxHeap()
+        priorities = {}
+        for _ in range(500):
+            key = rng.randrange(50)
+            if rng.random() < 0.2:
+                heap.remove(key)
+                priorities.pop(key, None)
+            else:
+                priorities[key] = rng.random()
+                heap.set(key, priorities[key])
+
+            self.assertEqual(len(heap), len(priorities))
+            if priorities:
+                self.assertEqual(heap.peek(), max(priorities, key=priorities.get))
+            self.assertTrue(all(heap.index[key] == i for i, key in enumerate(heap.keys)))
+
+        self.assertEqual(list(heap.ordered()), sorted(priorities, key=priorities.get, reverse=True))
+
+    def test_empty(self):
+        """ Test an empty heap. """
+        heap = IndexedMaxHeap()
+        self.assertIsNone(heap.peek())
+        self.assertEqual(list(heap.ordered()), [])
+        heap.remove("nothing")
+
+
+class TestThreatTable(BaseEvenniaTest):
+    """ Test ThreatTable. """
+
+    def setUp(self):
+        super().setUp()
+        self.now = 0
+        self.threat = ThreatTable(half_life=10, clock=lambda: self.now)
+
+    def test_decay(self):
+        """ Test that threat halves every half life, and newer threat weighs more. """
+        self.threat.add("mob", "tank", 100)
+        self.now = 10
+        self.assertAlmostEqual(self.threat.get("mob", "tank"), 50)
+
+        self.threat.add("mob", "rogue", 60)
+        self.assertEqual(self.threat.top("mob"), "rogue")
+        self.assertEqual(self.threat.top("mob", lambda target: target != "rogue"), "tank")
+        self.assertIsNone(self.threat.top("mob", lambda target: False))
+        self.assertIsNone(self.threat.top("rogue"))
+
+        # long fights rebase the stored values without changing them
+        self.now = 10_000
+        self.threat.add("mob", "tank", 1)
+        self.assertAlmostEqual(self.threat.get("mob", "tank"), 1)
+        self.assertLess(self.threat.get("mob", "rogue"), 1e-100)
+
+    def test_healing(self):
+        """ Test that healing draws threat from everyone fighting the healed. """
+        self.threat.add("mob", "tank", 10)
+        self.threat.add("other mob", "tank", 10)
+        self.threat.add_healing("healer", "tank", 100)
+        self.assertEqual(self.threat.top("mob"), "healer")
+        self.assertEqual(self.threat.get("other mob", "healer"), 50)
+
+    def test_remove_merge(self):
+        """ Test removing fighters and merging tables. """
+        self.threat.add("mob", "tank", 10)
+        self.threat.add("tank", "mob", 10)
+        self.threat.remove("tank")
+        self.assertIsNone(self.threat.top("mob"))
+        self.assertIsNone(self.threat.top("tank"))
+
+        other = ThreatTable(half_life=10, clock=lambda: self.now)
+        other.add("mob", "rogue", 5)
+        self.threat.merge(other)
+        self.assertEqual(self.threat.get("mob", "rogue"), 5)
@@ -0,0 +1,91 @@
+"""
+Test travelling to landmarks.
+
+"""
+
+from unittest.mock import patch
+
+from evennia.contrib.grid.xyzgrid import xymap_legend
+from evennia.contrib.grid.xyzgrid.xymap import XYMap
+from evennia.contrib.grid.xyzgrid.xyzgrid import get_xyzgrid
+from evennia.utils.test_resources import EvenniaCommandTest, EvenniaTest
+
+from commands.game import CmdTravel
+from world.maps.control_station_7 import XYMAP_DATA
+from world.travel import RouteTable
+
+MAP = """
+
+ + 0 1 2
+
+ 1 #-#
+     |
+ 0 L-#
+
+ + 0 1 2
+
+"""
+
+
+class LandmarkNode(xymap_legend.MapNode):
+    """ A landmark to travel to. """
+    landmark = True
+    prototype = {"prototype_parent": "xyz_room", "key": "Watchtower", "aliases": ["tower"]}
+
+
+class TestRouteTable(EvenniaTest):
+    """ Test RouteTable, on the Control Station 7 map. """
+
+    def setUp(self):
+        super().setUp()
+        xymap = XYMap(dict(XYMAP_DATA), Z="control-station-7")
+        xymap.parse()
+        self.routes = RouteTable(xymap)
+
+    def test_route(self):
+        """ Test that routes are shortest, and that every landmark can be reached. """
+        consumption_node = self.routes.find_landmark("consumption node")
+        self.assertEqual(self.routes.route(consumption_node, self.routes.find_landmark("bank")),
+                         ["west", "south"])
+        self.assertEqual(self.routes.route(consumption_node, consumption_node), [])
+        for landmark in self.routes.landmarks.values():
+            self.assertIsNotNone(self.routes.route(consumption_node, landmark))
+        self.assertIsNone(self.routes.route(consumption_node, (0, 0)))
+
+    def test_find_landmark(self):
+        """ Test finding landmarks by key, alias or the start of either. """
+        self.assertEqual(self.routes.find_landmark("Credit Repository"), (5, 5))
+        self.assertEqual(self.routes.find_landmark("bank"), (5, 5))
+        self.assertEqual(self.routes.find_landmark("cred"), (5, 5))
+        self.assertEqual(self.routes.find_landmark("western gate"), (2, 4))
+        # too many to choose from
+        self.assertIsNone(self.routes.find_landmark("c"))
+        self.assertIsNone(self.routes.find_landmark("nowhere"))
+
+
+class TestCmdTravel(EvenniaCommandTest):
+    """ Test the travel command. """
+
+    def setUp(self):
+        super().setUp()
+        self.grid = get_xyzgrid()
+        self.grid.add_maps({"map": MAP, "zcoord": "testmap", "legend": {"L": LandmarkNode}})
+        self.grid.reload()
+        self.grid.spawn(xyz=("*", "*", "testmap"))
+        self.char1.move_to(self.grid.get_room((1, 1, "testmap")).get(), quiet=True)
+
+    def tearDown(self):
+        self.grid.delete()
+        super().tearDown()
+
+    def test_travel(self):
+        """ Test that travelling only shows where you end up. """
+        self.call(CmdTravel(), "", "You can travel to: Watchtower")
+        self.call(CmdTravel(), "atlantis", "There is no landmark called 'atlantis' around here.")
+
+        with patch.object(self.char1, "at_look", return_value="") as at_look:
+            self.call(CmdTravel(), "tower", "")
+        self.assertEqual(self.char1.location.xyz, (0, 0, "testmap"))
+        self.assertEqual(at_look.call_count, 1)
+
+        self.call(CmdTravel(), "tower", "You are already there.")
@@ -0,0 +1,75 @@
+"""
+Test incremental xyzgrid spawning.
+
+"""
+
+from evennia.contrib.grid.xyzgrid.xyzgrid import XYZGrid
+from evennia.contrib.grid.xyzgrid.xyzroom import XYZExit, XYZRoom
+from evennia.utils.test_resources import EvenniaTest
+
+from world.xyzgrid_sync import spawn_changed
+
+from .test_rooms import MAP
+
+SMALLER_MAP = """
+
+ + 0 1 2
+
+ 1 #-#
+   |
+ 0 #
+
+ + 0 1 2
+
+"""
+
+
+class TestSpawnChanged(EvenniaTest):
+    """ Test spawn_changed. """
+
+    def setUp(self):
+        super().setUp()
+        self.grid, _ = XYZGrid.create("testgrid")
+        self.grid.add_maps({"map": MAP, "zcoord": "testmap"})
+
+    def tearDown(self):
+        self.grid.delete()
+        super().tearDown()
+
+    def change_map(self, **mapdata):
+        """ Replace the map data and reload, like after editing a map module. """
+        self.grid.add_maps({"map": MAP, "zcoord": "testmap", **mapdata})
+        self.grid.reload()
+
+    def counts(self, report):
+        """ The number of objects each phase touched. """
+        return {phase: count for phase, (count, _) in report.items()}
+
+    def test_spawn(self):
+        """ Test that only what changed since the last spawn is spawned. """
+        report = spawn_changed(self.grid)
+        self.assertEqual(self.counts(report), {"hash": 12, "nodes": 4, "links": 8})
+        self.assertEqual(XYZRoom.objects.filter_xyz(xyz=("*", "*", "testmap")).count(), 4)
+        self.assertEqual(XYZExit.objects.filter_xyz(xyz=("*", "*", "testmap")).count(), 8)
+
+        self.assertEqual(self.counts(spawn_changed(self.grid))["nodes"], 0)
+        self.assertEqual(self.counts(spawn_changed(self.grid))["links"], 0)
+
+        self.change_map(prototypes={(1, 1): {"prototype_parent": "xyz_room", "key": "Attic"}})
+        report = spawn_changed(self.grid)
+        self.assertEqual(self.counts(report), {"hash": 12, "nodes": 1, "links": 0})
+        self.assertEqual(self.grid.get_room((1, 1, "testmap")).get().key, "Attic")
+
+        # everything is spawned again when forced
+        self.assertEqual(self.counts(spawn_changed(self.grid, force=True))["nodes"], 4)
+
+    def test_remove(self):
+        """ Test that rooms and exits taken off the map are deleted. """
+        spawn_changed(self.grid)
+        self.change_map(map=SMALLER_MAP)
+        report = spawn_changed(self.grid)
+
+        self.assertEqual(self.counts(report), {"hash": 7, "nodes": 1, "links": 4})
+        self.assertFalse(self.grid.get_room((1, 0, "testmap")))
+        self.assertEqual(XYZRoom.objects.filter_xyz(xyz=("*", "*", "testmap")).count(), 3)
+        self.assertEqual(XYZExit.objects.filter_xyz(xyz=("*", "*", "testmap")).count(), 4)
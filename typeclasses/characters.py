@@ -12,7 +12,13 @@ import bisect
 from typing import TYPE_CHECKING
 
 from evennia.objects.objects import DefaultCharacter
-from evennia.typeclasses.attributes import AttributeProperty, NAttributeProperty
+from evennia.server.signals import SIGNAL_EXIT_TRAVERSED
+from evennia.typeclasses.attributes import (
+    AttributeProperty,
+    ModelAttributeBackend,
+    NAttributeProperty,
+)
+from evennia.utils.containers import GLOBAL_SCRIPTS
 from evennia.utils.logger import log_err, log_trace
 from evennia.utils.utils import inherits_from, lazy_property
 
@@ -24,7 +30,11 @@ from typeclasses.mixins import (
     HasEquipmentMixin,
 )
 from world import rules
+from world.attributes import BatchAttributeHandler
+from world.buyable_gear import BuyableGear
 from world.equipment import EquipmentError
+from world.npc_scheduler import npc_scheduler
+from world.occupancy import occupancy
 from world.quests import QuestHandler
 
 
@@ -46,6 +56,39 @@ class BaseCharacter(
     aggro = AttributeProperty(default="n")  # Defensive, Normal, or Aggressive (d/n/a)
     physical_appearance = AttributeProperty(default="One ugly motherfucker.")
 
+    @lazy_property
+    def attributes(self):
+        """ Attribute handler, with `batch()` for saving many changes at once. """
+        return BatchAttributeHandler(self, ModelAttributeBackend)
+
+    def say(self, text):
+        """
+        Say something, like the `say` command does, without going through the command handler.
+
+        """
+        if speech := self.at_pre_say(text):
+            self.at_say(speech, msg_self=True)
+
+    def step(self, exi):
+        """
+        Go through an exit, like its exit command does, without going through the command
+        handler.
+
+        Returns:
+            bool: If the exit could be traversed.
+
+        """
+        if not exi.access(self, "traverse"):
+            if exi.db.err_traverse:
+                self.msg(exi.db.err_traverse)
+            else:
+                exi.at_failed_traverse(self)
+            return False
+
+        exi.at_traverse(self, exi.destination)
+        SIGNAL_EXIT_TRAVERSED.send(sender=exi, traverser=self)
+        return True
+
     def at_defeat(self):
         """
         Called when this living thing reaches HP 0.
@@ -84,9 +127,6 @@ class Character(BaseCharacter):
     adelay = NAttributeProperty( default=0.0 ) # delay attacks until float time
     mdelay = NAttributeProperty( default=0.0 ) # delay movement until float time
 
-    # store item tracking
-    buyable_gear = NAttributeProperty(default={})
-
     appearance_template = """
 |c{name}{extra_name_info}|n
 
@@ -96,6 +136,23 @@ class Character(BaseCharacter):
 {things}
 """
 
+    @property
+    def buyable_gear(self):
+        """ Gear shop keepers have on offer for this character, by shop keeper. """
+        if (gear := self.ndb.buyable_gear) is None:
+            gear = self.ndb.buyable_gear = BuyableGear(shopping_at=lambda: self.shopping_at)
+        return gear
+
+    @buyable_gear.setter
+    def buyable_gear(self, value):
+        self.buyable_gear.clear()
+        self.buyable_gear.update(value)
+
+    @property
+    def shopping_at(self):
+        """ The shop keeper whose shop menu is open, if any. """
+        return getattr(self.ndb._evmenu, "npc", None)  # pylint: disable=protected-access
+
     @property
     def mana_level(self):
         """
@@ -236,6 +293,8 @@ class Character(BaseCharacter):
 
     def at_post_puppet(self, **kwargs):
         super().at_post_puppet(**kwargs)
+        occupancy.puppet(self)
+        npc_scheduler.wake(self.location)
         # Here we add Keybinds for Evelite Webclient so we can walk around with the numpad
         self.msg(
             key_cmds=(
@@ -253,6 +312,17 @@ class Character(BaseCharacter):
             )
         )
 
+    def at_post_unpuppet(self, account=None, session=None, **kwargs):
+        if not self.sessions.count():
+            # before the default hook takes the character off the grid
+            occupancy.unpuppet(self)
+            # offline characters aren't restocked, so let go of their stock right away
+            self.buyable_gear.clear()
+            if dungeon := getattr(self.location, "dungeon", None):
+                # the dungeon may collapse before they're back
+                dungeon.add_linkdead(self)
+        super().at_post_unpuppet(account=account, session=session, **kwargs)
+
     def at_post_move(self, source_location, move_type="move", **kwargs):
         obj = self
 
@@ -264,17 +334,24 @@ class Character(BaseCharacter):
             log_err(f"at_post_move called on a Character with no account: {self}")
             return
 
-        if self.location.access(self, "view"):
+        # travelling through a room in one go, only the destination is shown
+        passing_through = kwargs.get("passing_through", False)
+
+        if not passing_through and self.location.access(self, "view"):
             text = self.at_look(
                 self.location,
                 show_desc=obj.preferences.get("look_on_enter", True)
             )
             self.msg(text=(text, {"type": "look"}))
 
-        if map_getter := getattr(self.location, 'get_map_display', None):
+        map_getter = getattr(self.location, 'get_map_display', None)
+        if map_getter and not passing_through:
             # Send the map to the WebClient
             self.msg(map=map_getter(looker=self))
 
+        if getattr(self.location, "allow_encounters", False):
+            GLOBAL_SCRIPTS.encounters.check_encounter(self.location)
+
     def return_appearance(self, looker, **kwargs):
         if not looker:
             return ""
@@ -289,14 +366,9 @@ class Character(BaseCharacter):
 
     def clear_buyable_gear(self, vendors):
         """
-        clear out the buyable_gear dict so that shops refresh their stock
+        clear out the buyable_gear dict so that shops refresh their stock, except for the
+            shop the character is currently shopping at
         called by VendorRestockScript every hour
         """
-        if getattr(self.ndb, "_evmenu"):
-            if getattr(self.ndb._evmenu, "npc"):
-                if self.ndb._evmenu.npc not in vendors:
-                    self.buyable_gear = {}
-            else:
-                self.buyable_gear = {}
-        else:
-            self.buyable_gear = {}
+        shopping_at = self.shopping_at
+        self.buyable_gear.clear(keep=[shopping_at] if shopping_at in vendors else [])
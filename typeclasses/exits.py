@@ -7,6 +7,9 @@ for allowing Characters to traverse the exit to its destination.
 
 """
 from evennia.objects.objects import DefaultExit
+from evennia.typeclasses.attributes import AttributeProperty
+
+from world.dungeons import create_dungeon, entrance_cell
 
 class Exit(DefaultExit):
     """
@@ -34,3 +37,22 @@ class Exit(DefaultExit):
                                         Will not be called if the attribute `err_traverse` is
                                         defined, in which case that will simply be echoed.
     """
+
+
+class DungeonEntrance(Exit):
+    """
+    Exit into the Forbidden Zone. It leads to the entrance room of a dungeon instance instead
+    of the exit's own destination: the one it last opened if that is still joinable, or else a
+    new one.
+    """
+
+    # the dungeon instance last opened through this exit
+    dungeon = AttributeProperty(None)
+
+    def at_traverse(self, traversing_object, target_location, **kwargs):
+        dungeon = self.dungeon
+        if not (dungeon and dungeon.pk and dungeon.joinable):
+            dungeon = self.dungeon = create_dungeon(self.location)
+        super().at_traverse(
+            traversing_object, dungeon.room_at(entrance_cell(dungeon.height)), **kwargs
+        )
@@ -10,7 +10,7 @@ from evennia.contrib.game_systems.cooldowns import CooldownHandler
 from evennia.typeclasses.attributes import AttributeProperty
 from evennia.utils.utils import lazy_property
 
-from world.buffs import AbstractBuffHandler
+from world.buffs import BuffHandler
 from world.characters.classes import CHARACTER_CLASSES, CharacterClass
 from world.characters.races import RACES, Race
 from world.equipment import EquipmentHandler
@@ -85,8 +85,7 @@ class CombatMixin:
     @lazy_property
     def buffs(self):
         """ Get buffs on this character. """
-        # TODO Implement
-        return AbstractBuffHandler()
+        return BuffHandler(self)
 
 class HasDrainableStatsMixin:
     """ Used in entities that have HP, mana, and stamina """
@@ -134,6 +133,9 @@ class HasDrainableStatsMixin:
         healed = min(damage, hp)
         self.hp += healed
 
+        if healer and healed and getattr(self, "combat", None):
+            self.combat.at_heal(healer, self, healed)
+
         if healer is self:
             self.msg("|gYou heal yourself and feel better.|n")
         elif healer:
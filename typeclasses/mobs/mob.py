@@ -1,8 +1,13 @@
 """ Base class for Mobs """
 
+from evennia.prototypes.prototypes import PROTOTYPE_TAG_CATEGORY, search_prototype
 from evennia.prototypes.spawner import spawn
-from evennia.typeclasses.attributes import AttributeProperty
+from evennia.typeclasses.attributes import AttributeProperty, InMemoryAttributeBackend
+from evennia.utils.utils import lazy_property
 from typeclasses.characters import BaseCharacter
+from typeclasses.objects import ObjectSpec
+from world.attributes import BatchAttributeHandler
+from world.mob_pool import mob_pool
 
 
 class BaseMob(BaseCharacter):
@@ -27,26 +32,80 @@ class BaseMob(BaseCharacter):
         if level <= 1:
             return
 
-        self.hp_max += int(self.hp_max * level * self.mob_scaling.get("hp", 0.1))
-        self.mana_max += int(self.mana_max * level * self.mob_scaling.get("mana", 0.1))
+        # one save for all of it, rather than one per stat
+        with self.attributes.batch():
+            self.hp_max += int(self.hp_max * level * self.mob_scaling.get("hp", 0.1))
+            self.mana_max += int(self.mana_max * level * self.mob_scaling.get("mana", 0.1))
 
-        stat_levels = {
-            "strength": 6,
-            "cunning": 6,
-            "will": 6,
+            stat_levels = {
+                "strength": 6,
+                "cunning": 6,
+                "will": 6,
+            }
+            if self.cclass:
+                stat_levels[self.cclass.primary_stat] = 4
+                stat_levels[self.cclass.secondary_stat] = 5
+
+            for stat, value in stat_levels.items():
+                stat_levels[stat] = int(level / value)
+
+            self.strength += int(stat_levels["strength"] * self.mob_scaling.get("strength", 0.1))
+            self.cunning += int(stat_levels["cunning"] * self.mob_scaling.get("cunning", 0.1))
+            self.will += int(stat_levels["will"] * self.mob_scaling.get("will", 0.1))
+
+            self.levels.level = level
+
+    def at_release(self):
+        """ Called when this mob goes into the mob pool instead of being deleted. """
+        self.cooldowns.clear()
+        self.buffs.clear()
+
+    def at_recycle(self, attributes):
+        """
+        Called when this mob comes back out of the mob pool, to undo the last level scaling.
+
+        Args:
+            attributes (list): Freshly rolled `(key, value, category, lockstring)` Attributes
+                from the mob's prototype.
+
+        """
+        for stat in ("strength", "cunning", "will"):
+            delattr(self, stat)
+        self.attributes.batch_add(*attributes)
+        self.levels.level = 1
+
+    def equip_starting_equipment(self):
+        """
+        Spawn and equip any of the starting equipment this mob doesn't have, so recycled mobs
+        keep what they already carry. Equipment prototypes that don't exist are skipped.
+        """
+        carried = {
+            key
+            for item in self.equipment.all(only_objs=True)
+            for key in self._item_prototypes(item)
         }
-        if self.cclass:
-            stat_levels[self.cclass.primary_stat] = 4
-            stat_levels[self.cclass.secondary_stat] = 5
+        missing = [
+            prototype_key
+            for prototype_key in self.starting_equipment_prototypes or ()
+            if prototype_key.lower() not in carried and search_prototype(prototype_key)
+        ]
+        for eq in self._make_equipment(missing) if missing else ():
+            self.equipment.move(eq)
+
+    def _item_prototypes(self, item):
+        """ The prototype keys `item` was made from. """
+        return item.tags.get(category=PROTOTYPE_TAG_CATEGORY, return_list=True)
 
-        for stat, value in stat_levels.items():
-            stat_levels[stat] = int(level / value)
+    def _make_equipment(self, prototype_keys):
+        """ Create equipment from `prototype_keys`. """
+        return spawn(*prototype_keys)
 
-        self.strength += int(stat_levels["strength"] * self.mob_scaling.get("strength", 0.1))
-        self.cunning += int(stat_levels["cunning"] * self.mob_scaling.get("cunning", 0.1))
-        self.will += int(stat_levels["will"] * self.mob_scaling.get("will", 0.1))
+    def choose_target(self):
+        """ Pick who to attack with the current weapon, or None if nobody is in reach. """
+        if not self.combat:
+            return None
 
-        self.levels.level = level
+        return self.combat.get_target(self, self.weapon.attack_range)
 
     def at_death(self):
         """
@@ -54,4 +113,30 @@ class BaseMob(BaseCharacter):
 
         """
         super().at_death()
-        self.delete()
+        if not mob_pool.release(self):
+            self.delete()
+
+
+class EphemeralMob(BaseMob):
+    """
+    Mob that only lives for a fight and never writes to the database, beyond its own object
+    and tags.
+
+    All its Attributes, including the ones behind stats, cooldowns, buffs and the equipment
+    handler, are kept in memory like NAttributes, and its equipment is made of `ObjectSpec`s
+    instead of spawned objects. Anything in memory is lost on reload, so leftover ephemeral
+    mobs are deleted when the server starts.
+    """
+
+    @lazy_property
+    def attributes(self):
+        return BatchAttributeHandler(self, InMemoryAttributeBackend)
+
+    def _spawn_and_equip_starting_equipment(self):
+        self.equip_starting_equipment()
+
+    def _item_prototypes(self, item):
+        return [item.prototype_key]
+
+    def _make_equipment(self, prototype_keys):
+        return [ObjectSpec(prototype_key) for prototype_key in prototype_keys]
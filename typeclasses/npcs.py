@@ -3,15 +3,19 @@ Typeclasses defining NPCs. This includes both friends and enemies, only separate
 
 """
 import random
-import time
 
 from evennia.typeclasses.attributes import AttributeProperty
 from evennia.utils.evmenu import EvMenu
-from evennia.utils.utils import inherits_from, repeat, unrepeat
+from evennia.utils.utils import lazy_property, unrepeat
 from world.common.dialog.ads import Advertisement
 from world.common.dialog.insults import Insult
+from world.common.dialog.pool import take_line
 from world.enums import Allegiance, CardinalDirections
-from .characters import BaseCharacter, Character
+from world.npc_scheduler import npc_scheduler
+from world.occupancy import occupancy
+from world.registry import vendors
+from world.stock import SWEEP_BATCH, StockIndex
+from .characters import BaseCharacter
 
 class NPC(BaseCharacter):
     """
@@ -38,13 +42,12 @@ class NPC(BaseCharacter):
 
     def _do_wander(self, allowed_directions):
         candidates = [
-            direction.key for direction in self.location.exits
+            direction for direction in self.location.exits
             if direction.key in allowed_directions
         ]
 
         if candidates:
-            wander_dir = random.choice(candidates)
-            self.execute_cmd(wander_dir)
+            self.step(random.choice(candidates))
         else:
             self.location.msg_contents(
                 "$You() $conj(try) to escape but there is nowhere to go!",
@@ -56,6 +59,7 @@ class WanderingNPC(NPC):
     Wandering NPCs will wander around randomly."
     """
 
+    # only set on NPCs from before the shared scheduler
     wander_timer = AttributeProperty(default=None, autocreate=False)
     wander_rate = AttributeProperty(default=60, autocreate=False)
     wander_chance = AttributeProperty(default=0.5, autocreate=False)
@@ -63,12 +67,18 @@ class WanderingNPC(NPC):
     def at_object_creation(self):
         self.wander_rate = random.randrange(30, 120)
         self.wander_chance = random.randrange(300, 700) / 1000
-        self.wander_timer = repeat(self.wander_rate, self.wander)
+        self.schedule()
 
     def at_object_delete(self):
+        npc_scheduler.remove(self)
+        return True
+
+    def schedule(self):
+        """ Have the shared NPC scheduler call `wander` every `wander_rate` seconds or so. """
         if self.wander_timer is not None:
             unrepeat(self.wander_timer)
-        return True
+            self.wander_timer = None
+        npc_scheduler.add(self, "wander", self.wander_rate)
 
     def wander(self):
         """ Roll to see if the NPC should wander, then wander if so. """
@@ -83,6 +93,7 @@ class ShoutNPC(NPC):
     Make subclasses to determine what kinds of shouting the NPC does.
     """
 
+    # only set on NPCs from before the shared scheduler
     shout_timer = AttributeProperty(default=None, autocreate=False)
     shout_rate = AttributeProperty(default=60, autocreate=False)
     shout_chance = AttributeProperty(default=0.5, autocreate=False)
@@ -96,16 +107,22 @@ class ShoutNPC(NPC):
     def at_object_creation(self):
         self.shout_rate = random.randrange(30, 120)
         self.shout_chance = random.randrange(300, 700) / 1000
-        self.shout_timer = repeat(self.shout_rate, self.shout)
+        self.schedule()
 
     def at_object_delete(self):
+        npc_scheduler.remove(self)
+        return True
+
+    def schedule(self):
+        """ Have the shared NPC scheduler call `shout` every `shout_rate` seconds or so. """
         if self.shout_timer is not None:
             unrepeat(self.shout_timer)
-        return True
+            self.shout_timer = None
+        npc_scheduler.add(self, "shout", self.shout_rate)
 
     def _do_shout(self, target):
-        shout = getattr(self.shout_cls(target), self.shout_method)()
-        self.execute_cmd(f"say |w{shout}|n")
+        shout = take_line(self.shout_cls, self.shout_method, target)
+        self.say(f"|w{shout}|n")
         self._do_wander(CardinalDirections)
 
     def at_talk(self, talker):
@@ -130,7 +147,7 @@ class ShoutNPC(NPC):
     def shout(self):
         """ Roll to see if the NPC should perform a shout, then say it if so. """
         if random.random() < self.shout_chance:
-            pcs = [obj for obj in self.location.contents if inherits_from(obj, Character)]
+            pcs = occupancy.players_in(self.location)
             if pcs:
                 target = random.choice(pcs)
                 self._do_shout(target)
@@ -257,6 +274,14 @@ class ShopKeeper(TalkativeNPC):
 
     """
 
+    def at_object_creation(self):
+        super().at_object_creation()
+        vendors.add(self)
+
+    def at_object_delete(self):
+        vendors.remove(self)
+        return super().at_object_delete()
+
     def at_damage(self, _damage, attacker=None):
         """
         Immortal - we don't deduct any damage here.
@@ -269,12 +294,21 @@ class ShopKeeper(TalkativeNPC):
         if self.combat:
             self.combat.end_combat()
 
-    def clean_old_inventory(self):
+    @lazy_property
+    def stock(self):
+        """ When the items in the shopkeeper's inventory expire. """
+        return StockIndex(self)
+
+    def at_object_receive(self, moved_obj, source_location, move_type="move", **kwargs):
+        super().at_object_receive(moved_obj, source_location, move_type=move_type, **kwargs)
+        self.stock.add(moved_obj)
+
+    def clean_old_inventory(self, limit=SWEEP_BATCH):
         """
         delete items that were created over a day ago from shopkeeper's inventory to avoid
-            database buildup
-        """
+            database buildup, at most `limit` of them
 
-        for item in self.contents:
-            if time.time() - item.created_at > (60 * 60 * 24):
-                item.delete()
+        Returns:
+            int: how many items were deleted
+        """
+        return self.stock.sweep(limit)
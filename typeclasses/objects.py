@@ -6,15 +6,25 @@ The Object is the base class for things in the game world.
 Note that the default Character, Room and Exit do not inherit from Object.
 """
 import bisect
+import inspect
 import time
+from copy import copy
+from types import MethodType
 
 import inflect
 
+from django.conf import settings
 from evennia import AttributeProperty
 from evennia.objects.objects import DefaultObject
 from evennia.prototypes.spawner import spawn
 from evennia.utils import ansi, logger
-from evennia.utils.utils import compress_whitespace, inherits_from, make_iter
+from evennia.utils.utils import (
+    class_from_module,
+    compress_whitespace,
+    inherits_from,
+    iter_to_str,
+    make_iter,
+)
 
 from world import quantum_lattices
 from world.affixes import AFFIXES
@@ -56,6 +66,56 @@ class NoneObject:
         """ Return 'None' no matter what. """
         return "None"
 
+class ObjectSpec:
+    """
+    In-memory stand-in for an object spawned from a prototype, for holders that never need the
+    real thing, like the equipment of an `EphemeralMob`.
+
+    Attributes are rolled from the prototype once, anything else falls back to the prototype's
+    typeclass: AttributeProperty defaults, class attributes, and methods, which run against the
+    spec. Methods that need the database, like moving or deleting, don't work.
+    """
+
+    def __init__(self, prototype_key):
+        create_kwargs, _, _, _, _, attributes, _, _ = spawn(prototype_key, only_validate=True)[0]
+        self.prototype_key = prototype_key.lower()
+        self.key = create_kwargs["db_key"]
+        self.typeclass = class_from_module(
+            create_kwargs.get("db_typeclass_path", settings.BASE_OBJECT_TYPECLASS)
+        )
+        self.attrs = {key: value for key, value, *_ in attributes}
+
+    def __getattr__(self, name):
+        attrs = self.__dict__.get("attrs", {})
+        if name in attrs:
+            return attrs[name]
+        if name.startswith("__") or "typeclass" not in self.__dict__:
+            raise AttributeError(name)
+
+        value = inspect.getattr_static(self.typeclass, name)
+        if isinstance(value, AttributeProperty):
+            # disable protected-access since there's no instance to ask the property for it
+            # pylint: disable=protected-access
+            default = value._default
+            return default() if callable(default) else copy(default)
+        if isinstance(value, property):
+            return value.fget(self)
+        if inspect.isfunction(value):
+            return MethodType(value, self)
+        return getattr(self.typeclass, name)
+
+    @property
+    def name(self):
+        """ Same as the key, like for real objects. """
+        return self.key
+
+    def __str__(self):
+        return self.get_display_name()
+
+    def get_display_name(self, *args, **kwargs):
+        """ The uncolored display name. """
+        return self.display_name or self.key
+
 class Object(DefaultObject):
     """
     Base in-game entity.
@@ -328,6 +388,97 @@ class QuantumLatticeObject(Object):
         owner.equipment.move(new_ql)
         return f"You combine 3 {old_ql_display_name} into {new_ql}."
 
+    @classmethod
+    def cascade(cls, counts, start=None):
+        """
+        Work out what is left after combining as many quantum lattices as possible, from the
+        tier of `start` up. Every 3 lattices of a tier make 1 of the next, which can in turn be
+        combined with the ones already held.
+
+        Args:
+            counts (dict): The number of lattices held, by QuantumLatticeType.
+            start (QuantumLatticeType, optional): The lowest tier to combine, defaults to the
+                lowest there is.
+
+        Returns:
+            dict: The number of lattices held afterwards, by QuantumLatticeType.
+
+        """
+        tiers = list(cls._QL_TIERS)
+        result = dict(counts)
+        made = 0
+        for tier in tiers[tiers.index(start) if start else 0:]:
+            total = counts.get(tier, 0) + made
+            if tier is tiers[-1]:
+                result[tier] = total
+            else:
+                made, result[tier] = divmod(total, 3)
+        return result
+
+    @classmethod
+    def combine_all(cls, owner, name=None):
+        """
+        Combines all quantum lattices of the owner as far up the tiers as they go, starting with
+        the ones called `name`, or the lowest tier if not given.
+
+        The lattices are only counted once, and the result is applied in one go: all the used up
+        lattices are deleted and the new ones spawned in a single inventory transaction.
+
+        """
+        start = None
+        if name:
+            name = name.strip().lower()
+            try:
+                start = QuantumLatticeType(_INFLECT.singular_noun(name) or name)
+            except ValueError:
+                return f"'{name}' is not a kind of quantum lattice."
+            if start is list(cls._QL_TIERS)[-1]:
+                return f"{cls._display_name(start, 2)} cannot be combined."
+
+        held = {}
+        for obj in owner.equipment.backpack:
+            if isinstance(obj, QuantumLatticeObject):
+                held.setdefault(obj.ql_type, []).append(obj)
+        counts = {ql_type: len(objs) for ql_type, objs in held.items()}
+
+        used, made = {}, {}
+        for ql_type, count in cls.cascade(counts, start).items():
+            if (change := count - counts.get(ql_type, 0)) < 0:
+                used[ql_type] = -change
+            elif change > 0:
+                made[ql_type] = change
+
+        if not used:
+            if start:
+                return f"You need 3 {cls._display_name(start, 3)} to combine."
+            return "You don't have enough quantum lattices to combine."
+
+        with owner.equipment.transaction():
+            owner.equipment.delete(
+                [obj for ql_type, count in used.items() for obj in held[ql_type][:count]]
+            )
+            for new_ql in spawn(*(
+                cls._QL_TIERS[ql_type]["prototype"] | {"location": owner}
+                for ql_type, count in made.items() for _ in range(count)
+            )):
+                if new_ql not in owner.equipment.backpack:
+                    owner.equipment.backpack.append(new_ql)
+
+        return f"You combine {cls._list_counts(used)} into {cls._list_counts(made)}."
+
+    @classmethod
+    def _display_name(cls, ql_type, count):
+        """ The colored name of `count` lattices of a QuantumLatticeType. """
+        ql = quantum_lattices.QuantumLattice.from_name(ql_type.value)
+        return ql.get_display_name(custom_text=_INFLECT.plural(ql_type.value, count))
+
+    @classmethod
+    def _list_counts(cls, counts):
+        """ List numbers of lattices, like '9 dust shards and 1 echo stone'. """
+        return iter_to_str(
+            f"{count} {cls._display_name(ql_type, count)}" for ql_type, count in counts.items()
+        )
+
     def use(self, *args, **kwargs):
         """
         use the QL by calling a specific class per QL
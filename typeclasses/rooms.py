@@ -5,9 +5,19 @@ Rooms are simple containers that has no location of their own.
 
 """
 
+from django.conf import settings
 from django.utils.translation import gettext as _
 from evennia.contrib.grid.xyzgrid.xyzroom import XYZRoom
 from evennia.objects.objects import DefaultRoom
+from evennia.typeclasses.attributes import AttributeProperty
+from evennia.utils.create import create_object
+from evennia.utils.utils import lazy_property
+
+from world.appearance import RoomAppearanceCache, looker_independent
+from world.messages import COMBAT_MESSAGES
+from world.minimap import minimap_cache
+from world.npc_scheduler import npc_scheduler
+from world.occupancy import occupancy
 
 class Room(DefaultRoom):
     """
@@ -18,6 +28,23 @@ class Room(DefaultRoom):
     allow_combat = False
     allow_pvp = False
     allow_death = False
+    allow_encounters = False
+
+    @lazy_property
+    def appearance_cache(self):
+        """ Rendered parts of this room's appearance, see `world.appearance`. """
+        return RoomAppearanceCache(self)
+
+    def at_object_receive(self, moved_obj, source_location, move_type="move", **kwargs):
+        super().at_object_receive(moved_obj, source_location, move_type=move_type, **kwargs)
+        self.appearance_cache.add(moved_obj)
+        if occupancy.arrive(moved_obj, self):
+            npc_scheduler.wake(self)
+
+    def at_object_leave(self, moved_obj, target_location, move_type="move", **kwargs):
+        super().at_object_leave(moved_obj, target_location, move_type=move_type, **kwargs)
+        self.appearance_cache.remove(moved_obj)
+        occupancy.leave(moved_obj, self)
 
     def format_appearance(self, appearance, looker, **kwargs):
         """
@@ -26,14 +53,127 @@ class Room(DefaultRoom):
 
         return appearance.strip()
 
+    def return_appearance(self, looker, **kwargs):
+        """
+        Like the default, but with the desc cached when it looks the same to everyone, and the
+        contents kept up to date as they come and go.
+        """
+        if not looker:
+            return ""
+
+        cache = self.appearance_cache
+        return self.format_appearance(
+            self.appearance_template.format(
+                **cache.static_parts(looker, **kwargs),
+                characters=cache.characters(looker, **kwargs),
+                things=cache.things_line(looker, **kwargs),
+            ),
+            looker,
+            **kwargs,
+        )
+
+    def msg_contents(self, text=None, exclude=None, from_obj=None, mapping=None,
+                     raise_funcparse_errors=False, **kwargs):
+        """
+        Send out any buffered combat messages first, so they arrive in order.
+        """
+        if self in COMBAT_MESSAGES:
+            COMBAT_MESSAGES.flush(self)
+
+        super().msg_contents(
+            text=text,
+            exclude=exclude,
+            from_obj=from_obj,
+            mapping=mapping,
+            raise_funcparse_errors=raise_funcparse_errors,
+            **kwargs,
+        )
+
+
+class GridRoom(Room, XYZRoom):
+    """
+    XYZGrid room whose map display is rendered once and then cached, see `world.minimap`.
+    """
+
+    def _map_option(self, xymap, name, kwargs):
+        """ A map display option, from kwargs, the map options or the room, in that order. """
+        return kwargs.get(name, xymap.options.get(name, getattr(self, name)))
+
+    def get_map_display(self, looker, room_desc=None, **kwargs):
+        """
+        Get the map around this room, like `XYZRoom.return_appearance` shows it.
+
+        Args:
+            looker (Object): The one looking.
+            room_desc (str, optional): The room's appearance, which the map is made as wide as
+                unless the map fills the client.
+            **kwargs: Map display options, as for `XYZRoom.return_appearance`.
+
+        Returns:
+            str: The map display, or an empty string if there is no map to show.
+
+        """
+        xyz = self.xyz
+        xymap = self.xyzgrid.get_map(xyz[2])
+        if not xymap or not self._map_option(xymap, "map_display", kwargs):
+            return ""
+
+        if self._map_option(xymap, "map_fill_all", kwargs):
+            sessions = looker.sessions.get()
+            display_width = (
+                sessions[0].get_client_size()[0] if sessions else settings.CLIENT_DEFAULT_WIDTH
+            )
+        else:
+            display_width = max(
+                [xymap.max_x] + [len(line) for line in (room_desc or "").split("\n")]
+            )
+
+        map_indent = {
+            "r": max(0, display_width - xymap.max_x),
+            "c": max(0, (display_width - xymap.max_x) // 2),
+        }.get(self._map_option(xymap, "map_align", kwargs), 0)
+
+        options = {
+            "dist": self._map_option(xymap, "map_visual_range", kwargs),
+            "mode": self._map_option(xymap, "map_mode", kwargs),
+            "character": self._map_option(xymap, "map_character_symbol", kwargs),
+            "max_size": (display_width, None),
+            "indent": map_indent,
+        }
+        sep = self._map_option(xymap, "map_separator_char", kwargs) * display_width
+
+        def render(**extra):
+            map_display = xymap.get_visual_range(xyz[:2], **options, **extra)
+            return f"{sep}|n\n{map_display}\n{sep}"
+
+        # the path shown by the goto command is different for everyone, so it isn't cached
+        if path_data := looker.ndb.xy_path_data:
+            return render(
+                target=path_data.target.xyz[:2],
+                target_path_style=self._map_option(xymap, "map_target_path_style", kwargs),
+            )
+
+        return minimap_cache.get(xymap, (xyz[:2], *options.values(), sep), render)
+
+    def return_appearance(self, looker, **kwargs):
+        """
+        Show the map with the cached display, instead of rendering it every time.
+        """
+        room_desc = super().return_appearance(looker, **{**kwargs, "map_display": False})
+        if looker and (map_display := self.get_map_display(looker, room_desc, **kwargs)):
+            # echo directly to make easier to separate in client
+            looker.msg(text=(map_display, {"type": "xymap"}), options=None)
+        return room_desc
+
 
-class TownRoom(Room, XYZRoom):
+class TownRoom(GridRoom):
     """
     Combines the XYZGrid functionality with Ainneve-specific room code.
     """
     map_area_client = False
     map_fill_all = False
 
+    @looker_independent
     def get_display_desc(self, looker, **kwargs):
         """
         Override this so that we don't display room description if user preference turns it off.
@@ -44,6 +184,52 @@ class TownRoom(Room, XYZRoom):
 
         return super().get_display_desc(looker, **kwargs)
 
+class ForbiddenZoneRoom(GridRoom):
+    """
+    XYZGrid room out in the Forbidden Zone, where anything goes and encounters wait.
+    """
+    allow_combat = True
+    allow_death = True
+    allow_encounters = True
+
+class ForbiddenZoneGate(TownRoom):
+    """
+    XYZGrid room at the edge of town, with the way into a fresh Forbidden Zone dungeon.
+    """
+
+    def at_object_creation(self):
+        super().at_object_creation()
+        # dungeons are made on the way in, so until then the exit just loops back here
+        create_object(
+            "typeclasses.exits.DungeonEntrance",
+            key="forbidden zone",
+            aliases=["fz", "zone"],
+            location=self,
+            destination=self,
+        )
+
+class DungeonRoom(Room):
+    """
+    Room of a procedural dungeon instance. Its exits are only created when a player first
+    enters it, see `world.dungeons`.
+    """
+    allow_combat = True
+    allow_death = True
+    allow_encounters = True
+
+    # (x, y, zcoord) in the dungeon, like an XYZRoom's, so encounters can find their cell
+    xyz = AttributeProperty(None)
+    dungeon = AttributeProperty(None)
+    explored = AttributeProperty(False)
+
+    def at_object_receive(self, moved_obj, source_location, move_type="move", **kwargs):
+        """
+        Explore the room when the first player walks in, before they get to look around.
+        """
+        super().at_object_receive(moved_obj, source_location, move_type=move_type, **kwargs)
+        if not self.explored and getattr(moved_obj, "is_pc", False) and self.dungeon:
+            self.dungeon.explore(self)
+
 class PvPRoom(Room):
     """
     Room where PvP can happen, but noone gets killed.
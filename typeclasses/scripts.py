@@ -15,6 +15,10 @@ just overloads its hooks to have it perform its function.
 from evennia.scripts.scripts import DefaultScript
 from evennia.utils.search import search_typeclass
 
+from world.occupancy import occupancy
+from world.registry import vendors
+from world.stock import SWEEP_BATCH
+
 class Script(DefaultScript):
     """ Script Base class. This is required for Evennia to create objects. """
 
@@ -54,17 +58,34 @@ class VendorRestockScript(Script):
 
     def at_repeat(self, **kwargs):
         """
-        cycle through each character and wipe out their buyable gear if they are not currently
-            shopping
+        cycle through each online character and wipe out their buyable gear if they are not
+            currently shopping
 
-        then cycle through each shopkeeper and delete old gear in their inventory
-            (created at > 1 day ago)
+        old gear in the shopkeepers' inventories is deleted by StockSweeperScript
         """
-        vendors = list(search_typeclass("typeclasses.npcs.ShopKeeper"))
-        characters = search_typeclass("typeclasses.characters.Character")
+        shopkeepers = list(vendors)
 
-        for character in characters:
-            character.clear_buyable_gear(vendors)
+        for character in occupancy.online.values():
+            character.clear_buyable_gear(shopkeepers)
+
+class StockSweeperScript(Script):
+    """
+    Script to delete old vendor inventory, a batch at a time
 
+    Should run every minute
+    """
+
+    def at_stop(self, **kwargs):
+        """ this should never stop, otherwise the NPC vendors will get clogged with junk """
+        self.start()
+
+    def at_repeat(self, **kwargs):
+        """
+        cycle through the shopkeepers and delete their old gear (created at > 1 day ago), up to
+            SWEEP_BATCH items in all
+        """
+        budget = SWEEP_BATCH
         for vendor in vendors:
-            vendor.clean_old_inventory()
+            budget -= vendor.clean_old_inventory(budget)
+            if budget <= 0:
+                break
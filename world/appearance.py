@@ -0,0 +1,141 @@
+"""
+Cache of the parts of a room's appearance.
+
+Only what looks the same to everyone is kept: the description, when the room renders it from
+the room alone. Everything else that could depend on who's looking, like the name, the header
+and footer, and the exits (which are filtered by their `view` locks), is rendered on every look.
+Rooms whose `get_display_desc` only depends on the room mark it with `looker_independent`,
+others get theirs rendered on every look too.
+
+The rest is what's in the room. The display names of the characters and things in it are kept
+up to date as they come and go, through the room's `at_object_receive` and `at_object_leave`,
+so a look only has to filter out what the looker can't see. Objects can also be put somewhere
+without those hooks being called (like setting `obj.location` directly), so the names are
+checked against the room's contents on every look, which is cheap since Evennia caches those.
+"""
+
+from collections import defaultdict
+
+from django.utils.translation import gettext as _
+from evennia.objects.objects import DefaultObject
+from evennia.utils.utils import iter_to_str
+
+# get_display_desc implementations that only depend on the room and the `show_desc` kwarg
+_LOOKER_INDEPENDENT = {DefaultObject.get_display_desc}
+
+
+def looker_independent(func):
+    """ Mark a room's `get_display_desc` as rendering the same for everyone. """
+    _LOOKER_INDEPENDENT.add(func)
+    return func
+
+
+class RoomAppearanceCache:
+    """
+    Rendered parts of one room's appearance.
+    """
+
+    __slots__ = ("room", "desc_source", "descs", "names", "things_key", "things")
+
+    def __init__(self, room):
+        self.room = room
+        # the raw desc the cached descs were rendered from
+        self.desc_source = None
+        # show_desc: rendered desc
+        self.descs = {}
+        # content type: {object id: (object, display name)}
+        self.names = {}
+        self.things_key = None
+        self.things = ""
+
+    def desc(self, looker, **kwargs):
+        """ The desc part of the appearance, cached if it looks the same to everyone. """
+        room = self.room
+        if type(room).get_display_desc not in _LOOKER_INDEPENDENT:
+            return room.get_display_desc(looker, **kwargs)
+
+        if (source := room.attributes.get("desc")) != self.desc_source:
+            self.desc_source = source
+            self.descs = {}
+        show_desc = kwargs.get("show_desc", True)
+        if (desc := self.descs.get(show_desc)) is None:
+            desc = self.descs[show_desc] = room.get_display_desc(looker, **kwargs)
+        return desc
+
+    def static_parts(self, looker, **kwargs):
+        """
+        Get the parts of the appearance that don't depend on what's in the room.
+
+        Returns:
+            dict: `name`, `extra_name_info`, `desc`, `header`, `footer` and `exits`, ready
+                for the room's `appearance_template`.
+
+        """
+        room = self.room
+        return {
+            "name": room.get_display_name(looker, **kwargs),
+            "extra_name_info": room.get_extra_display_name_info(looker, **kwargs),
+            "desc": self.desc(looker, **kwargs),
+            "header": room.get_display_header(looker, **kwargs),
+            "footer": room.get_display_footer(looker, **kwargs),
+            "exits": room.get_display_exits(looker, **kwargs),
+        }
+
+    def _names(self, content_type):
+        """
+        Display names of the contents of a type by object id, brought in line with the room's
+        contents.
+        """
+        names = self.names.setdefault(content_type, {})
+        contents = self.room.contents_get(content_type=content_type)
+        if len(contents) != len(names) or any(obj.id not in names for obj in contents):
+            current = {obj.id: obj for obj in contents}
+            for obj_id in [obj_id for obj_id in names if obj_id not in current]:
+                del names[obj_id]
+            for obj_id, obj in current.items():
+                if obj_id not in names:
+                    names[obj_id] = (obj, obj.get_display_name(None))
+            if content_type == "object":
+                self.things_key = None
+        return names
+
+    def add(self, obj):
+        """ Called when `obj` enters the room. """
+        for content_type in obj._content_types:  # pylint: disable=protected-access
+            if (names := self.names.get(content_type)) is not None:
+                names[obj.id] = (obj, obj.get_display_name(None))
+                self.things_key = None
+
+    def remove(self, obj):
+        """ Called when `obj` leaves the room. """
+        for names in self.names.values():
+            if names.pop(obj.id, None) is not None:
+                self.things_key = None
+
+    def characters(self, looker, **kwargs):
+        """ The characters line of the appearance. """
+        names = self._names("character")
+        visible = self.room.filter_visible([obj for obj, _name in names.values()], looker, **kwargs)
+        character_names = iter_to_str((names[char.id][1] for char in visible), endsep=_(", and"))
+        return f"|w{_('Characters')}:|n {character_names}" if character_names else ""
+
+    def things_line(self, looker, **kwargs):
+        """ The things line of the appearance, only rendered again when the things change. """
+        names = self._names("object")
+        visible = self.room.filter_visible([obj for obj, _name in names.values()], looker, **kwargs)
+        things_key = frozenset(thing.id for thing in visible)
+        if things_key != self.things_key:
+            grouped_things = defaultdict(list)
+            for thing in visible:
+                grouped_things[names[thing.id][1]].append(thing)
+
+            thing_names = []
+            for thingname, thinglist in sorted(grouped_things.items()):
+                singular, plural = thinglist[0].get_numbered_name(
+                    len(thinglist), looker, key=thingname
+                )
+                thing_names.append(singular if len(thinglist) == 1 else plural)
+            thing_names = iter_to_str(thing_names, endsep=_(", and"))
+            self.things = f"|w{_('You see')}:|n {thing_names}" if thing_names else ""
+            self.things_key = things_key
+        return self.things
@@ -0,0 +1,171 @@
+"""
+Attribute handler that can hold back writes.
+
+Code that changes a lot of Attributes in one go, like levelling up, does a read-modify-write
+per Attribute, and every write is a query of its own. Inside `with obj.attributes.batch():`
+writes are kept in memory instead, reads see them, and they are all saved in one transaction at
+the end of the block: existing Attributes with one bulk update, new ones with `batch_add`.
+
+Bulk updates skip `save()`, so nothing watching single Attributes through the MonitorHandler
+hears about them.
+"""
+
+from contextlib import contextmanager
+
+from django.db import transaction
+from evennia.typeclasses.attributes import Attribute, AttributeHandler, ModelAttributeBackend
+from evennia.utils.dbserialize import to_pickle
+
+
+class BatchAttributeHandler(AttributeHandler):
+    """
+    AttributeHandler with a `batch` context that holds back writes.
+    """
+
+    def __init__(self, obj, backend_class):
+        super().__init__(obj, backend_class)
+        # (key, category): (value, lockstring, strattr) while batching, else None
+        self._pending = None
+
+    @contextmanager
+    def batch(self):
+        """
+        Hold back Attribute writes until the end of the block. Batches can be nested, only the
+        outermost one saves.
+        """
+        if self._pending is not None:
+            yield self
+            return
+
+        self._pending = {}
+        try:
+            yield self
+        finally:
+            pending, self._pending = self._pending, None
+            self._flush(pending)
+
+    def _pending_key(self, key, category):
+        return key.strip().lower(), category.strip().lower() if category is not None else None
+
+    def _get_pending(self, key, category):
+        if not self._pending or not isinstance(key, str):
+            return None
+        return self._pending.get(self._pending_key(key, category))
+
+    def _flush(self, pending):
+        if not pending:
+            return
+        if not isinstance(self.backend, ModelAttributeBackend):
+            # nothing to save, in-memory Attributes just get set
+            for (key, category), (value, lockstring, strattr) in pending.items():
+                super().add(key, value, category=category, lockstring=lockstring, strattr=strattr)
+            return
+
+        updated = []
+        # new Attributes, split on strattr
+        created = ([], [])
+        for (key, category), (value, lockstring, strattr) in pending.items():
+            if attrs := self.backend.get(key, category):
+                attr = attrs[0]
+                attr.db_value, attr.db_strvalue = (
+                    (None, value) if strattr else (to_pickle(value), None)
+                )
+                updated.append(attr)
+            else:
+                created[bool(strattr)].append((key, value, category, lockstring))
+
+        with transaction.atomic():
+            if updated:
+                Attribute.objects.bulk_update(updated, ["db_value", "db_strvalue"])
+            for strattr, attributes in enumerate(created):
+                if attributes:
+                    self.backend.batch_add(*attributes, strattr=bool(strattr))
+
+    # disable too-many-arguments and too-many-positional-arguments to match AttributeHandler
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def add(
+        self,
+        key,
+        value,
+        category=None,
+        lockstring="",
+        strattr=False,
+        accessing_obj=None,
+        default_access=True,
+    ):
+        if self._pending is None or not key or accessing_obj:
+            super().add(
+                key,
+                value,
+                category=category,
+                lockstring=lockstring,
+                strattr=strattr,
+                accessing_obj=accessing_obj,
+                default_access=default_access,
+            )
+            return
+
+        self._pending[self._pending_key(key, category)] = (value, lockstring, strattr)
+
+    def get(
+        self,
+        key=None,
+        default=None,
+        category=None,
+        return_obj=False,
+        strattr=False,
+        raise_exception=False,
+        accessing_obj=None,
+        default_access=True,
+        return_list=False,
+    ):
+        if not return_obj and not accessing_obj and (pending := self._get_pending(key, category)):
+            return [pending[0]] if return_list else pending[0]
+
+        return super().get(
+            key=key,
+            default=default,
+            category=category,
+            return_obj=return_obj,
+            strattr=strattr,
+            raise_exception=raise_exception,
+            accessing_obj=accessing_obj,
+            default_access=default_access,
+            return_list=return_list,
+        )
+
+    def has(self, key=None, category=None):
+        if self._get_pending(key, category):
+            return True
+        return super().has(key=key, category=category)
+
+    def remove(
+        self,
+        key=None,
+        category=None,
+        raise_exception=False,
+        accessing_obj=None,
+        default_access=True,
+    ):
+        if self._pending and isinstance(key, str):
+            self._pending.pop(self._pending_key(key, category), None)
+
+        super().remove(
+            key=key,
+            category=category,
+            raise_exception=raise_exception,
+            accessing_obj=accessing_obj,
+            default_access=default_access,
+        )
+
+    def clear(self, category=None, accessing_obj=None, default_access=True):
+        if self._pending:
+            self._pending = {
+                (key, pending_category): pending
+                for (key, pending_category), pending in self._pending.items()
+                if category is not None and pending_category != category.strip().lower()
+            }
+
+        super().clear(
+            category=category, accessing_obj=accessing_obj, default_access=default_access
+        )
@@ -1,14 +1,250 @@
 """
 Module for handling buffs to characters.
+
+A buff is a flat modifier to one stat, like "attack" or "armor", optionally only counting
+against one opponent and optionally running out after a number of seconds.
+
+Every character's `BuffHandler` keeps a running total per stat, so combat reads the effective
+modifier with a dict lookup no matter how many effects are stacked. Expiry doesn't use a timer
+per buff either: all timed buffs go on one shared `TimingWheel`, which is advanced whenever
+buffs are read or added.
+
+Anything else that modifies stats, such as item affixes, can add permanent buffs with a
+`source` and take them all off again with `remove_source`.
 """
 
-class AbstractBuffHandler:
-    """ Class for handling buffs to characters. """
-    # TODO Added as a stub, needs implementation.
+import math
+import time
+from collections import defaultdict
+from typing import NamedTuple
+
+
+class Buff(NamedTuple):
+    """ A single active buff. """
+
+    stat: str
+    amount: int
+    # dbref of the opponent the buff counts against, or None for everyone
+    versus: int | None = None
+    # absolute time.time() the buff runs out at, or 0 for never
+    expires: float = 0
+    source: str | None = None
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel for expiring many short-lived entries with one clock.
+
+    Entries due within `slots` ticks sit in the innermost wheel. Later ones sit in an outer
+    wheel, whose slots each cover a whole turn of the wheel inside it, and are cascaded inwards
+    as that turn comes up. Scheduling is O(1) and each entry is only moved once per level.
+    Cancelling is left to the callback, which should ignore entries that no longer apply.
+    """
+
+    __slots__ = ("resolution", "slots", "wheels", "tick", "clock")
+
+    def __init__(self, resolution=1.0, slots=64, levels=4, clock=time.time):
+        """
+        Args:
+            resolution (float): Seconds per tick. Entries fire up to this much late.
+            slots (int): Slots per wheel level.
+            levels (int): Number of levels. Entries beyond `slots ** levels` ticks away wait in
+                the outermost wheel and are rescheduled every time it turns.
+            clock (callable): Returns the current time in seconds.
+        """
+        self.resolution = resolution
+        self.slots = slots
+        self.wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.clock = clock
+        self.tick = self._now()
+
+    def _now(self):
+        return math.floor(self.clock() / self.resolution)
+
+    def schedule(self, expires, callback, *args):
+        """
+        Call `callback(*args)` once the clock reaches the time `expires`.
+        """
+        self._insert((max(math.ceil(expires / self.resolution), self.tick + 1), callback, args))
+
+    def _insert(self, entry):
+        due = entry[0]
+        span = self.slots
+        for level, wheel in enumerate(self.wheels):
+            if due - self.tick < span or level == len(self.wheels) - 1:
+                wheel[(due * self.slots // span) % self.slots].append(entry)
+                return
+            span *= self.slots
+
+    def advance(self):
+        """
+        Fire everything that is due by now. Returns the number of entries fired.
+        """
+        now = self._now()
+        fired = 0
+        while self.tick < now:
+            self.tick += 1
+            self._cascade()
+
+            slot = self.wheels[0][self.tick % self.slots]
+            while slot:
+                _, callback, args = slot.pop()
+                callback(*args)
+                fired += 1
+
+        return fired
+
+    def _cascade(self):
+        """ Move the entries of every outer slot that has come up into the wheels inside it. """
+        span = self.slots
+        for wheel in self.wheels[1:]:
+            if self.tick % span:
+                return
+
+            index = (self.tick // span) % self.slots
+            entries, wheel[index] = wheel[index], []
+            for entry in entries:
+                self._insert(entry)
+            span *= self.slots
+
+    def __len__(self):
+        return sum(len(slot) for wheel in self.wheels for slot in wheel)
+
+
+class BuffHandler:
+    """
+    Class for handling buffs to characters.
+
+    Buffs are saved as plain tuples in a single Attribute and mirrored in memory, together
+    with the per-stat totals.
+    """
+
+    __slots__ = ("obj", "_buffs", "_totals", "_next_id")
+
+    db_attribute = "buffs"
+    db_category = "buffs"
+
+    def __init__(self, obj):
+        self.obj = obj
+        self._buffs = {}
+        self._totals = defaultdict(int)
+        self._next_id = 0
+
+        now = BUFF_WHEEL.clock()
+        saved = self.obj.attributes.get(self.db_attribute, default=(), category=self.db_category)
+        for buff in saved:
+            buff = Buff(*buff)
+            if not buff.expires or buff.expires > now:
+                self._add(buff)
+
+        if len(self._buffs) != len(saved):
+            self._save()
+
+    def _key(self, stat, versus):
+        return stat if versus is None else (stat, versus)
+
+    def _add(self, buff):
+        buff_id = self._next_id
+        self._next_id += 1
+        self._buffs[buff_id] = buff
+        self._totals[self._key(buff.stat, buff.versus)] += buff.amount
+        if buff.expires:
+            BUFF_WHEEL.schedule(buff.expires, self._expire, buff_id, buff)
+
+        return buff_id
+
+    def _remove(self, buff_id):
+        buff = self._buffs.pop(buff_id)
+        key = self._key(buff.stat, buff.versus)
+        self._totals[key] -= buff.amount
+        if not self._totals[key]:
+            del self._totals[key]
+
+    def _expire(self, buff_id, buff):
+        """ Called by the wheel. The buff may have been removed already. """
+        if self._buffs.get(buff_id) is buff:
+            self._remove(buff_id)
+            self._save()
+
+    def _save(self):
+        if self._buffs:
+            self.obj.attributes.add(
+                self.db_attribute,
+                [tuple(buff) for buff in self._buffs.values()],
+                category=self.db_category,
+            )
+        else:
+            self.obj.attributes.remove(self.db_attribute, category=self.db_category)
+
+    def add_buff(self, category, amount, versus=None, duration=0, source=None):
+        """
+        Apply buff to character.
+
+        Args:
+            category (str): The stat to modify, like "attack" or "armor".
+            amount (int): How much to add to the stat. Negative for a debuff.
+            versus (Object, optional): Only count the buff against this opponent.
+            duration (float, optional): Seconds until the buff runs out. 0 lasts until removed.
+            source (str, optional): What the buff came from, for `remove_source`.
+
+        Returns:
+            int: An id for `remove_buff`.
+
+        """
+        BUFF_WHEEL.advance()
+        buff_id = self._add(Buff(
+            category,
+            amount,
+            versus.id if versus else None,
+            BUFF_WHEEL.clock() + duration if duration else 0,
+            source,
+        ))
+        self._save()
+        return buff_id
+
+    def remove_buff(self, buff_id):
+        """ Remove buff from character. Does nothing if it's already gone. """
+        if buff_id in self._buffs:
+            self._remove(buff_id)
+            self._save()
+
+    def remove_source(self, source):
+        """ Remove all buffs added with `source`. """
+        buff_ids = [buff_id for buff_id, buff in self._buffs.items() if buff.source == source]
+        for buff_id in buff_ids:
+            self._remove(buff_id)
+        if buff_ids:
+            self._save()
+
+    def clear(self):
+        """ Remove all buffs. """
+        self._buffs.clear()
+        self._totals.clear()
+        self._save()
+
+    def get(self, category, versus=None):
+        """
+        Get the total modifier to a stat.
+
+        Args:
+            category (str): The stat, like "attack" or "armor".
+            versus (Object, optional): The opponent, to also count buffs against them.
+
+        """
+        BUFF_WHEEL.advance()
+        total = self._totals.get(category, 0)
+        if versus is not None:
+            total += self._totals.get((category, versus.id), 0)
+        return total
+
+    def all(self):
+        """ Get all active buffs, soonest to expire first and permanent ones last. """
+        BUFF_WHEEL.advance()
+        return sorted(self._buffs.values(), key=lambda buff: buff.expires or math.inf)
+
+    def __bool__(self):
+        BUFF_WHEEL.advance()
+        return bool(self._buffs)
 
-    def add_buff(self, category, amount, versus=None, duration=0):
-        """ Apply buff to character. """
-        # TODO Implement
 
-    def remove_buff(self):
-        """ Remove buff from character. """
+BUFF_WHEEL = TimingWheel()
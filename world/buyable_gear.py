@@ -0,0 +1,91 @@
+"""
+The gear shop keepers have on offer for a character.
+
+Shop keepers spawn stock for every character that shops with them, which stays in their
+inventory until bought. Each character only keeps the stock of the last few shop keepers they
+visited, and only for so long. Unbought stock that is let go of is deleted right away, rather
+than lingering until the shop keeper's stock expires.
+
+Stock is let go of when:
+
+- more shop keepers were visited than are kept, starting with the least recently visited one,
+- it's older than the time it's kept for, checked when it's asked for and when leaving a shop.
+  The stock of the shop being browsed isn't expired while asked for though, so it doesn't
+  vanish from under an open menu,
+- it's cleared, like when the character logs off or at the hourly restock.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+from django.db import transaction
+
+# most shop keepers to keep stock from, per character
+BUYABLE_GEAR_SIZE = 5
+# how long stock is kept, in seconds
+BUYABLE_GEAR_TTL = 60 * 60
+
+
+def reclaim(vendor, items):
+    """ Delete the items the vendor still holds. """
+    unbought = [item for item in items if getattr(item, "location", None) == vendor]
+    if unbought:
+        with transaction.atomic():
+            for item in unbought:
+                item.delete()
+
+
+class BuyableGear(MutableMapping):
+    """
+    Stock by shop keeper, least recently visited first.
+    """
+
+    def __init__(self, size=BUYABLE_GEAR_SIZE, ttl=BUYABLE_GEAR_TTL, shopping_at=None):
+        self.size = size
+        self.ttl = ttl
+        # gets the vendor whose shop menu is open, if any
+        self.shopping_at = shopping_at or (lambda: None)
+        # vendor: (stocked at, items)
+        self.entries = OrderedDict()
+
+    def _expired(self, stocked_at, now=None):
+        return (time.time() if now is None else now) - stocked_at > self.ttl
+
+    def __getitem__(self, vendor):
+        stocked_at, items = self.entries[vendor]
+        if self._expired(stocked_at) and vendor != self.shopping_at():
+            del self[vendor]
+            raise KeyError(vendor)
+        self.entries.move_to_end(vendor)
+        return items
+
+    def __setitem__(self, vendor, items):
+        if (entry := self.entries.pop(vendor, None)) is not None and entry[1] is not items:
+            reclaim(vendor, entry[1])
+        self.entries[vendor] = (time.time(), items)
+        while len(self.entries) > self.size:
+            evicted, (_, evicted_items) = self.entries.popitem(last=False)
+            reclaim(evicted, evicted_items)
+
+    def __delitem__(self, vendor):
+        _, items = self.entries.pop(vendor)
+        reclaim(vendor, items)
+
+    def __iter__(self):
+        return iter(list(self.entries))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self, keep=()):
+        """ Let go of all stock, except that of the vendors in `keep`. """
+        for vendor in list(self.entries):
+            if vendor not in keep:
+                del self[vendor]
+
+    def prune(self, now=None):
+        """ Let go of the stock that is older than it's kept for. """
+        for vendor, (stocked_at, _) in list(self.entries.items()):
+            if self._expired(stocked_at, now):
+                del self[vendor]
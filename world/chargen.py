@@ -329,7 +329,9 @@ Backpack: {', '.join((str(eq) for eq in self.backpack))}
             " perm(Admin)"
         )
 
-        self._add_gear_to_new_character(new_character)
+        # every item equipped or put in the backpack rewrites the inventory Attribute
+        with new_character.attributes.batch():
+            self._add_gear_to_new_character(new_character)
 
         return new_character
 
@@ -2,8 +2,11 @@
 Combat Rules engine.
 """
 
+from types import MappingProxyType
 from typing import Self, TYPE_CHECKING
 from world import rules
+from world.messages import COMBAT_MESSAGES
+from world.threat import ThreatTable
 
 from .enums import CombatRange, AttackType
 
@@ -18,6 +21,29 @@ _MAX_RANGE = max(en.value for en in CombatRange)
 # health, mana, current attack cooldown
 COMBAT_PROMPT = "HP {hp} - MP {mana} - SP {stamina}"
 
+# Combat numbers. These are shared with the offline balance simulator in
+# world.simulation.combat, so tune them here rather than inline.
+AGGRO_MULTIPLIERS = MappingProxyType({
+    "defensive": 0.5,
+    "aggressive": 1.5,
+})
+MELEE_DEFENSE_BASE = 10
+RANGED_DEFENSE_BASE = 5
+RANGE_PENALTY = 2
+THROWN_STAMINA_COST = 4
+THROWN_COOLDOWN = 4
+DEFENSE_STAMINA_COST = 2
+BLOCK_COOLDOWN_PENALTY = 1
+BLOCK_ATTACK_BUFF = 2
+
+
+def apply_aggro(value: int, aggro: str) -> int:
+    """ Scale a damage or stamina value by an aggro stance, rounding down. """
+    if multiplier := AGGRO_MULTIPLIERS.get(aggro):
+        return int(value * multiplier)
+
+    return value
+
 class AttackRules:
     """
     Class to determine whether or not an attacker can attack a target.
@@ -130,31 +156,25 @@ class CombatRules:
 
     def get_attack_stamina_cost(self, attacker, _attack_type, base_cost):
         """ Get stamina cost for attacker. """
-        if attacker.aggro == "aggressive":
-            cost = int(base_cost * 1.5)
-        elif attacker.aggro == "defensive":
-            cost = int(base_cost / 2)
-        else:
-            cost = base_cost
-
-        return cost
+        return apply_aggro(base_cost, attacker.aggro)
 
     def get_defense_stamina_cost(self, _attacker, _attack_type, _base_cost, _target):
         """ Get stamina cost to defender (maybe unused?). """
-        return 2  # TODO FIXME update this
+        return DEFENSE_STAMINA_COST  # TODO FIXME update this
 
 class CombatHandler:
     """
     Main class for handling combat.
     """
 
-    __slots__ = ('positions', 'rules')
+    __slots__ = ('positions', 'rules', 'threat')
 
     rules_class = CombatRules
 
     def __init__(self, attacker, target, custom_rules=None):
         self.rules = custom_rules(self) if custom_rules else self.rules_class(self)
         self.positions: dict['BaseCharacter', CombatRange] = {}
+        self.threat = ThreatTable()
         self.add(attacker)
         self.add(target)
 
@@ -197,6 +217,7 @@ class CombatHandler:
 
 
         del self.positions[fighter]
+        self.threat.remove(fighter)
         if fighter.combat == self:
             fighter.combat = None
 
@@ -209,10 +230,12 @@ class CombatHandler:
         Merge another combat instance into this one
         """
         self.positions.update(other.positions)
+        self.threat.merge(other.threat)
         for obj in other.positions.keys():
             obj.combat = self
 
         other.positions = {}
+        other.threat.clear()
 
     def update(self):
         """ Check to see if we need to end combat. """
@@ -233,6 +256,7 @@ class CombatHandler:
                 pass
 
         self.positions = {}
+        self.threat.clear()
 
     @property
     def is_finished(self) -> bool:
@@ -277,6 +301,47 @@ class CombatHandler:
             if abs(a_pos - p) <= combat_range and c != attacker
         )
 
+    def get_target(self, fighter: 'BaseCharacter', combat_range: CombatRange | None = None):
+        """
+        Pick who `fighter` should attack: the opponent they hold the most threat against,
+        otherwise the closest opponent. Only opponents within `combat_range` count, if given.
+        """
+        assert fighter in self.positions, f"Fighter {fighter} is not in combat!"
+
+        def reachable(target):
+            return target in self.positions and (
+                combat_range is None or self.in_range(fighter, target, combat_range)
+            )
+
+        if (target := self.threat.top(fighter, reachable)) is not None:
+            return target
+
+        others = [other for other in self.positions if other != fighter]
+        # the other side, PCs against mobs, unless everyone is on the same side, as in PvP
+        opponents = [other for other in others if other.is_pc != fighter.is_pc] or others
+        position = self.positions[fighter]
+        return min(
+            filter(reachable, opponents),
+            key=lambda other: abs(self.positions[other] - position),
+            default=None,
+        )
+
+    def deal_damage(self, attacker: 'BaseCharacter', target: 'BaseCharacter', damage: int):
+        """
+        Apply damage from an attack, and the threat that comes with it.
+        """
+        # the target wants revenge, and the attacker keeps after the same target
+        self.threat.add(target, attacker, damage)
+        self.threat.add(attacker, target, damage)
+        target.at_damage(damage, attacker)
+
+    def at_heal(self, healer: 'BaseCharacter', healed: 'BaseCharacter', amount: int):
+        """
+        Called when someone in the fight is healed. The healed's opponents take note.
+        """
+        if healer in self.positions:
+            self.threat.add_healing(healer, healed, amount)
+
     def approach(self, mover: 'BaseCharacter', target: 'BaseCharacter') -> bool:
         """
         Move a combatant towards the target.
@@ -327,7 +392,7 @@ class CombatHandler:
         range_to_target = self.get_range(attacker, target)
         # Check to see if the target is using a shield
         #   their Block zone matches the Attacker's target zone
-        if target.shield is not None:
+        if target.shield:
             blocked = True
 
         # Check if target is wielding something that can parry,
@@ -346,15 +411,20 @@ class CombatHandler:
             if target_defense_stamina_cost < target.stamina:
                 target.spend_stamina(target_defense_stamina_cost)
                 if range_to_target == CombatRange.MELEE:
-                    attacker.cooldowns.add("attack", attacker.weapon.cooldown + 1)
-                    target.buffs.add_buff("attack", 2, versus=attacker, duration=1)
+                    attacker.cooldowns.add(
+                        "attack", attacker.weapon.cooldown + BLOCK_COOLDOWN_PENALTY
+                    )
+                    target.buffs.add_buff(
+                        "attack", BLOCK_ATTACK_BUFF, versus=attacker, duration=1
+                    )
 
                 if blocked:
                     blocking_item = target.shield
                 else:
                     blocking_item = target.weapon
 
-                target.location.msg_contents(
+                COMBAT_MESSAGES.msg_contents(
+                    target.location,
                     "$You() $conj(block) the attack with $pron(your) {blocking_item}.",
                     mapping={"blocking_item": blocking_item},
                     from_obj=target,
@@ -381,21 +451,24 @@ class CombatHandler:
         if self._is_attack_blocked_or_parried(attacker, target, AttackType.MELEE):
             return 0
 
-        attack_roll = rules.dice.roll("1d20") + attacker.get_ability(weapon.attack_type)
-        if attack_roll >= target.armor + 10:
+        attack_roll = (
+            rules.dice.roll("1d20")
+            + attacker.get_ability(weapon.attack_type)
+            + attacker.buffs.get("attack", versus=target)
+        )
+        armor = target.armor + target.buffs.get("armor", versus=attacker)
+        if attack_roll >= armor + MELEE_DEFENSE_BASE:
             damage = rules.dice.roll(weapon.damage_roll) + attacker.get_ability(weapon.attack_type)
 
-            # multiply the result by the Attackers Aggression factor (round up)
-            if attacker.aggro == "defensive":
-                damage = int(damage / 2)
-            elif attacker.aggro == "aggressive":
-                damage = int(damage * 1.5)
+            # multiply the result by the Attackers Aggression factor
+            damage = apply_aggro(damage, attacker.aggro)
 
             # Subtract off the Target's armor, if any.
-            if target.armor:
-                damage = damage - target.armor
+            if armor:
+                damage = damage - armor
                 if damage <= 0:
-                    attacker.location.msg_contents(
+                    COMBAT_MESSAGES.msg_contents(
+                        attacker.location,
                         "$pron(your) attack fails to pierce {target}'s {armor}.",
                         mapping={"target": target, "armor": target.armor},
                         from_obj=attacker,
@@ -403,16 +476,18 @@ class CombatHandler:
                     return 0
 
             # apply the remainder to the Targets Health
-            attacker.location.msg_contents(
+            COMBAT_MESSAGES.msg_contents(
+                attacker.location,
                 "$You() $conj(hit) {target} with $pron(your) {weapon}.",
                 mapping={"target": target, "weapon": weapon or "fists"},
                 from_obj=attacker,
             )
-            target.at_damage(damage, attacker)
+            self.deal_damage(attacker, target, damage)
 
             return damage
 
-        target.location.msg_contents(
+        COMBAT_MESSAGES.msg_contents(
+            target.location,
             "$You() $conj(dodge) the attack.",
             from_obj=target,
         )
@@ -441,30 +516,33 @@ class CombatHandler:
         if self._is_attack_blocked_or_parried(attacker, target, AttackType.RANGED):
             return 0
 
-        attack_roll = rules.dice.roll("1d20") + attacker.get_ability(weapon.attack_type)
+        attack_roll = (
+            rules.dice.roll("1d20")
+            + attacker.get_ability(weapon.attack_type)
+            + attacker.buffs.get("attack", versus=target)
+        )
+        armor = target.armor + target.buffs.get("armor", versus=attacker)
         target_size_penalty = 0
         if self.in_range(attacker, target, CombatRange.SHORT_RANGE):
             range_penalty = 0
         else:
             # TODO Determine penalty
-            range_penalty = 2
+            range_penalty = RANGE_PENALTY
 
-        defense_roll = 5 + target_size_penalty + range_penalty
+        defense_roll = RANGED_DEFENSE_BASE + target_size_penalty + range_penalty
         if attack_roll >= defense_roll:
             damage = rules.dice.roll(damage_roll)
             damage += attacker.strength
 
-            # multiply the result by the Attackers Aggression factor (round up)
-            if attacker.aggro == "defensive":
-                damage = int(damage / 2)
-            elif attacker.aggro == "aggressive":
-                damage = int(damage * 1.5)
+            # multiply the result by the Attackers Aggression factor
+            damage = apply_aggro(damage, attacker.aggro)
 
             # Subtract off the Target's armor, if any.
-            if target.armor:
-                damage = damage - target.armor
+            if armor:
+                damage = damage - armor
                 if damage <= 0:
-                    attacker.location.msg_contents(
+                    COMBAT_MESSAGES.msg_contents(
+                        attacker.location,
                         "$pron(your) attack fails to pierce {target}'s {armor}.",
                         mapping={"target": target, "armor": target.armor},
                         from_obj=attacker,
@@ -472,16 +550,18 @@ class CombatHandler:
                     return 0
 
             # apply the remainder to the Targets Health
-            attacker.location.msg_contents(
+            COMBAT_MESSAGES.msg_contents(
+                attacker.location,
                 "$You() $conj(shoot) {target} with $pron(your) {weapon}.",
                 mapping={"target": target, "weapon": weapon},
                 from_obj=attacker,
             )
-            target.at_damage(damage, attacker)
+            self.deal_damage(attacker, target, damage)
 
             return damage
 
-        target.location.msg_contents(
+        COMBAT_MESSAGES.msg_contents(
+            target.location,
             "$You() $conj(dodge) the attack.",
             from_obj=target,
         )
@@ -499,8 +579,8 @@ class CombatHandler:
 
         if attacker.weapon.is_throwable is not None:
             # set the Base Physical Damage Range to 1-2 and the Base Stamina Cost to 4.
-            stamina_cost = 4
-            cooldown = 4
+            stamina_cost = THROWN_STAMINA_COST
+            cooldown = THROWN_COOLDOWN
         else:
             stamina_cost = weapon.stamina_cost
             cooldown = weapon.cooldown
@@ -516,30 +596,33 @@ class CombatHandler:
         if self._is_attack_blocked_or_parried(attacker, target, AttackType.THROWN):
             return 0
 
-        attack_roll = rules.dice.roll("1d20") + attacker.get_ability(weapon.attack_type)
+        attack_roll = (
+            rules.dice.roll("1d20")
+            + attacker.get_ability(weapon.attack_type)
+            + attacker.buffs.get("attack", versus=target)
+        )
+        armor = target.armor + target.buffs.get("armor", versus=attacker)
         target_size_penalty = 0
         if self.in_range(attacker, target, CombatRange.SHORT_RANGE):
             range_penalty = 0
         else:
             # TODO Determine penalty
-            range_penalty = 2
+            range_penalty = RANGE_PENALTY
 
-        defense_roll = 5 + target_size_penalty + range_penalty
+        defense_roll = RANGED_DEFENSE_BASE + target_size_penalty + range_penalty
         if attack_roll >= defense_roll:
             damage = rules.dice.roll(damage_roll)
             damage += attacker.cunning
 
-            # multiply the result by the Attackers Aggression factor (round up)
-            if attacker.aggro == "defensive":
-                damage = int(damage / 2)
-            elif attacker.aggro == "aggressive":
-                damage = int(damage * 1.5)
+            # multiply the result by the Attackers Aggression factor
+            damage = apply_aggro(damage, attacker.aggro)
 
             # Subtract off the Target's armor, if any.
-            if target.armor:
-                damage = damage - target.armor
+            if armor:
+                damage = damage - armor
                 if damage <= 0:
-                    attacker.location.msg_contents(
+                    COMBAT_MESSAGES.msg_contents(
+                        attacker.location,
                         "$pron(your) attack fails to pierce {target}'s {armor}.",
                         mapping={"target": target, "armor": target.armor},
                         from_obj=attacker,
@@ -547,16 +630,18 @@ class CombatHandler:
                     return 0
 
             # apply the remainder to the Targets Health
-            attacker.location.msg_contents(
+            COMBAT_MESSAGES.msg_contents(
+                attacker.location,
                 "$You() $conj(hit) {target} with $pron(your) thrown {weapon}.",
                 mapping={"target": target, "weapon": weapon},
                 from_obj=attacker,
             )
-            target.at_damage(damage, attacker)
+            self.deal_damage(attacker, target, damage)
 
             return damage
 
-        target.location.msg_contents(
+        COMBAT_MESSAGES.msg_contents(
+            target.location,
             "$You() $conj(dodge) the attack.",
             from_obj=target,
         )
@@ -1,21 +1,95 @@
-""" Utility methods for all Dialog using tracery. """
+"""
+Utility methods for all Dialog using tracery.
+
+Building a grammar means reading its data files and parsing every rule, so each data file is
+only read once, and each dialog class keeps one grammar per variant (like the target's gender).
+Anything that changes per shout, like the target's name or a random number, is pushed onto the
+grammar's symbols for a single expansion instead. Since a grammar is shared, and lines can be
+generated in a worker thread (see `pool`), only one expansion happens at a time.
+"""
 
 import os
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+import tracery
+from tracery.modifiers import base_english
+
+DATA_DIR = f"{os.path.dirname(os.path.realpath(__file__))}/data"
+
+_EXPANSION_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def load_lines(filename):
+    """ Read a data file once, returning its stripped lines. """
+    with open(f"{DATA_DIR}/{filename}.txt", "r", encoding="utf-8") as f:
+        return tuple(line.strip() for line in f.readlines())
+
 
 # pylint: disable=too-few-public-methods
-class DialogBase:
+class DialogBase(ABC):
     """ Utility methods for all Dialog using tracery. """
 
     def _load_file(self, filename, gender="none", pronoun_type="none"):
-        filename = f"{os.path.dirname(os.path.realpath(__file__))}/data/{filename}.txt"
-        with open(filename, "r", encoding="utf-8") as f:
-            data = [
-                line.strip().replace(
-                    "$pronoun$", f"#.pronoun({gender},{pronoun_type})#"
-                ) for line in f.readlines()
-            ]
-
-        return data
+        return [
+            line.replace("$pronoun$", f"#.pronoun({gender},{pronoun_type})#")
+            for line in load_lines(filename)
+        ]
+
+    @abstractmethod
+    def _rules(self):
+        """ The raw rules of this dialog's variant, by symbol. """
+
+    def _modifiers(self):
+        """ Modifiers the rules use, on top of tracery's English ones. """
+        return {}
+
+    def _build_grammar(self):
+        """ Build the grammar of this dialog's variant. """
+        grammar = tracery.Grammar(self._rules())
+        grammar.add_modifiers(base_english)
+        grammar.add_modifiers(self._modifiers())
+        return grammar
+
+    def _variant(self):
+        """ What the grammar of this dialog depends on, besides the data files. """
+        return None
+
+    def _grammar(self):
+        """ The grammar of this dialog's variant, built the first time it's needed. """
+        cls = type(self)
+        # variant: grammar, kept on each subclass itself
+        grammars = cls.__dict__.get("_grammars")
+        if grammars is None:
+            grammars = cls._grammars = {}
+        if (grammar := grammars.get(variant := self._variant())) is None:
+            grammar = grammars[variant] = self._build_grammar()
+        return grammar
+
+    def _flatten(self, rule, bindings):
+        """
+        Expand `rule` with the symbols in `bindings` set for this expansion only.
+
+        Args:
+            rule (str): The rule to expand.
+            bindings (dict): Symbol: raw rules, for the symbols that change per expansion.
+
+        Returns:
+            str: The expanded text.
+
+        """
+        with _EXPANSION_LOCK:
+            grammar = self._grammar()
+            for key, raw_rules in bindings.items():
+                grammar.push_rules(key, raw_rules)
+            try:
+                return grammar.flatten(rule)
+            finally:
+                # drops the pushed rules, and the record of every rule used
+                grammar.clear_state()
+                grammar.errors.clear()
 
     def _pos(self, text, *_params):
         if text[-1] == "s":
@@ -2,9 +2,6 @@
 
 from random import randrange
 
-import tracery
-from tracery.modifiers import base_english
-
 from .dialog_base import DialogBase
 
 # pylint: disable=too-few-public-methods
@@ -12,7 +9,15 @@ class Insult(DialogBase):
     """ Class for generating insults using tracery. """
     def __init__(self, target):
         self.target = target
-        self.rules = {
+
+    def _variant(self):
+        return self.target.gender
+
+    def _modifiers(self):
+        return self._possessive_modifiers() | self._pronoun_modifiers()
+
+    def _rules(self):
+        return {
             "unsourced_start": self._load_file("unsourced_starts"),
             "sourced_start": self._load_file("sourced_starts"),
             "reputable_source": self._load_file("reputable_sources"),
@@ -103,7 +108,7 @@ class Insult(DialogBase):
                 "#intransitive_action#",
                 "#transitive_action#",
                 "#borrowed_action#",
-                f"promised to buy {randrange(10,100)} #object_phys.s# from #indifferent_victim#"
+                "promised to buy #amount# #object_phys.s# from #indifferent_victim#"
                     " but then never paid",
                 "#friendly_verb# #bad_guy#",
                 "tried to sell #bad_thing# to #indifferent_victim#",
@@ -112,14 +117,14 @@ class Insult(DialogBase):
                 "puts #bad_ingredient# on #good_food#"
             ],
 
+            # bound per insult
+            "amount": "",
+
             "story": "#story_start#"
         }
 
     def generate_insult(self):
         """ Generates an insult based on the tracery grammar. """
-        grammar = tracery.Grammar(self.rules)
-        grammar.add_modifiers(base_english)
-        grammar.add_modifiers(self._possessive_modifiers())
-        grammar.add_modifiers(self._pronoun_modifiers())
-
-        return grammar.flatten(f"#story# {self.target} #action#!")
+        return self._flatten(
+            f"#story# {self.target} #action#!", {"amount": str(randrange(10, 100))}
+        )
@@ -0,0 +1,118 @@
+"""
+Pools of pre-generated dialog lines.
+
+Expanding a grammar, especially the deeply nested insult one, is slow enough to notice when a
+lot of NPCs shout at once. So lines are generated ahead of time in a worker thread, with a
+placeholder where the target's name goes, and a shout only has to take one and put the name in.
+
+There is a pool per dialog class, method and grammar variant (like the target's gender). When a
+pool runs low it is refilled in the background. When it runs dry, a line is generated on the
+spot instead.
+"""
+
+from collections import deque
+
+from twisted.internet.threads import deferToThread
+
+# stands in for the target's name in pooled lines
+TARGET = "$target$"
+# lines generated per refill
+POOL_SIZE = 20
+# refill when fewer lines than this are left
+LOW_WATER = 5
+
+
+# pylint: disable=too-few-public-methods
+class PlaceholderTarget:
+    """ Target to generate lines with, having only what dialog needs from a target. """
+
+    __slots__ = ("gender",)
+
+    def __init__(self, gender):
+        self.gender = gender
+
+    def __str__(self):
+        return TARGET
+
+
+class LinePool:
+    """
+    Pre-generated lines of one dialog method, for one grammar variant.
+    """
+
+    __slots__ = ("dialog", "method", "lines", "refilling", "size", "low_water")
+
+    def __init__(self, dialog, method, size=POOL_SIZE, low_water=LOW_WATER):
+        # the dialog, made for a placeholder target
+        self.dialog = dialog
+        self.method = method
+        self.lines = deque()
+        self.refilling = False
+        self.size = size
+        self.low_water = low_water
+
+    def _generate(self, amount):
+        """ Generate lines, in a worker thread. """
+        generate = getattr(self.dialog, self.method)
+        return [generate() for _ in range(amount)]
+
+    def _refilled(self, lines):
+        """ Back on the reactor, add the generated lines. """
+        self.lines.extend(lines)
+
+    def _done(self, result):
+        """ Allow refilling again, whether the refill worked or not. """
+        self.refilling = False
+        return result
+
+    def refill(self):
+        """ Top the pool back up in a worker thread, unless that's already happening. """
+        if self.refilling:
+            return
+        self.refilling = True
+        deferred = deferToThread(self._generate, self.size - len(self.lines))
+        deferred.addCallback(self._refilled)
+        deferred.addBoth(self._done)
+
+    def take(self, target):
+        """
+        Take a line for `target`.
+
+        Args:
+            target (Object): Who the line is for.
+
+        Returns:
+            str: The line, with the target's name filled in.
+
+        """
+        if self.lines:
+            line = self.lines.popleft()
+        else:
+            line = self._generate(1)[0]
+        if len(self.lines) < self.low_water:
+            self.refill()
+        return line.replace(TARGET, str(target))
+
+
+# (dialog class, method, variant): pool
+_POOLS = {}
+
+
+def take_line(dialog_cls, method, target):
+    """
+    Take a pre-generated line of dialog for `target`.
+
+    Args:
+        dialog_cls (type): The `DialogBase` subclass to generate lines with.
+        method (str): The method of `dialog_cls` generating a line.
+        target (Object): Who the line is for.
+
+    Returns:
+        str: The line.
+
+    """
+    dialog = dialog_cls(PlaceholderTarget(getattr(target, "gender", "none")))
+    key = (dialog_cls, method, dialog._variant())  # pylint: disable=protected-access
+    if (pool := _POOLS.get(key)) is None:
+        pool = _POOLS[key] = LinePool(dialog, method)
+    return pool.take(target)
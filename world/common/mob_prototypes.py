@@ -15,6 +15,8 @@ BASE_MOB_GOBLIN = {
 MOB_GOBLIN_WEAK = {
     "prototype_parent": "base_mob_goblin",
     "prototype_key": "mob_goblin_weak",
+    # trash mobs only last one fight, there's nothing worth saving about them
+    "typeclass": "typeclasses.mobs.mob.EphemeralMob",
     "prototype_tags": [("trash", "archetype"),],
     "key": "small goblin",
     "cclass_key": "rogue",
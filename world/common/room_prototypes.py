@@ -12,3 +12,9 @@ CONTROL_STATION_7_ROOM = {
     "prototype_key": "control_station_7_xyz_room",
     "typeclass": "typeclasses.rooms.TownRoom",
 }
+
+FORBIDDEN_ZONE_GATE_ROOM = {
+    "prototype_parent": "control_station_7_xyz_room",
+    "prototype_key": "forbidden_zone_gate_xyz_room",
+    "typeclass": "typeclasses.rooms.ForbiddenZoneGate",
+}
@@ -0,0 +1,300 @@
+"""
+Procedural dungeon instances out in the Forbidden Zone.
+
+Every instance is a grid of `width` by `height` cells whose layout is generated from a seed, so
+the layout itself is never stored: the same seed always gives the same maze. Rooms are only
+created once an exit leads to them, and a room only gets its exits once a player first walks
+into it, so an instance costs a handful of objects until someone actually explores it.
+
+Everyone going through a gate within `DUNGEON_JOIN_WINDOW` seconds of each other ends up in the
+same instance, so a group walking in one at a time isn't split up.
+
+Instances are persistent scripts. Each checks every `DUNGEON_GC_INTERVAL` seconds if any player
+is still inside, and if not, the whole instance collapses: mobs go back to the mob pool and
+everything else is deleted. Players that logged off inside were already taken off the grid, so
+they log back in at the gate instead of in a room that no longer exists.
+"""
+
+import random
+import time
+from functools import lru_cache
+
+from evennia.utils.containers import GLOBAL_SCRIPTS
+from evennia.utils.create import create_object, create_script
+from evennia.utils.search import search_tag
+from evennia.utils.utils import inherits_from, lazy_property
+from evennia.typeclasses.attributes import AttributeProperty
+
+from typeclasses.scripts import Script
+from world.mob_pool import mob_pool
+from world.occupancy import occupancy
+
+DUNGEON_WIDTH = 12
+DUNGEON_HEIGHT = 12
+DUNGEON_GC_INTERVAL = 60
+# how long after a dungeon is created others going through the same gate still end up in it
+DUNGEON_JOIN_WINDOW = 60 * 5
+DUNGEON_ENCOUNTER_CELL_SIZE = 3
+# share of extra passages added on top of the maze, so it isn't all dead ends
+DUNGEON_LOOP_CHANCE = 0.1
+DUNGEON_TAG_CATEGORY = "dungeon"
+
+# direction: (dx, dy, opposite direction)
+DIRECTIONS = {
+    "north": (0, 1, "south"),
+    "east": (1, 0, "west"),
+    "south": (0, -1, "north"),
+    "west": (-1, 0, "east"),
+}
+
+ROOM_DESCRIPTIONS = (
+    (
+        "Rusted Culvert",
+        "A storm drain big enough to stand in, its walls crusted with red dust and something "
+        "that might once have been moss. Water drips somewhere in the dark.",
+    ),
+    (
+        "Collapsed Hab-Unit",
+        "Half a prefab home, the other half buried under a dune. A child's toy lies melted "
+        "into the floor, next to a very recent set of footprints.",
+    ),
+    (
+        "Skeletal Grove",
+        "Trees twisted by fallout claw at the bruised purple sky. Their bark is warm to the "
+        "touch, and occasionally it twitches.",
+    ),
+    (
+        "Crashed Freighter Hold",
+        "The cargo bay of a long dead freighter, its crates pried open and picked clean. The "
+        "hull groans every time the wind picks up.",
+    ),
+    (
+        "Sludge Flats",
+        "Ankle deep toxic sludge stretches out in every direction, bubbling lazily. It smells "
+        "exactly as bad as it looks.",
+    ),
+    (
+        "Barbarian Camp",
+        "A ring of scorched tires around a cold fire pit, decorated with bones of things that "
+        "were never quite human. Whoever lives here isn't home. Yet.",
+    ),
+    (
+        "Sensor Wreck",
+        "A toppled sensor array from Control Station 7, still emitting a low, broken hum. "
+        "Someone has been using it for target practice.",
+    ),
+    (
+        "Dune Hollow",
+        "A hollow between rust-colored dunes, sheltered from the wind. The sand here is "
+        "suspiciously well trodden.",
+    ),
+)
+
+
+@lru_cache(maxsize=32)
+def generate_layout(seed, width, height):
+    """
+    Generate the layout of a dungeon: a maze over the whole grid, with a few loops thrown in.
+
+    Args:
+        seed (int): The dungeon's seed.
+        width (int): Number of cells along x.
+        height (int): Number of cells along y.
+
+    Returns:
+        dict: The directions that lead out of each `(x, y)` cell.
+
+    """
+    rng = random.Random(seed)
+    passages = {(x, y): set() for x in range(width) for y in range(height)}
+
+    def neighbors(cell):
+        for direction, (dx, dy, opposite) in DIRECTIONS.items():
+            if (neighbor := (cell[0] + dx, cell[1] + dy)) in passages:
+                yield direction, opposite, neighbor
+
+    # randomized depth-first search, which gives a spanning tree of long winding corridors
+    start = entrance_cell(height)
+    visited = {start}
+    stack = [start]
+    while stack:
+        cell = stack[-1]
+        unvisited = [step for step in neighbors(cell) if step[2] not in visited]
+        if not unvisited:
+            stack.pop()
+            continue
+        direction, opposite, neighbor = rng.choice(unvisited)
+        passages[cell].add(direction)
+        passages[neighbor].add(opposite)
+        visited.add(neighbor)
+        stack.append(neighbor)
+
+    for cell in sorted(passages):
+        for direction, opposite, neighbor in neighbors(cell):
+            if direction not in passages[cell] and rng.random() < DUNGEON_LOOP_CHANCE:
+                passages[cell].add(direction)
+                passages[neighbor].add(opposite)
+
+    return {cell: frozenset(directions) for cell, directions in passages.items()}
+
+
+def entrance_cell(height):
+    """ The cell players enter a dungeon at, on its west edge. """
+    return 0, height // 2
+
+
+class DungeonScript(Script):
+    """
+    A single dungeon instance, keeping track of its rooms.
+    """
+
+    seed = AttributeProperty(0)
+    width = AttributeProperty(DUNGEON_WIDTH)
+    height = AttributeProperty(DUNGEON_HEIGHT)
+    # the room players leave the dungeon to
+    origin = AttributeProperty(None)
+    # characters that logged off inside, see `add_linkdead`
+    linkdead = AttributeProperty([])
+
+    @property
+    def zcoord(self):
+        """ The zcoord of the dungeon's rooms, which is also the tag they are found by. """
+        return f"dungeon-{self.dbid}"
+
+    @property
+    def layout(self):
+        """ The passages out of each cell. """
+        return generate_layout(self.seed, self.width, self.height)
+
+    @lazy_property
+    def rooms(self):
+        """ The rooms created so far, by `(x, y)` cell. """
+        return {
+            tuple(room.xyz[:2]): room
+            for room in search_tag(self.zcoord, category=DUNGEON_TAG_CATEGORY)
+        }
+
+    def at_start(self, **kwargs):
+        """ Encounter zones outside of the xyzgrid have to be added again after every reload. """
+        GLOBAL_SCRIPTS.encounters.add_zone(
+            self.zcoord, self.width, self.height, DUNGEON_ENCOUNTER_CELL_SIZE
+        )
+
+    @property
+    def joinable(self):
+        """ If players going through the gate should still end up in this dungeon. """
+        # disable pylint on this as it's a django field
+        created = self.db_date_created.timestamp()  # pylint: disable=no-member
+        return time.time() - created < DUNGEON_JOIN_WINDOW
+
+    def add_linkdead(self, character):
+        """ Called when `character` logs off inside the dungeon, and so leaves the grid. """
+        self.linkdead = [*self.linkdead, character]
+
+    def at_repeat(self, **kwargs):
+        """ Collapse the dungeon once nobody is playing in it anymore. """
+        if not any(occupancy.players_in(room) for room in self.rooms.values()):
+            self.collapse()
+
+    def room_at(self, cell):
+        """
+        Get the room of a cell, creating it if it doesn't exist yet.
+
+        Args:
+            cell (tuple): An `(x, y)` cell of this dungeon.
+
+        Returns:
+            DungeonRoom: The room, which may not have any exits yet.
+
+        """
+        if room := self.rooms.get(cell):
+            return room
+
+        x, y = cell
+        key, desc = random.Random(f"{self.seed}:{x}:{y}").choice(ROOM_DESCRIPTIONS)
+        room = self.rooms[cell] = create_object(
+            "typeclasses.rooms.DungeonRoom",
+            key=key,
+            tags=[(self.zcoord, DUNGEON_TAG_CATEGORY)],
+            attributes=[("desc", desc), ("xyz", (x, y, self.zcoord)), ("dungeon", self)],
+        )
+        return room
+
+    def explore(self, room):
+        """
+        Create the exits out of `room`, and with them the rooms they lead to.
+
+        Args:
+            room (DungeonRoom): A room of this dungeon that hasn't been explored yet.
+
+        """
+        x, y, _ = room.xyz
+        for direction in sorted(self.layout[(x, y)]):
+            dx, dy, _ = DIRECTIONS[direction]
+            create_object(
+                "typeclasses.exits.Exit",
+                key=direction,
+                aliases=[direction[0]],
+                location=room,
+                destination=self.room_at((x + dx, y + dy)),
+            )
+
+        if (x, y) == entrance_cell(self.height) and self.origin:
+            create_object(
+                "typeclasses.exits.Exit",
+                key="leave",
+                aliases=["gate", "out"],
+                location=room,
+                destination=self.origin,
+            )
+
+        room.explored = True
+
+    def collapse(self):
+        """ Get everyone out of the dungeon and delete it, rooms, exits and all. """
+        room_ids = {room.id for room in self.rooms.values()}
+        for character in self.linkdead:
+            # those that logged back in since are on the grid again, and moved out below
+            if (character and character.location is None
+                    and getattr(character.db.prelogout_location, "id", None) in room_ids):
+                character.db.prelogout_location = self.origin
+
+        for room in self.rooms.values():
+            for obj in room.contents:
+                if getattr(obj, "is_pc", False):
+                    obj.move_to(self.origin, quiet=True, move_type="teleport")
+                elif not (inherits_from(obj, "typeclasses.mobs.mob.BaseMob")
+                          and mob_pool.release(obj)):
+                    obj.delete()
+            room.delete()
+
+        GLOBAL_SCRIPTS.encounters.remove_zone(self.zcoord)
+        self.delete()
+
+
+def create_dungeon(origin, seed=None):
+    """
+    Create a new dungeon instance, with encounters waiting all over it.
+
+    Args:
+        origin (Room): Where players come from, and are sent back to when the dungeon collapses.
+        seed (int, optional): Seed of the layout. A random one by default.
+
+    Returns:
+        DungeonScript: The new dungeon. Its entrance room is
+            `dungeon.room_at(entrance_cell(dungeon.height))`.
+
+    """
+    if seed is None:
+        seed = random.getrandbits(32)
+
+    dungeon = create_script(
+        DungeonScript,
+        key="dungeon",
+        interval=DUNGEON_GC_INTERVAL,
+        start_delay=True,
+        persistent=True,
+        attributes=[("seed", seed), ("origin", origin)],
+    )
+    GLOBAL_SCRIPTS.encounters.repopulate(amount=len(dungeon.layout), zcoord=dungeon.zcoord)
+    return dungeon
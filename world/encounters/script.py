@@ -1,97 +1,202 @@
-""" manage spawning encounters. """
-
-# TODO: rewrite this to match deep web dungeons
-# class EncounterScript(Script):
-#     ENCOUNTER_MAX = 49  # The overworld map is about 5280 tiles, 49 gives us a grid of 7 by 7
-#     REPOP_DELAY = 43200  # A day is 86400 seconds divided by 2 for the default game time 2x speed
-#     REPOP_MAX = 12  # This will make our encounters take a few days to max out
-#
-#     encounter_data = AttributeProperty()
-#
-#     @classmethod
-#     def get(cls) -> Self:
-#         try:
-#             script = EncounterScript.objects.get(db_key="encounter_script")
-#         except ObjectDoesNotExist:
-#             logger.info("Creating new instance of Encounter script...")
-#             script = EncounterScript.create(
-#                 key="encounter_script",
-#                 interval=cls.REPOP_DELAY,
-#                 persistent=True,
-#                 autostart=True,
-#             )
-#
-#         return script
-#
-#     def at_script_creation(self):
-#         self.key = "encounter_script"
-#         self.interval = self.REPOP_DELAY
-#         self.persistent = True
-#
-#     def at_repeat(self, **kwargs):
-#         encounter_data = self.encounter_data
-#         if encounter_data is None:
-#             self.encounter_data = {}
-#
-#         amount_encounters = len(self.encounter_data)
-#         if amount_encounters < self.ENCOUNTER_MAX:
-#             amount_needed = min(self.ENCOUNTER_MAX - amount_encounters, self.REPOP_MAX)
-#             self.add_encounters(amount_needed)
-#
-#     def add_encounters(self, amount):
-#         encounter_grid = [[None for _ in range(7)] for _ in range(7)]
-#         for grid_tuple, encounter in self.encounter_data.items():
-#             grid_x, grid_y = grid_tuple
-#             encounter_grid[grid_y][grid_x] = encounter
-#
-#         for y, row in enumerate(encounter_grid):
-#             for x, encounter in enumerate(row):
-#                 if encounter:
-#                     continue
-#
-#                 encounter = self.add_encounter(x, y)
-#                 encounter_grid[y][x] = encounter
-#                 self.encounter_data[(x, y)] = encounter
-#                 amount -= 1
-#                 if amount <= 0:
-#                     return
-#
-#     def add_encounter(self, grid_x, grid_y) -> dict:
-#         near_border = grid_x <= 1 or grid_x >= 6 or grid_y <= 1 or grid_y >= 6
-#         near_center = abs(3 - grid_x) <= 2 or abs(3 - grid_y) <= 2
-#         if near_border:
-#             encounter_level = 3
-#         elif near_center:
-#             encounter_level = 1
-#         else:
-#             encounter_level = 2
-#
-#         return {"encounter_level": encounter_level}
-#
-#     def get_encounter_at(self, location, map_x, map_y):
-#         encounter_data = self.encounter_data
-#         if not encounter_data:
-#             return
-#
-#         chosen_tuple = None
-#         chosen_encounter = None
-#         for grid_tuple, encounter in self.encounter_data.items():
-#             grid_x, grid_y = grid_tuple
-#             left = grid_x * 100
-#             right = left + 100
-#             top = grid_y * 100
-#             bottom = grid_y + 100
-#             if left < map_x < right and top < map_y < bottom:
-#                 chosen_encounter = encounter
-#                 chosen_tuple = grid_tuple
-#                 break
-#
-#         if chosen_tuple:
-#             players = [
-#                 char for char in location.contents_get(content_type="character") if char.is_pc
-#             ]
-#             self.encounter_data.pop(chosen_tuple)
-#             for encounter_type in ENCOUNTERS.values():
-#                 if chosen_encounter["encounter_level"] >= encounter_type.encounter_level:
-#                     mobs = encounter_type.spawn(location, players=players)
-#                     return mobs
+"""
+manage spawning encounters.
+
+Encounter zones are split into square cells of `cell_size` by `cell_size` map coordinates, and
+each cell can have one encounter waiting in it. Waiting encounters are kept in a spatial hash
+keyed by `(zcoord, cell_x, cell_y)`, so finding the encounter for a room someone just walked
+into is one dict lookup, however many there are. `EncounterScript` fills empty cells back up
+every `REPOP_DELAY` seconds, at most `REPOP_MAX` per repeat.
+
+An xyzgrid map is an encounter zone if its options set "encounter_cell_size". Other zones, like
+dungeon instances, can be added with `EncounterScript.add_zone`.
+"""
+
+import itertools
+import math
+from typing import NamedTuple
+
+from evennia.contrib.grid.xyzgrid.xyzgrid import get_xyzgrid
+from evennia.utils.utils import lazy_property
+
+from typeclasses.scripts import Script
+from world.encounters.data import choose_encounter
+
+_ATTRIBUTE_CATEGORY = "encounters"
+
+
+class EncounterZone(NamedTuple):
+    """ Size of an encounter zone, in cells. """
+
+    columns: int
+    rows: int
+    cell_size: int
+
+
+class EncounterGrid:
+    """
+    Spatial hash of waiting encounters, by zone and cell.
+    """
+
+    __slots__ = ("zones", "pending")
+
+    def __init__(self):
+        self.zones = {}
+        # (zcoord, cell_x, cell_y): encounter level
+        self.pending = {}
+
+    def add_zone(self, zcoord, width, height, cell_size):
+        """
+        Make a zone of `width` by `height` map coordinates an encounter zone.
+        """
+        self.zones[zcoord] = EncounterZone(
+            math.ceil(width / cell_size), math.ceil(height / cell_size), cell_size
+        )
+
+    def remove_zone(self, zcoord):
+        """ Remove a zone and any encounters waiting in it. """
+        if zone := self.zones.pop(zcoord, None):
+            for cell_x, cell_y in itertools.product(range(zone.columns), range(zone.rows)):
+                self.pending.pop((zcoord, cell_x, cell_y), None)
+
+    def cell(self, xyz):
+        """
+        Get the cell a coordinate is in.
+
+        Args:
+            xyz (tuple): An `(x, y, zcoord)` coordinate.
+
+        Returns:
+            tuple or None: The `(zcoord, cell_x, cell_y)` cell, or None if the coordinate isn't
+                in an encounter zone.
+
+        """
+        x, y, zcoord = xyz
+        if (zone := self.zones.get(zcoord)) is None or not isinstance(x, int):
+            return None
+        return zcoord, x // zone.cell_size, y // zone.cell_size
+
+    def empty_cells(self, zcoord=None):
+        """ Iterate over all cells that have no encounter waiting, optionally in one zone. """
+        zones = self.zones.items() if zcoord is None else [(zcoord, self.zones[zcoord])]
+        for zone_zcoord, zone in zones:
+            for cell_x, cell_y in itertools.product(range(zone.columns), range(zone.rows)):
+                if (cell := (zone_zcoord, cell_x, cell_y)) not in self.pending:
+                    yield cell
+
+    def encounter_level(self, cell) -> int:
+        """ Encounters get tougher towards the edges of a zone. """
+        zcoord, cell_x, cell_y = cell
+        zone = self.zones[zcoord]
+        near_border = (
+            cell_x <= 1 or cell_x >= zone.columns - 1 or cell_y <= 1 or cell_y >= zone.rows - 1
+        )
+        near_center = abs(zone.columns // 2 - cell_x) <= 2 or abs(zone.rows // 2 - cell_y) <= 2
+        if near_border:
+            return 3
+        if near_center:
+            return 1
+        return 2
+
+
+class EncounterScript(Script):
+    """
+    Global script keeping track of the encounters waiting in every encounter zone.
+    """
+
+    REPOP_DELAY = 43200  # A day is 86400 seconds divided by 2 for the default game time 2x speed
+    REPOP_MAX = 12  # This will make our encounters take a few days to max out
+
+    @lazy_property
+    def grid(self):
+        """ The encounter grid, with zones from the xyzgrid and waiting encounters loaded. """
+        grid = EncounterGrid()
+        for xymap in get_xyzgrid(print_errors=False).all_maps():
+            if cell_size := (xymap.options or {}).get("encounter_cell_size"):
+                grid.add_zone(xymap.Z, xymap.max_x + 1, xymap.max_y + 1, cell_size)
+
+        for attr in self.attributes.get(category=_ATTRIBUTE_CATEGORY, return_list=True):
+            cell, encounter_level = attr
+            grid.pending[tuple(cell)] = encounter_level
+
+        return grid
+
+    def _attribute_key(self, cell):
+        return ":".join(str(part) for part in cell)
+
+    def at_repeat(self, **kwargs):
+        self.repopulate()
+
+    def add_zone(self, zcoord, width, height, cell_size, populate=False):
+        """
+        Make a zone that isn't on the xyzgrid an encounter zone. Zones added this way are
+        forgotten on reload, so this needs to be called again every time the server starts.
+
+        Args:
+            zcoord (str): The zone's zcoord.
+            width (int): Width of the zone in map coordinates.
+            height (int): Height of the zone in map coordinates.
+            cell_size (int): Size of the zone's cells.
+            populate (bool): Put an encounter in every empty cell of the zone right away.
+
+        """
+        grid = self.grid
+        grid.add_zone(zcoord, width, height, cell_size)
+        if populate:
+            zone = grid.zones[zcoord]
+            self.repopulate(amount=zone.columns * zone.rows, zcoord=zcoord)
+
+    def remove_zone(self, zcoord):
+        """ Remove a zone and all encounters waiting in it. """
+        grid = self.grid
+        cells = [cell for cell in grid.pending if cell[0] == zcoord]
+        grid.remove_zone(zcoord)
+        for cell in cells:
+            self.attributes.remove(self._attribute_key(cell), category=_ATTRIBUTE_CATEGORY)
+
+    def repopulate(self, amount=None, zcoord=None) -> int:
+        """
+        Put new encounters in empty cells.
+
+        Args:
+            amount (int, optional): The most encounters to add, `REPOP_MAX` by default.
+            zcoord (str, optional): Only add encounters to this zone.
+
+        Returns:
+            int: How many were added.
+
+        """
+        grid = self.grid
+        new = []
+        empty_cells = grid.empty_cells(zcoord)
+        for cell in list(itertools.islice(empty_cells, amount or self.REPOP_MAX)):
+            encounter_level = grid.encounter_level(cell)
+            grid.pending[cell] = encounter_level
+            new.append((self._attribute_key(cell), (cell, encounter_level), _ATTRIBUTE_CATEGORY))
+
+        if new:
+            self.attributes.batch_add(*new)
+        return len(new)
+
+    def check_encounter(self, location):
+        """
+        Spring the encounter waiting in the cell of `location`, if there is one.
+
+        Args:
+            location (Room): A room with an `xyz` coordinate, that a player just entered.
+
+        Returns:
+            list: The spawned mobs.
+
+        """
+        xyz = getattr(location, "xyz", None)
+        if not xyz or (cell := self.grid.cell(xyz)) is None:
+            return []
+        if (encounter_level := self.grid.pending.pop(cell, None)) is None:
+            return []
+
+        self.attributes.remove(self._attribute_key(cell), category=_ATTRIBUTE_CATEGORY)
+        if not (encounter_type := choose_encounter(encounter_level)):
+            return []
+
+        players = [obj for obj in location.contents if getattr(obj, "is_pc", False)]
+        return encounter_type.spawn(location, players)
@@ -4,10 +4,13 @@ Knave has a system of Slots for its inventory.
 """
 
 import itertools
+from contextlib import contextmanager
 
+from django.db import transaction
 from evennia import search_object, create_object
+from evennia.utils.dbserialize import deserialize
 from evennia.utils.utils import inherits_from
-from typeclasses.objects import Object, NoneObject, WeaponBareHands
+from typeclasses.objects import Object, ObjectSpec, NoneObject, WeaponBareHands
 
 from .enums import Ability, WieldLocation
 from .utils import obj_order
@@ -185,6 +188,8 @@ class EquipmentHandler:
 
     def __init__(self, obj):
         self.obj = obj
+        # set while in a transaction, saving is put off until the end of it
+        self._in_transaction = False
         self._load()
         self._backpack = BackpackHandler(self.slots[WieldLocation.BACKPACK], self)
         self.backpack_methods = [f for f in dir(BackpackHandler) if not f.startswith('_')]
@@ -227,8 +232,63 @@ class EquipmentHandler:
         Save slot to storage.
 
         """
+        if self._in_transaction:
+            return
         self.obj.attributes.add(self.save_attribute, self.slots, category="inventory")
 
+    @contextmanager
+    def transaction(self):
+        """
+        Make many changes to the inventory at once. The slots are only saved once at the end,
+        and all database changes made meanwhile (like deleting or creating objects) happen in one
+        database transaction. If anything goes wrong, the inventory is left as it was.
+
+        Usage:
+            with character.equipment.transaction():
+                ...
+
+        """
+        if self._in_transaction:
+            yield self
+            return
+
+        # work on a plain copy, since changing the stored slots saves them every time
+        self.slots = deserialize(self.slots)
+        self._backpack._backpack = self.slots[WieldLocation.BACKPACK]  # pylint: disable=protected-access
+        self._in_transaction = True
+        try:
+            with transaction.atomic():
+                yield self
+                self._in_transaction = False
+                self._save()
+        finally:
+            self._in_transaction = False
+            self._load()
+            self._backpack._backpack = self.slots[WieldLocation.BACKPACK]  # pylint: disable=protected-access
+
+    def delete(self, objs):
+        """
+        Delete objects in the inventory, taking them out of their slots all at once.
+
+        Args:
+            objs (list): The objects to delete.
+
+        """
+        ids = {obj.id for obj in objs}
+        with self.transaction():
+            slots = self.slots
+            slots[WieldLocation.BACKPACK][:] = [
+                obj for obj in slots[WieldLocation.BACKPACK] if obj.id not in ids
+            ]
+            for slot, obj in slots.items():
+                if slot is not WieldLocation.BACKPACK and getattr(obj, "id", None) in ids:
+                    slots[slot] = NoneObject()
+            # objects are deleted one by one, since deleting runs their hooks and cleans up
+            # their attributes, tags, locks and cached instances; a queryset delete would skip
+            # all of that. It all happens in the one transaction though.
+            for obj in objs:
+                obj.delete()
+
     def count_slots(self):
         """
         Count slot usage. This is fetched from the .size Attribute of the
@@ -255,13 +315,13 @@ class EquipmentHandler:
         Check if obj can fit in equipment, based on its size.
 
         Args:
-            obj (Object): The object to add.
+            obj (Object or ObjectSpec): The object to add.
 
         Raise:
             EquipmentError: If there's not enough room.
 
         """
-        if not inherits_from(obj, Object):
+        if not inherits_from(obj, Object) and not isinstance(obj, ObjectSpec):
             raise EquipmentError(f"{obj.key} is not something that can be equipped.")
 
         size = obj.size
@@ -151,12 +151,14 @@ class LevelsHandler:
         """
         Called when a character levels up
         """
-        self.level = self.level + 1
-
-        self._level_hp()
-        self._level_mana()
-        self._level_stamina()
-        self._level_stats()
+        # save the new level and all the stats it raises together
+        with self.obj.attributes.batch():
+            self.level = self.level + 1
+
+            self._level_hp()
+            self._level_mana()
+            self._level_stamina()
+            self._level_stats()
 
         # Send the player a nice message.
         is_pc = self.obj.is_pc
@@ -39,6 +39,7 @@ class ConsumptionNode(xymap_legend.MapNode):
     It is a gathering place, of sorts.
     """
     display_symbol = "|c♨|n"
+    landmark = True
     prototype = {
         "prototype_parent": "control_station_7_xyz_room"
     }
@@ -48,6 +49,7 @@ class BarNode(xymap_legend.MapNode):
     A seedy bar.
     """
     display_symbol = "|g♫|n"
+    landmark = True
     prototype = {
         "prototype_parent": "control_station_7_xyz_room"
     }
@@ -55,6 +57,7 @@ class BarNode(xymap_legend.MapNode):
 class BankNode(xymap_legend.MapNode):
     """ Player bank where they can store items they can't hold. """
     display_symbol = "|y$|n"
+    landmark = True
     prototype = {
         "prototype_parent": "control_station_7_xyz_room"
     }
@@ -71,6 +74,7 @@ class HouseNode(xymap_legend.MapNode):
 class OverseerOfficeNode(HouseNode):
     """ The overseer hands out quests. """
     display_symbol = "|g♔|n"
+    landmark = True
     prototype = {
         "prototype_parent": "control_station_7_xyz_room"
     }
@@ -78,6 +82,7 @@ class OverseerOfficeNode(HouseNode):
 class WeaponStoreNode(xymap_legend.MapNode):
     """ Store that sells physical weapons. """
     display_symbol = "|g⚔|n"
+    landmark = True
     prototype = {
         "prototype_parent": "control_station_7_xyz_room"
     }
@@ -85,6 +90,7 @@ class WeaponStoreNode(xymap_legend.MapNode):
 class HackingStoreNode(xymap_legend.MapNode):
     """ Store that sells software weapons. """
     display_symbol = "|g⚛|n"
+    landmark = True
     prototype = {
         "prototype_parent": "control_station_7_xyz_room"
     }
@@ -92,6 +98,7 @@ class HackingStoreNode(xymap_legend.MapNode):
 class DrugStoreNode(xymap_legend.MapNode):
     """ Store that sells drugs. """
     display_symbol = "|g⚕|n"
+    landmark = True
     prototype = {
         "prototype_parent": "control_station_7_xyz_room"
     }
@@ -99,6 +106,7 @@ class DrugStoreNode(xymap_legend.MapNode):
 class TempleNode(xymap_legend.MapNode):
     """ Temple / Museum. Shows dead characters and how they died. """
     display_symbol = "|c☥|n"
+    landmark = True
     prototype = {
         "prototype_parent": "control_station_7_xyz_room"
     }
@@ -109,6 +117,7 @@ class LuxuryStoreNode(xymap_legend.MapNode):
         rather than the character.
     """
     display_symbol = "|y⚜|n"
+    landmark = True
     prototype = {
         "prototype_parent": "control_station_7_xyz_room"
     }
@@ -118,6 +127,7 @@ class ArenaNode(xymap_legend.MapNode):
     PvP Arena
     """
     display_symbol = "|rΨ|n"
+    landmark = True
     prototype = {
         "prototype_parent": "control_station_7_xyz_room"
     }
@@ -127,8 +137,14 @@ class AreaExitNode(xymap_legend.MapNode):
     The exit into the Forbidden Zone
     """
     display_symbol = "|r☠|n"
+    landmark = True
     prototype = {
-        "prototype_parent": "control_station_7_xyz_room"
+        "prototype_parent": "forbidden_zone_gate_xyz_room",
+        "key": "Edge of the Forbidden Zone",
+        "aliases": ["gate", "western gate"],
+        "desc": """
+The last patch of synthcrete before the rust-colored dunes of the Forbidden Zone. Scavenging teams gather here to check their gear one final time before heading out.
+"""
     }
 
 class BridgeNode(xymap_legend.MapNode):
@@ -0,0 +1,150 @@
+"""
+Buffered room messages.
+
+`location.msg_contents` runs the funcparser over the whole string for every recipient and
+sends every message on its own, so a busy fight sends each player a stream of tiny messages,
+each of them parsed from scratch. `MessageBuffer` takes the same arguments as `msg_contents`,
+but splits each template into its literal text and actor-stance calls once and caches that,
+then holds the rendered lines per recipient until the room is flushed, which sends each
+recipient their lines joined into as few messages as possible: one per run of lines from the
+same `from_obj`, so `from_obj` still reaches the recipients' message hooks. Messages are tagged
+with the buffer's message type, like `msg_contents` callers tag theirs, for clients to filter
+on. Recipients that left the room in the meantime don't get what was buffered for them.
+
+Rooms flush on the next reactor tick, at the end of a combat command, or right before anything
+else is said in the room, so the order of messages in a room never changes.
+"""
+
+import re
+from collections import defaultdict
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+
+from evennia.utils import funcparser
+from evennia.utils.utils import delay, make_iter
+
+_PARSER = funcparser.FuncParser(funcparser.ACTOR_STANCE_CALLABLES)
+
+# a call with plain, unquoted arguments, like $conj(hit) or $You(attacker)
+_CALL = re.compile(r"\$(\w+)\(([^()$'\"\\]*)\)")
+_ACTOR_STANCE_NAMES = frozenset(
+    ("you", "You", "your", "Your", "obj", "Obj", "conj", "pconj", "pron", "Pron")
+)
+
+
+@lru_cache(maxsize=1024)
+def compile_template(template: str) -> tuple | None:
+    """
+    Split a `msg_contents` template into literal strings and `(callable, args)` pairs.
+
+    Returns:
+        tuple or None: The segments, or None if the template uses anything other than simple
+            actor-stance calls and needs the full funcparser.
+
+    """
+    segments = []
+    start = 0
+    for match in _CALL.finditer(template):
+        if match[1] not in _ACTOR_STANCE_NAMES:
+            return None
+
+        args = tuple(arg.strip() for arg in match[2].split(",")) if match[2].strip() else ()
+        segments.append(template[start:match.start()])
+        segments.append((funcparser.ACTOR_STANCE_CALLABLES[match[1]], args))
+        start = match.end()
+
+    segments.append(template[start:])
+    # anything left that looks like a call is something we don't handle
+    if any(isinstance(segment, str) and "$" in segment for segment in segments):
+        return None
+
+    return tuple(segment for segment in segments if segment)
+
+
+def render(template: str, receiver, mapping: dict) -> str:
+    """
+    Render a template for one recipient, exactly as `msg_contents` would.
+
+    Args:
+        template (str): The message, with actor- and director-stance markup.
+        receiver (Object): Who the message is for.
+        mapping (dict): The `msg_contents` mapping, including "you".
+
+    """
+    caller = mapping["you"]
+    if (segments := compile_template(template)) is None:
+        text = _PARSER.parse(
+            template, return_string=True, caller=caller, receiver=receiver, mapping=mapping
+        )
+    else:
+        text = "".join(
+            segment if isinstance(segment, str)
+            else str(segment[0](*segment[1], caller=caller, receiver=receiver, mapping=mapping))
+            for segment in segments
+        )
+
+    return text.format_map({
+        key: obj.get_display_name(looker=receiver) if hasattr(obj, "get_display_name")
+        else str(obj)
+        for key, obj in mapping.items()
+    })
+
+
+class MessageBuffer:
+    """
+    Per-room buffer of rendered messages, flushed as one message per recipient.
+    """
+
+    __slots__ = ("pending", "flush_delay", "msg_type")
+
+    def __init__(self, flush_delay=0, msg_type=None):
+        """
+        Args:
+            flush_delay (float): Seconds to wait before flushing a room that got a message.
+                0 flushes on the next reactor tick.
+            msg_type (str, optional): The `type` messages are sent with.
+        """
+        self.pending = {}
+        self.flush_delay = flush_delay
+        self.msg_type = msg_type
+
+    def msg_contents(self, location, text, exclude=None, from_obj=None, mapping=None):
+        """
+        Buffer a message to everything in `location`. Takes the same arguments as
+        `location.msg_contents`.
+        """
+        mapping = dict(mapping or {})
+        mapping.setdefault("you", from_obj or location)
+        exclude = make_iter(exclude) if exclude else ()
+
+        if (lines := self.pending.get(location)) is None:
+            lines = self.pending[location] = defaultdict(list)
+            delay(self.flush_delay, self.flush, location)
+
+        for receiver in location.contents:
+            if receiver not in exclude:
+                lines[receiver].append((render(text, receiver, mapping), from_obj))
+
+    def flush(self, location=None):
+        """
+        Send everything buffered for `location`, or for every room if not given.
+        """
+        options = {"type": self.msg_type} if self.msg_type else {}
+        locations = [location] if location is not None else list(self.pending)
+        for loc in locations:
+            for receiver, lines in self.pending.pop(loc, {}).items():
+                # things that were deleted meanwhile, like slain mobs, have nobody to tell, and
+                # those that left have moved on to another room's messages
+                if not receiver.pk or receiver.location != loc:
+                    continue
+                for from_obj, run in groupby(lines, key=itemgetter(1)):
+                    receiver.msg(
+                        text=("\n".join(line for line, _ in run), options), from_obj=from_obj
+                    )
+
+    def __contains__(self, location):
+        return location in self.pending
+
+
+COMBAT_MESSAGES = MessageBuffer(msg_type="combat")
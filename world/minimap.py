@@ -0,0 +1,64 @@
+"""
+Cache of rendered xyzgrid minimaps.
+
+Rendering the part of the map around a room means walking the map's display grid every time
+someone moves or looks around, but the result only depends on where on which map you are and
+how the map is shown. Rendered maps are kept per map, keyed by the room's coordinate and the
+display options, so each one is only rendered once.
+
+The cache of a map goes away with the map itself, so reloading the grid after a map was edited
+starts from scratch. Anything else that changes how a map looks, like markers that come and go,
+should call `minimap_cache.invalidate` for its map.
+"""
+
+from weakref import WeakKeyDictionary
+
+# rendered maps kept per map, more than the number of rooms times the display options in use
+MAX_CACHED = 2048
+
+
+class MinimapCache:
+    """
+    Rendered maps, by map and render key.
+    """
+
+    __slots__ = ("maps", "max_cached")
+
+    def __init__(self, max_cached=MAX_CACHED):
+        # xymap: {key: rendered map}
+        self.maps = WeakKeyDictionary()
+        self.max_cached = max_cached
+
+    def get(self, xymap, key, render):
+        """
+        Get a rendered map, rendering it if it isn't cached yet.
+
+        Args:
+            xymap (XYMap): The map being rendered.
+            key (tuple): Everything the rendering depends on, besides the map itself.
+            render (callable): Renders the map, called without arguments.
+
+        Returns:
+            str: The rendered map.
+
+        """
+        rendered = self.maps.setdefault(xymap, {})
+        if (display := rendered.get(key)) is None:
+            if len(rendered) >= self.max_cached:
+                rendered.clear()
+            display = rendered[key] = render()
+        return display
+
+    def invalidate(self, zcoord=None):
+        """
+        Render the maps of `zcoord`, or of all maps, again the next time they're needed.
+        """
+        for xymap in list(self.maps):
+            if zcoord in (None, xymap.Z):
+                del self.maps[xymap]
+
+    def __len__(self):
+        return sum(len(rendered) for rendered in self.maps.values())
+
+
+minimap_cache = MinimapCache()
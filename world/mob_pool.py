@@ -0,0 +1,106 @@
+"""
+Pool of dead mobs, recycled instead of deleted.
+
+Spawning a mob creates its object, its Attributes and its starting equipment, and deleting it
+throws all of that away again. Instead, a dead mob is parked nowhere (location None) and tagged
+with its prototype. The next `acquire` of that prototype brings it back with freshly rolled
+prototype Attributes, scaled to the wanted level and at full health, still carrying its
+equipment.
+
+The tags make the pool survive reloads: it is rebuilt from the database the first time a
+prototype is asked for.
+"""
+
+from evennia.prototypes import spawner
+from evennia.prototypes.prototypes import PROTOTYPE_TAG_CATEGORY
+from evennia.utils.search import search_tag
+
+POOL_TAG_CATEGORY = "mob_pool"
+# pooled mobs kept per prototype, the rest are deleted as usual
+MAX_POOLED = 200
+
+
+class MobPool:
+    """
+    Dead mobs by prototype key, ready to be handed out again.
+    """
+
+    __slots__ = ("pools", "max_pooled")
+
+    def __init__(self, max_pooled=MAX_POOLED):
+        self.pools = {}
+        self.max_pooled = max_pooled
+
+    def _pool(self, prototype_key):
+        if (pool := self.pools.get(prototype_key)) is None:
+            pool = self.pools[prototype_key] = list(
+                search_tag(prototype_key, category=POOL_TAG_CATEGORY)
+            )
+        return pool
+
+    def acquire(self, prototype_key: str, level: int = 1, location=None):
+        """
+        Get a mob of a prototype, recycling a dead one if there is one.
+
+        Args:
+            prototype_key (str): The mob's prototype.
+            level (int): Level to scale the mob to.
+            location (Object, optional): Where to put the mob.
+
+        Returns:
+            BaseMob: The mob, at full health.
+
+        """
+        prototype_key = prototype_key.lower()
+        pool = self._pool(prototype_key)
+        # skip any that were deleted while pooled
+        while pool and not pool[-1].pk:
+            pool.pop()
+
+        if pool:
+            mob = pool.pop()
+            mob.tags.remove(prototype_key, category=POOL_TAG_CATEGORY)
+            # roll the prototype's Attributes again, random ones included
+            _, _, _, _, _, attributes, _, _ = spawner.spawn(prototype_key, only_validate=True)[0]
+            mob.at_recycle(attributes)
+        else:
+            mob = spawner.spawn(prototype_key)[0]
+
+        # prototype Attributes are only set after at_object_creation, so this can't happen there
+        with mob.attributes.batch():
+            mob.equip_starting_equipment()
+            mob.scale_to_level(level)
+            mob.full_recovery()
+        if location:
+            mob.move_to(location, quiet=True, move_type="spawn")
+
+        return mob
+
+    def release(self, mob) -> bool:
+        """
+        Put a mob in the pool. Mobs not spawned from a prototype, or of a prototype whose pool
+        is full, aren't taken.
+
+        Returns:
+            bool: If the mob was pooled. If not, it's up to the caller to get rid of it.
+
+        """
+        prototype_key = mob.tags.get(category=PROTOTYPE_TAG_CATEGORY)
+        if not prototype_key or isinstance(prototype_key, list):
+            return False
+
+        pool = self._pool(prototype_key)
+        if len(pool) >= self.max_pooled:
+            return False
+
+        mob.at_release()
+        mob.location = None
+        mob.tags.add(prototype_key, category=POOL_TAG_CATEGORY)
+        pool.append(mob)
+        return True
+
+    def __len__(self):
+        return sum(len(pool) for pool in self.pools.values())
+
+
+mob_pool = MobPool()
@@ -0,0 +1,156 @@
+"""
+Shared scheduler for the ambient behaviour of NPCs, like wandering and shouting.
+
+Rather than a timer per NPC, NPCs are put in buckets by how often they act, rounded to
+`BUCKET_RESOLUTION` seconds. Each bucket has a single looping call, acting for all of its
+NPCs in one go.
+
+Nobody sees what an NPC does when there are no players in its room or the rooms next to it, so
+such NPCs are put to sleep the next time their bucket comes around. They're woken up when a
+player arrives in or next to their room.
+
+Nothing here is saved, so NPCs have to be added again after a reload (see `schedule_npcs`).
+"""
+
+from evennia.utils import logger
+from twisted.internet import reactor
+from twisted.internet.task import LoopingCall
+
+from world.occupancy import occupancy
+
+# how often NPCs act is rounded to this many seconds
+BUCKET_RESOLUTION = 10
+
+
+def neighbourhood(room):
+    """ The room, and the rooms its exits lead to. """
+    if not room:
+        return []
+    return [room, *(exi.destination for exi in room.exits if exi.destination)]
+
+
+def is_observed(room):
+    """ If there are any players in or next to `room`. """
+    return any(occupancy.players_in(nearby) for nearby in neighbourhood(room))
+
+
+# pylint: disable=too-few-public-methods
+class Bucket:
+    """
+    NPCs acting every `interval` seconds.
+    """
+
+    __slots__ = ("scheduler", "interval", "members", "loop")
+
+    def __init__(self, scheduler, interval):
+        self.scheduler = scheduler
+        self.interval = interval
+        # (npc id, action): npc
+        self.members = {}
+        self.loop = LoopingCall(self.run)
+        self.loop.clock = scheduler.clock
+        self.loop.start(interval, now=False)
+
+    def run(self):
+        """ Act for all NPCs in the bucket, putting the unobserved ones to sleep. """
+        for key, npc in list(self.members.items()):
+            if not npc.pk:
+                del self.members[key]
+                self.scheduler.where.pop(key, None)
+            elif not is_observed(npc.location):
+                del self.members[key]
+                self.scheduler.sleep(npc, key[1], self.interval)
+            else:
+                try:
+                    getattr(npc, key[1])()
+                except Exception:  # pylint: disable=broad-exception-caught
+                    # an error would stop the loop, and with it every NPC in the bucket
+                    logger.log_trace(f"NPC scheduler: {key[1]} failed for {npc} (#{npc.id})")
+        if not self.members:
+            self.scheduler.drop(self)
+
+
+class NPCScheduler:
+    """
+    Buckets of NPCs by how often they act, and the NPCs that are asleep.
+    """
+
+    __slots__ = ("buckets", "asleep", "where", "clock")
+
+    def __init__(self, clock=reactor):
+        # interval: bucket
+        self.buckets = {}
+        # room id: {(npc id, action): (npc, interval)}
+        self.asleep = {}
+        # (npc id, action): (bucket interval, None) when awake, (None, room id) when asleep
+        self.where = {}
+        self.clock = clock
+
+    def add(self, npc, action, rate):
+        """
+        Have `npc` call its method `action` about every `rate` seconds, while observed.
+
+        Returns:
+            int: The interval of the bucket the NPC was put in.
+
+        """
+        self.remove(npc, action)
+        interval = max(BUCKET_RESOLUTION, round(rate / BUCKET_RESOLUTION) * BUCKET_RESOLUTION)
+        if (bucket := self.buckets.get(interval)) is None:
+            bucket = self.buckets[interval] = Bucket(self, interval)
+        bucket.members[(npc.id, action)] = npc
+        self.where[(npc.id, action)] = (interval, None)
+        return interval
+
+    def remove(self, npc, action=None):
+        """ Stop `npc` acting, for `action` or for everything. """
+        if action:
+            keys = [(npc.id, action)] if (npc.id, action) in self.where else []
+        else:
+            keys = [key for key in self.where if key[0] == npc.id]
+        for key in keys:
+            interval, location_id = self.where.pop(key)
+            if bucket := self.buckets.get(interval):
+                bucket.members.pop(key, None)
+            if (sleepers := self.asleep.get(location_id)) is not None:
+                sleepers.pop(key, None)
+                if not sleepers:
+                    del self.asleep[location_id]
+
+    def sleep(self, npc, action, interval):
+        """ Put `npc` to sleep until a player comes near. """
+        location_id = npc.location.id if npc.location else None
+        self.asleep.setdefault(location_id, {})[(npc.id, action)] = (npc, interval)
+        self.where[(npc.id, action)] = (None, location_id)
+
+    def wake(self, room):
+        """ Wake up the NPCs in and next to `room`, after a player arrived there. """
+        if not self.asleep or not room:
+            return
+        # the rooms that `room` is next to, and those with exits leading to it
+        sources = [exi.location for exi in room.destinations_set.all() if exi.location]
+        for nearby in {*neighbourhood(room), *sources}:
+            for key, (npc, interval) in self.asleep.pop(nearby.id, {}).items():
+                del self.where[key]
+                if npc.pk:
+                    self.add(npc, key[1], interval)
+
+    def drop(self, bucket):
+        """ Stop an empty bucket. """
+        if self.buckets.get(bucket.interval) is bucket:
+            del self.buckets[bucket.interval]
+        if bucket.loop.running:
+            bucket.loop.stop()
+
+
+npc_scheduler = NPCScheduler()
+
+
+def schedule_npcs():
+    """ Add all NPCs to the scheduler, after the server (re)started. """
+    # pylint: disable=import-outside-toplevel
+    from typeclasses.npcs import ShoutNPC, WanderingNPC
+
+    for npc_class in (WanderingNPC, ShoutNPC):
+        for npc in npc_class.objects.all_family():
+            npc.schedule()
@@ -10,6 +10,7 @@ from evennia.prototypes.spawner import spawn
 from evennia.utils.utils import make_iter
 
 from typeclasses.objects import EquipmentObject
+from world.common.item_prototypes import SCRAP
 from world.item_spawner import item_spawner
 from world.utils import get_numbered_name, obj_order
 
@@ -37,8 +38,9 @@ class ShoppingSession:
                     location=self.npc
                 )
                 if item:
+                    self.npc.stock.add(item)
                     gear.append(item)
-            self.character.ndb.buyable_gear[self.npc] = gear
+            self.character.buyable_gear[self.npc] = gear
 
         return sorted(gear, key=obj_order)
 
@@ -78,15 +80,18 @@ class ShoppingSession:
         if not self.character_can_afford_item(item):
             return
 
-        for currency, data in price.items():
-            inv = self.character.search(currency, location=self.character, quiet=True)
-            for i in range(data["count"]):
-                inv[i].delete()
+        equipment = self.character.equipment
+        with equipment.transaction():
+            for currency, data in price.items():
+                inv = self.character.search(currency, location=self.character, quiet=True)
+                equipment.delete(inv[:data["count"]])
 
-        item.location = self.character
-        item.save()
-        self.character.buyable_gear[self.npc].remove(item)
-        self.character.equipment.add(item)
+            item.location = self.character
+            item.save()
+            equipment.add(item)
+        # only once the purchase went through, since this isn't undone with the transaction
+        if item in (gear := self.character.buyable_gear.get(self.npc, [])):
+            gear.remove(item)
 
     def _say(self, dialog):
         return f"{self.npc} says: {dialog}"
@@ -149,6 +154,8 @@ def node_start(caller, raw_string, **kwargs):
 def node_end(_caller, raw_string, **kwargs):
     """ close the shop menu """
     shopping_session = kwargs["shopping_session"]
+    # let go of stock that expired while shopping
+    shopping_session.character.buyable_gear.prune()
 
     if shopping_session.made_sale:
         return shopping_session.sale_made_text()
@@ -210,16 +217,19 @@ def node_show_buyable_items(_caller, raw_string, **kwargs):
 
     return (text, ""), options
 
+def _give_scrap(caller, count):
+    """ spawn scrap straight into the caller's inventory """
+    for scrap in spawn(*count * [SCRAP | {"location": caller}]):
+        caller.equipment.move(scrap)
+
 def node_sell_item(caller, raw_string, **kwargs):
     """ sell the item """
     shopping_session = kwargs["shopping_session"]
     shopping_session.made_sale = True
     item = kwargs.pop("item")
-    scraps = spawn(*item.scrap_value * ["scrap"])
-    for scrap in scraps:
-        scrap.location = caller
-        caller.equipment.move(scrap)
-    item.delete()
+    with caller.equipment.transaction():
+        _give_scrap(caller, item.scrap_value)
+        caller.equipment.delete([item])
 
     return node_show_sellable_items(caller, "", **kwargs)
 
@@ -228,16 +238,11 @@ def node_sell_all(caller, raw_string, **kwargs):
     shopping_session = kwargs["shopping_session"]
     shopping_session.made_sale = True
     gear = caller.equipment.sorted_backpack(EquipmentObject)
-    scrap_value = 0
-
-    for item in gear:
-        scrap_value += item.scrap_value
-        item.delete()
+    scrap_value = sum(item.scrap_value for item in gear)
 
-    scraps = spawn(*scrap_value * ["scrap"])
-    for scrap in scraps:
-        scrap.location = caller
-        caller.equipment.move(scrap)
+    with caller.equipment.transaction():
+        caller.equipment.delete(gear)
+        _give_scrap(caller, scrap_value)
 
     return node_start(caller, "", **kwargs)
 
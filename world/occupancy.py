@@ -0,0 +1,90 @@
+"""
+Where the players are.
+
+Keeps track of the characters being puppeted, and of which of them are in which room, so
+finding the players in a room doesn't mean going through everything in it.
+
+Characters are added when puppeted and removed when their last session unpuppets them. Rooms
+keep it up to date as puppeted characters come and go, through their `at_object_receive` and
+`at_object_leave`. Characters can also be put somewhere without those hooks being called (like
+setting `obj.location` directly), so `players_in` checks that the characters it has for a room
+are still there.
+
+Nothing here is saved, so it is built again from the puppeted characters at server start.
+"""
+
+
+class Occupancy:
+    """
+    Puppeted characters, and the rooms they are in.
+    """
+
+    __slots__ = ("online", "rooms")
+
+    def __init__(self):
+        # character id: character
+        self.online = {}
+        # room id: {character id: character}
+        self.rooms = {}
+
+    def arrive(self, character, room):
+        """
+        Called when `character` enters `room`.
+
+        Returns:
+            bool: If the character is puppeted, and so was added to the room.
+
+        """
+        if character.id not in self.online or not room:
+            return False
+        self.rooms.setdefault(room.id, {})[character.id] = character
+        return True
+
+    def leave(self, character, room):
+        """ Called when `character` leaves `room`. """
+        if room and (characters := self.rooms.get(room.id)) is not None:
+            characters.pop(character.id, None)
+            if not characters:
+                del self.rooms[room.id]
+
+    def puppet(self, character):
+        """ Called when `character` is puppeted. """
+        self.online[character.id] = character
+        self.arrive(character, character.location)
+
+    def unpuppet(self, character):
+        """ Called when the last session puppeting `character` is gone. """
+        self.leave(character, character.location)
+        self.online.pop(character.id, None)
+
+    def players_in(self, room):
+        """
+        Get the puppeted characters in a room.
+
+        Returns:
+            list: The characters.
+
+        """
+        if not room or (characters := self.rooms.get(room.id)) is None:
+            return []
+        players = [character for character in characters.values() if character.location == room]
+        if len(players) != len(characters):
+            # some were moved away without telling the room
+            for character in list(characters.values()):
+                if character.location != room:
+                    self.leave(character, room)
+        return players
+
+    def rebuild(self):
+        """ Start over from the characters puppeted by connected sessions. """
+        # pylint: disable=import-outside-toplevel
+        from typeclasses.characters import Character
+
+        self.online.clear()
+        self.rooms.clear()
+        for character in Character.objects.all_family().exclude(db_sessid__isnull=True):
+            if character.db_sessid:
+                self.puppet(character)
+
+
+occupancy = Occupancy()
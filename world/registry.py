@@ -0,0 +1,48 @@
+"""
+Registries of the objects of one kind that are in play.
+
+Global scripts that only care about a few objects, like the shop keepers, go through a registry
+instead of searching the database for every object of a typeclass, which also loads them all
+into the cache. Objects add themselves when created and remove themselves when deleted.
+
+Nothing here is saved, so registries are built again from the database at server start.
+"""
+
+from evennia.utils.search import search_typeclass
+
+
+class Registry:
+    """
+    Objects of a typeclass, by id.
+    """
+
+    __slots__ = ("typeclass", "objects")
+
+    def __init__(self, typeclass):
+        # python path of the typeclass, including its children
+        self.typeclass = typeclass
+        # object id: object
+        self.objects = {}
+
+    def add(self, obj):
+        """ Called when `obj` is created. """
+        self.objects[obj.id] = obj
+
+    def remove(self, obj):
+        """ Called when `obj` is deleted. """
+        self.objects.pop(obj.id, None)
+
+    def rebuild(self):
+        """ Start over from the database. """
+        self.objects = {
+            obj.id: obj for obj in search_typeclass(self.typeclass, include_children=True)
+        }
+
+    def __iter__(self):
+        return iter(list(self.objects.values()))
+
+    def __len__(self):
+        return len(self.objects)
+
+
+vendors = Registry("typeclasses.npcs.ShopKeeper")
@@ -19,11 +19,113 @@ This module is designed to use by importing the `dice` singleton provided.
 
 """
 from random import randint
+
+import numpy as np
+
 from .random_tables import death_and_dismemberment as death_table
 
+_MAX_DIESIZE = 1000
+
+# shared generator for bulk rolls, see `DiceRollEngine.roll_many`
+_RNG = np.random.default_rng()
+
 # Basic rolls
 
 
+class CompiledDice:
+    """
+    A pre-parsed dice expression like `2d6+3`. Parsing is done once by
+    `DiceRollEngine.compile` and the result is cached, so rolling is just the random calls.
+
+    """
+
+    __slots__ = ("expression", "number", "diesize", "modifier")
+
+    def __init__(self, expression, number, diesize, modifier=0):
+        self.expression = expression
+        self.number = number
+        self.diesize = diesize
+        self.modifier = modifier
+
+    def __repr__(self):
+        return f"<CompiledDice {self.expression}>"
+
+    def roll(self):
+        """ Roll the dice and add the modifier. """
+        if self.number == 1:
+            return randint(1, self.diesize) + self.modifier
+
+        return sum(randint(1, self.diesize) for _ in range(self.number)) + self.modifier
+
+    def roll_many(self, count, rng=None):
+        """
+        Roll the expression `count` times at once.
+
+        Args:
+            count (int): How many totals to roll.
+            rng (numpy.random.Generator, optional): Generator to draw from, for seeded runs.
+                Defaults to the module's shared generator.
+
+        Returns:
+            numpy.ndarray: An int array of length `count` with one total per roll.
+
+        """
+        if self.number <= 0:
+            return np.full(count, self.modifier, dtype=np.int64)
+
+        rolls = (rng or _RNG).integers(1, self.diesize + 1, size=(count, self.number))
+        return rolls.sum(axis=1) + self.modifier
+
+    @property
+    def minimum(self):
+        """ Lowest possible result. """
+        return max(self.number, 0) + self.modifier
+
+    @property
+    def maximum(self):
+        """ Highest possible result. """
+        return max(self.number, 0) * self.diesize + self.modifier
+
+
+class CompiledTable:  # pylint: disable=too-few-public-methods
+    """
+    A random table with its 'X-Y' ranges already converted to ints, so looking up a roll
+    doesn't need to split and parse the table again.
+
+    """
+
+    __slots__ = ("table_choices", "ranges", "min_range", "max_range")
+
+    def __init__(self, table_choices):
+        self.table_choices = table_choices
+        self.ranges = []
+        self.max_range = -1
+        self.min_range = 10**6
+
+        for valrange, choice in table_choices:
+            minval, *maxval = valrange.split("-", 1)
+            minval = abs(int(minval))
+            maxval = abs(int(maxval[0]) if maxval else minval)
+
+            # we store the largest/smallest values in case we need to use them
+            self.max_range = max(self.max_range, maxval)
+            self.min_range = min(self.min_range, minval)
+            self.ranges.append((minval, maxval, choice))
+
+    def lookup(self, roll_result):
+        """ Get the table entry matching `roll_result`. """
+        for minval, maxval, choice in self.ranges:
+            if minval <= roll_result <= maxval:
+                return choice
+
+        # if we have no result, we are outside of the range, we pick the edge values. It is also
+        # possible the range contains 'gaps', but that'd be an error in the random table itself.
+        if roll_result > self.max_range:
+            return self.table_choices[-1][1]
+
+        return self.table_choices[0][1]
+
+
 class DiceRollEngine:
     """
     This groups all dice rolls for game mechanics. These could all have been normal functions,
@@ -31,32 +133,116 @@ class DiceRollEngine:
 
     """
 
-    def roll(self, roll_string, max_number=10):
+    # don't let one-off tables passed to roll_random_table grow the cache forever
+    _MAX_CACHED_TABLES = 256
+
+    def __init__(self):
+        self._compiled_dice = {}
+        self._compiled_tables = {}
+
+    def compile(self, roll_string, max_number=10):
         """
-        NOTE: Implement this with the dice roller contrib instead!
+        Parse a dice expression into a `CompiledDice`. Results are cached per expression,
+        so calling this repeatedly with the same string is cheap.
+
+        Args:
+            roll_string (str): A string like `1d20`, `2d6+3` or `1d4-1`.
+            max_number (int): The maximum number of dice allowed in the expression.
+
+        Returns:
+            CompiledDice: The parsed expression.
+
+        Raises:
+            TypeError: If the expression is malformed or out of bounds.
 
         """
-        max_diesize = 1000
-        roll_string = roll_string.lower()
-        if "d" not in roll_string:
+        if isinstance(roll_string, CompiledDice):
+            return roll_string
+
+        cache_key = (roll_string, max_number)
+        compiled = self._compiled_dice.get(cache_key)
+        if compiled is None:
+            compiled = self._parse(roll_string, max_number)
+            self._compiled_dice[cache_key] = compiled
+
+        return compiled
+
+    def _parse(self, roll_string, max_number):
+        expression = roll_string.lower().replace(" ", "")
+        if "d" not in expression:
             raise TypeError(
                 f"Dice roll '{roll_string}' was not recognized. Must be `<number>d<dicesize>`."
             )
-        number, diesize = roll_string.split("d", 1)
+        number, diesize = expression.split("d", 1)
+
+        modifier = "0"
+        for sign in ("+", "-"):
+            if sign in diesize:
+                diesize, modifier = diesize.split(sign, 1)
+                modifier = sign + modifier
+                break
+
         try:
             number = int(number)
             diesize = int(diesize)
+            modifier = int(modifier)
         except Exception as exc:
             raise TypeError(
                 f"The number and dice-size of '{roll_string}' must be numerical."
             ) from exc
         if 0 < number > max_number:
             raise TypeError(f"Invalid number of dice rolled (must be between 1 and {max_number})")
-        if 0 < diesize > max_diesize:
-            raise TypeError(f"Invalid die-size used (must be between 1 and {max_diesize} sides)")
+        if 0 < diesize > _MAX_DIESIZE:
+            raise TypeError(f"Invalid die-size used (must be between 1 and {_MAX_DIESIZE} sides)")
+
+        return CompiledDice(expression, number, diesize, modifier)
+
+    def roll(self, roll_string, max_number=10):
+        """
+        Roll a dice expression like `1d20` or `2d6+3`.
 
-        # At this point we know we have valid input - roll and add dice together
-        return sum(randint(1, diesize) for _ in range(number))
+        Args:
+            roll_string (str or CompiledDice): The dice to roll.
+            max_number (int): The maximum number of dice allowed in the expression.
+
+        Returns:
+            int: The total of the roll.
+
+        """
+        return self.compile(roll_string, max_number).roll()
+
+    def roll_many(self, roll_string, count, max_number=10):
+        """
+        Roll the same dice expression `count` times, for bulk use like simulations.
+
+        Args:
+            roll_string (str or CompiledDice): The dice to roll.
+            count (int): How many times to roll.
+            max_number (int): The maximum number of dice allowed in the expression.
+
+        Returns:
+            numpy.ndarray: An int array of length `count` with one total per roll.
+
+        """
+        return self.compile(roll_string, max_number).roll_many(count)
+
+    def compile_table(self, table_choices):
+        """
+        Get the `CompiledTable` for a random table of ('X-Y', choice) tuples. The table
+        is parsed the first time it is seen and reused afterwards.
+
+        """
+        cached = self._compiled_tables.get(id(table_choices))
+        # we hold on to the table itself, so its id can't be reused while it's cached
+        if cached is not None and cached.table_choices is table_choices:
+            return cached
+
+        if len(self._compiled_tables) >= self._MAX_CACHED_TABLES:
+            self._compiled_tables.clear()
+
+        compiled = CompiledTable(table_choices)
+        self._compiled_tables[id(table_choices)] = compiled
+        return compiled
 
     def roll_random_table(self, dieroll, table_choices):
         """
@@ -86,27 +272,7 @@ class DiceRollEngine:
 
         if isinstance(table_choices[0], (tuple, list)):
             # tuple with range conditional, like ('1-5', "Blue") or ('10', "Purple")
-            max_range = -1
-            min_range = 10**6
-            for (valrange, choice) in table_choices:
-
-                minval, *maxval = valrange.split("-", 1)
-                minval = abs(int(minval))
-                maxval = abs(int(maxval[0]) if maxval else minval)
-
-                # we store the largest/smallest values so far in case we need to use them
-                max_range = max(max_range, maxval)
-                min_range = min(min_range, minval)
-
-                if minval <= roll_result <= maxval:
-                    return choice
-
-            # if we have no result, we are outside of the range, we pick the edge values. It is also
-            # possible the range contains 'gaps', but that'd be an error in the random table itself.
-            if roll_result > max_range:
-                return table_choices[-1][1]
-
-            return table_choices[0][1]
+            return self.compile_table(table_choices).lookup(roll_result)
 
         # regular list - one line per value.
         roll_result = max(1, min(len(table_choices), roll_result))
@@ -0,0 +1,561 @@
+"""
+Offline combat balance simulator.
+
+Runs large batches of one-on-one duels between character classes and mobs entirely in memory,
+with every duel in a batch advanced together as NumPy arrays. Attack resolution mirrors
+`world.combat.CombatHandler` (stamina, cooldowns, block/parry, to-hit, aggro and armor) and
+reads the same constants, so tuning those values changes both the game and the simulation.
+
+Usage, from `evennia shell`:
+
+    from world.simulation import combat
+    results = combat.sweep(levels=(1, 5, 10), duels=1_000_000)
+    print(combat.format_report(results))
+
+Modelling notes:
+    - Both fighters start at full HP and stamina, at the initial melee position, and attack as
+      soon as their cooldown and stamina allow. Simultaneous attacks are ordered at random.
+    - Stamina and mana recover on the `global_recovery` script interval.
+    - The one-second attack buff granted by a block is not modelled.
+    - Time is advanced in whole seconds, matching the integer cooldowns weapons use.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import numpy as np
+from django.conf import settings
+from evennia.utils.evtable import EvTable
+
+from world import combat as combat_rules
+from world.characters.classes import CHARACTER_CLASSES
+from world.characters.races import RACES
+from world.enums import Ability, AttackType, CombatRange, WieldLocation
+from world.levelling import LevelsHandler
+from world.rules import dice
+from .prototypes import get_library
+
+_RECOVERY_INTERVAL = settings.GLOBAL_SCRIPTS["global_recovery"]["interval"]
+
+# chargen has the player assign +3, +2 and +1, which we give to the class' stats in order
+_CHARGEN_ABILITIES = (3, 2, 1)
+_ABILITIES = tuple(ability.value for ability in Ability)
+_PERCENTILES = (5, 25, 50, 75, 95)
+
+# one million duels is ~100MB of state, so larger runs are done in chunks
+_CHUNK_SIZE = 1_000_000
+
+
+# disable too-many-instance-attributes since these are flat snapshots of everything
+# the combat rules read off a weapon or a character
+# pylint: disable=too-many-instance-attributes
+@dataclass(frozen=True)
+class WeaponStats:
+    """ The combat-relevant stats of a weapon, with `WeaponObject`'s defaults. """
+
+    key: str = "bare hands"
+    attack_range: CombatRange = CombatRange.MELEE
+    attack_type: Ability = Ability.STR
+    damage_roll: str = "1d4"
+    stamina_cost: int = 2
+    cooldown: int = 2
+    parry: bool = False
+    throwable: bool = False
+
+    @classmethod
+    def from_prototype(cls, prototype: dict) -> 'WeaponStats':
+        """ Build the stats from a merged weapon prototype. """
+        defaults = cls()
+        return cls(
+            key=prototype.get("key", prototype["prototype_key"]),
+            attack_range=prototype.get("attack_range", defaults.attack_range),
+            attack_type=prototype.get("attack_type", defaults.attack_type),
+            damage_roll=prototype.get("damage_roll", defaults.damage_roll),
+            stamina_cost=prototype.get("stamina_cost", defaults.stamina_cost),
+            cooldown=prototype.get("cooldown", defaults.cooldown),
+            parry=prototype.get("parry", defaults.parry),
+            throwable=prototype.get("is_throwable") is not None,
+        )
+
+
+@dataclass(frozen=True)
+class Fighter:
+    """
+    A snapshot of a character or mob, holding only what the combat rules look at.
+
+    `hp_max` may be a callable, as in mob prototypes, in which case it is re-rolled for every
+    duel and then grown by `hp_scaling` the way `BaseMob.scale_to_level` does.
+    """
+
+    name: str
+    hp_max: int | Callable[[], int] = 10
+    stamina_max: int = 1
+    strength: int = 1
+    cunning: int = 1
+    will: int = 1
+    armor: int = 1
+    has_shield: bool = False
+    weapon: WeaponStats = field(default_factory=WeaponStats)
+    aggro: str = "n"
+    level: int = 1
+    hp_scaling: float = 0.0
+
+    def get_ability(self, ability: Ability) -> int:
+        """ Same as `HasRaceMixin.get_ability`. """
+        return getattr(self, ability.value)
+
+    @property
+    def can_defend(self) -> bool:
+        """ Whether this fighter blocks or parries attacks when it has the stamina to. """
+        return self.has_shield or self.weapon.parry
+
+    @property
+    def attack_kind(self) -> AttackType:
+        """ Which attack this fighter makes: `hit` with melee weapons, `shoot` otherwise. """
+        if self.weapon.throwable:
+            return AttackType.THROWN
+        if self.weapon.attack_range == CombatRange.MELEE:
+            return AttackType.MELEE
+        return AttackType.RANGED
+
+    def sample_hp(self, count: int) -> np.ndarray:
+        """ Roll the starting HP for `count` duels. """
+        if callable(self.hp_max):
+            hp = np.fromiter((self.hp_max() for _ in range(count)), dtype=np.int64, count=count)
+        else:
+            hp = np.full(count, self.hp_max, dtype=np.int64)
+
+        if self.hp_scaling and self.level > 1:
+            hp += (hp * self.level * self.hp_scaling).astype(np.int64)
+
+        return hp
+
+
+def _gear_from_prototypes(prototype_keys, library):
+    """
+    Sort gear prototypes into the slots `EquipmentHandler` would put them in.
+    Prototypes that can't be found are skipped, as chargen does.
+    """
+    gear = {}
+    for key in prototype_keys:
+        if not key or not (prototype := library.get(key)):
+            continue
+
+        slot = prototype.get("inventory_use_slot")
+        if slot in (WieldLocation.WEAPON_HAND, WieldLocation.TWO_HANDS):
+            slot = WieldLocation.WEAPON_HAND
+        gear[slot] = prototype
+
+    return gear
+
+
+def _armor_from_gear(gear):
+    """ Same sum as `EquipmentHandler.armor`; armor pieces default to 1 like `ArmorObject`. """
+    armor = gear[WieldLocation.BODY].get("armor", 1) if WieldLocation.BODY in gear else 1
+    for slot in (WieldLocation.SHIELD_HAND, WieldLocation.HEAD):
+        if slot in gear:
+            armor += gear[slot].get("armor", 1)
+
+    return armor
+
+
+def _weapon_from_gear(gear):
+    if WieldLocation.WEAPON_HAND in gear:
+        return WeaponStats.from_prototype(gear[WieldLocation.WEAPON_HAND])
+
+    return WeaponStats()
+
+
+def build_character(class_key: str, level: int = 1, race_key: str = "human", aggro: str = "n"):
+    """
+    Build a player character the way chargen and `LevelsHandler` would.
+
+    Args:
+        class_key (str): Key in `CHARACTER_CLASSES`.
+        level (int): Level to advance the character to.
+        race_key (str): Key in `RACES`, for ability modifiers.
+        aggro (str): Combat stance.
+
+    Returns:
+        Fighter: The character, wearing its class' starting gear.
+
+    """
+    cclass = CHARACTER_CLASSES[class_key]
+    race = RACES[race_key]
+
+    tertiary_stat = next(
+        ability
+        for ability in _ABILITIES
+        if ability not in (cclass.primary_stat, cclass.secondary_stat)
+    )
+    abilities = dict(zip(
+        (cclass.primary_stat, cclass.secondary_stat, tertiary_stat),
+        _CHARGEN_ABILITIES,
+    ))
+    for ability in _ABILITIES:
+        abilities[ability] += getattr(race, f"{ability}_mod")
+
+    # PCs always get the max roll when they level
+    hp_max = 10 + cclass.stat_dice.health_dice[1] * level
+    stamina_max = 10 + cclass.stat_dice.stamina_dice[1] * level
+
+    focus = {
+        tertiary_stat: "tertiary",
+        cclass.primary_stat: "primary",
+        cclass.secondary_stat: "secondary",
+    }
+    for ability, stat_focus in focus.items():
+        # pylint: disable-next=protected-access
+        abilities[ability] += level // LevelsHandler._LEVELS_FOR_STATS[stat_focus]
+
+    gear = _gear_from_prototypes(
+        (cclass.starting_gear[slot] for slot in ("weapon", "shield", "helmet", "armor")),
+        get_library(),
+    )
+
+    return Fighter(
+        name=f"{cclass.name} {level}",
+        hp_max=hp_max,
+        stamina_max=stamina_max,
+        armor=_armor_from_gear(gear),
+        has_shield=WieldLocation.SHIELD_HAND in gear,
+        weapon=_weapon_from_gear(gear),
+        aggro=aggro,
+        level=level,
+        **abilities,
+    )
+
+
+def build_mob(prototype_key: str, level: int = 1, aggro: str = "n"):
+    """
+    Build a mob from its prototype and scale it like `BaseMob.scale_to_level`.
+
+    Args:
+        prototype_key (str): The mob's prototype key.
+        level (int): Level to scale the mob to.
+        aggro (str): Combat stance.
+
+    Returns:
+        Fighter: The mob, wearing its starting equipment.
+
+    """
+    library = get_library()
+    prototype = library.get(prototype_key)
+    if prototype is None:
+        raise KeyError(f"No mob prototype found for '{prototype_key}'.")
+
+    mob_scaling = prototype.get("mob_scaling") or {}
+    cclass = CHARACTER_CLASSES.get(prototype.get("cclass_key"))
+    abilities = {ability: prototype.get(ability, 1) for ability in _ABILITIES}
+
+    if level > 1:
+        stat_levels = dict.fromkeys(_ABILITIES, 6)
+        if cclass:
+            stat_levels[cclass.primary_stat] = 4
+            stat_levels[cclass.secondary_stat] = 5
+
+        for ability, levels_for_stat in stat_levels.items():
+            abilities[ability] += int(
+                int(level / levels_for_stat) * mob_scaling.get(ability, 0.1)
+            )
+
+    gear = _gear_from_prototypes(prototype.get("starting_equipment_prototypes") or (), library)
+
+    return Fighter(
+        name=f"{prototype.get('key', prototype_key)} {level}",
+        hp_max=prototype.get("hp_max", 1),
+        stamina_max=prototype.get("stamina_max", 1),
+        armor=_armor_from_gear(gear),
+        has_shield=WieldLocation.SHIELD_HAND in gear,
+        weapon=_weapon_from_gear(gear),
+        aggro=aggro,
+        level=level,
+        hp_scaling=mob_scaling.get("hp", 0.1),
+        **abilities,
+    )
+
+
+class _AttackProfile:  # pylint: disable=too-few-public-methods
+    """ Everything about one side's attack that stays fixed for a whole batch. """
+
+    __slots__ = (
+        "stamina_cost", "cooldown", "blocked_cooldown", "to_hit_bonus", "defense",
+        "damage_dice", "damage_bonus", "aggro_multiplier", "armor",
+    )
+
+    def __init__(self, attacker: Fighter, target: Fighter):
+        weapon = attacker.weapon
+        kind = attacker.attack_kind
+
+        stamina_cost, self.cooldown = weapon.stamina_cost, weapon.cooldown
+        if kind == AttackType.THROWN:
+            stamina_cost = combat_rules.THROWN_STAMINA_COST
+            self.cooldown = combat_rules.THROWN_COOLDOWN
+        self.stamina_cost = combat_rules.apply_aggro(stamina_cost, attacker.aggro)
+        # fighters stay at melee range, so blocks always cost the attacker extra time
+        self.blocked_cooldown = weapon.cooldown + combat_rules.BLOCK_COOLDOWN_PENALTY
+
+        self.to_hit_bonus = attacker.get_ability(weapon.attack_type)
+        if kind == AttackType.MELEE:
+            self.defense = target.armor + combat_rules.MELEE_DEFENSE_BASE
+            self.damage_bonus = self.to_hit_bonus
+        else:
+            # no size penalty, and no range penalty since fighters are within short range
+            self.defense = combat_rules.RANGED_DEFENSE_BASE
+            self.damage_bonus = attacker.cunning if kind == AttackType.THROWN else attacker.strength
+
+        self.damage_dice = dice.compile(weapon.damage_roll)
+        self.aggro_multiplier = combat_rules.AGGRO_MULTIPLIERS.get(attacker.aggro)
+        self.armor = target.armor
+
+
+class _SideState:
+    """ Per-duel arrays for one side of a batch. """
+
+    __slots__ = ("fighter", "profile", "hp", "stamina", "ready_at")
+
+    def __init__(self, fighter: Fighter, opponent: Fighter, count: int):
+        self.fighter = fighter
+        self.profile = _AttackProfile(fighter, opponent)
+        self.hp = fighter.sample_hp(count)
+        self.stamina = np.full(count, fighter.stamina_max, dtype=np.int64)
+        self.ready_at = np.zeros(count, dtype=np.int64)
+
+    def keep(self, mask):
+        """ Drop the duels that are over. """
+        self.hp = self.hp[mask]
+        self.stamina = self.stamina[mask]
+        self.ready_at = self.ready_at[mask]
+
+    def recover(self):
+        """ Same as `HasDrainableStatsMixin.at_recovery`, for stamina. """
+        recovering = self.stamina < self.fighter.stamina_max
+        self.stamina[recovering] += max(self.fighter.strength, 1)
+
+    def attack(self, target: '_SideState', mask, now, rng):
+        """ Attack `target` in every duel in `mask` where this side is able to. """
+        profile = self.profile
+        attacking = np.flatnonzero(
+            mask
+            & (self.ready_at <= now)
+            & (self.stamina >= profile.stamina_cost)
+            & (self.hp > 0)
+            & (target.hp > 0)
+        )
+        if not attacking.size:
+            return
+
+        self.stamina[attacking] -= profile.stamina_cost
+        self.ready_at[attacking] = now + profile.cooldown
+
+        if target.fighter.can_defend:
+            defended = target.stamina[attacking] > combat_rules.DEFENSE_STAMINA_COST
+            blocked = attacking[defended]
+            target.stamina[blocked] -= combat_rules.DEFENSE_STAMINA_COST
+            self.ready_at[blocked] = now + profile.blocked_cooldown
+            attacking = attacking[~defended]
+
+        to_hit = rng.integers(1, 21, size=attacking.size) + profile.to_hit_bonus
+        hits = attacking[to_hit >= profile.defense]
+        if not hits.size:
+            return
+
+        damage = profile.damage_dice.roll_many(hits.size, rng) + profile.damage_bonus
+        if profile.aggro_multiplier:
+            damage = (damage * profile.aggro_multiplier).astype(np.int64)
+        if profile.armor:
+            damage = np.maximum(damage - profile.armor, 0)
+
+        target.hp[hits] -= damage
+
+
+class _Batch:
+    """ A batch of duels that are fought at the same time. """
+
+    __slots__ = ("sides", "winners", "seconds", "running", "first_goes_first")
+
+    def __init__(self, first: Fighter, second: Fighter, count: int, rng):
+        self.sides = (_SideState(first, second, count), _SideState(second, first, count))
+        self.winners = np.full(count, -1, dtype=np.int8)
+        self.seconds = np.full(count, np.nan)
+        # maps the still-running duels back to their place in the results
+        self.running = np.arange(count)
+        self.first_goes_first = rng.random(count) < 0.5
+
+    def step(self, now, rng):
+        """ Play out one second of every running duel. """
+        first, second = self.sides
+        if now and not now % _RECOVERY_INTERVAL:
+            first.recover()
+            second.recover()
+
+        # whoever goes first in a duel attacks first, then the other side gets its turn
+        first_goes_first = self.first_goes_first
+        second_goes_first = ~first_goes_first
+        first.attack(second, first_goes_first, now, rng)
+        second.attack(first, second_goes_first, now, rng)
+        second.attack(first, first_goes_first, now, rng)
+        first.attack(second, second_goes_first, now, rng)
+
+        self._finish(now)
+
+    def _finish(self, now):
+        first_dead = self.sides[0].hp <= 0
+        second_dead = self.sides[1].hp <= 0
+        finished = first_dead | second_dead
+        if not finished.any():
+            return
+
+        self.winners[self.running[second_dead]] = 0
+        self.winners[self.running[first_dead]] = 1
+        self.seconds[self.running[finished]] = now
+
+        still_running = ~finished
+        self.running = self.running[still_running]
+        self.first_goes_first = self.first_goes_first[still_running]
+        for side in self.sides:
+            side.keep(still_running)
+
+    @property
+    def is_finished(self):
+        """ Whether every duel is over. """
+        return not self.running.size
+
+
+@dataclass(frozen=True)
+class DuelResults:
+    """
+    Outcome of a batch of duels. `winners` holds 0 or 1 for the side that won each duel, or -1
+    if nobody died in time, and `seconds` holds the time-to-kill (NaN for unfinished duels).
+    """
+
+    first: Fighter
+    second: Fighter
+    winners: np.ndarray
+    seconds: np.ndarray
+
+    @property
+    def duels(self) -> int:
+        """ Number of duels fought. """
+        return self.winners.size
+
+    def win_rate(self, side: int) -> float:
+        """ Fraction of duels won by `side` (0 or 1). """
+        return float(np.mean(self.winners == side))
+
+    @property
+    def timeout_rate(self) -> float:
+        """ Fraction of duels where nobody died. """
+        return float(np.mean(self.winners == -1))
+
+    def time_to_kill(self, side: int | None = None) -> np.ndarray:
+        """ Time-to-kill of every finished duel, optionally only those won by `side`. """
+        if side is None:
+            return self.seconds[self.winners != -1]
+
+        return self.seconds[self.winners == side]
+
+    def percentiles(self, side: int | None = None, percentiles=_PERCENTILES) -> dict[int, float]:
+        """ Time-to-kill percentiles, in seconds. Empty if no duel finished. """
+        time_to_kill = self.time_to_kill(side)
+        if not time_to_kill.size:
+            return {}
+
+        return dict(zip(percentiles, np.percentile(time_to_kill, percentiles).tolist()))
+
+
+def simulate_duels(first: Fighter, second: Fighter, duels: int = 100_000,
+                   max_seconds: int = 600, seed: int | None = None) -> DuelResults:
+    """
+    Fight `first` against `second` `duels` times.
+
+    Args:
+        first (Fighter): One side of each duel.
+        second (Fighter): The other side.
+        duels (int): How many duels to run.
+        max_seconds (int): Duels still going after this long count as timeouts.
+        seed (int, optional): Seed for a reproducible run.
+
+    Returns:
+        DuelResults: The outcome of every duel.
+
+    """
+    rng = np.random.default_rng(seed)
+    winners, seconds = [], []
+    for start in range(0, duels, _CHUNK_SIZE):
+        batch = _Batch(first, second, min(_CHUNK_SIZE, duels - start), rng)
+        for now in range(max_seconds + 1):
+            batch.step(now, rng)
+            if batch.is_finished:
+                break
+
+        winners.append(batch.winners)
+        seconds.append(batch.seconds)
+
+    return DuelResults(first, second, np.concatenate(winners), np.concatenate(seconds))
+
+
+def mob_prototype_keys() -> list[str]:
+    """ Keys of every spawnable mob prototype. """
+    library = get_library()
+    return [
+        prototype_key
+        for prototype_key in library.prototypes
+        if "key" in (prototype := library.get(prototype_key))
+        and prototype.get("typeclass") == "typeclasses.mobs.mob.BaseMob"
+    ]
+
+
+def sweep(class_keys=None, mob_keys=None, levels=(1,), duels: int = 100_000,
+          seed: int | None = None) -> list[DuelResults]:
+    """
+    Fight every class against every mob at each level, with both at the same level.
+
+    Args:
+        class_keys (list, optional): Classes to include, defaults to all of them.
+        mob_keys (list, optional): Mob prototypes to include, defaults to all of them.
+        levels (tuple): Levels to fight at.
+        duels (int): Duels per matchup.
+        seed (int, optional): Seed for a reproducible sweep.
+
+    Returns:
+        list: A `DuelResults` per matchup.
+
+    """
+    rng = np.random.default_rng(seed)
+    return [
+        simulate_duels(
+            build_character(class_key, level),
+            build_mob(mob_key, level),
+            duels=duels,
+            seed=rng.integers(2**32),
+        )
+        for level in levels
+        for class_key in class_keys or CHARACTER_CLASSES
+        for mob_key in mob_keys or mob_prototype_keys()
+    ]
+
+
+def format_report(results: list[DuelResults]) -> str:
+    """ Tabulate win rates and time-to-kill for a list of results. """
+    table = EvTable(
+        "First", "Second", "Duels", "Win %", "Loss %", "Timeout %",
+        *(f"TTK p{percentile}" for percentile in _PERCENTILES),
+        border="header",
+    )
+    for result in results:
+        percentiles = result.percentiles()
+        table.add_row(
+            result.first.name,
+            result.second.name,
+            result.duels,
+            f"{result.win_rate(0):.1%}",
+            f"{result.win_rate(1):.1%}",
+            f"{result.timeout_rate:.1%}",
+            *(
+                f"{percentiles[percentile]:.0f}s" if percentiles else "-"
+                for percentile in _PERCENTILES
+            ),
+        )
+
+    return str(table)
@@ -0,0 +1,332 @@
+"""
+Offline loot economy simulator.
+
+Draws large batches of drops through the same pipeline as `ItemSpawner.spawn_item` - the drop
+table walk, the droppable pick, material, tier and affixes - without searching or spawning
+anything. Every step is sampled for the whole batch at once with NumPy, straight from
+`world.drop_tables` and the item prototypes, so changing either changes the simulation.
+
+Usage, from `evennia shell`:
+
+    from world.simulation import loot
+    reports = loot.sweep(levels=range(1, 31, 5), samples=1_000_000)
+    print(loot.format_report(reports, drops_per_hour=120))
+
+Modelling notes:
+    - A drop is "nothing" when the walk ends on a tag no droppable of the right level has,
+      which includes the explicit "nothing" entry.
+    - Rollables are filtered on their own `required_level` only, like `rollables_by_level`.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+
+import numpy as np
+from evennia.utils.evtable import EvTable
+
+from world.characters.classes import CHARACTER_CLASSES
+from world.drop_tables import DROP_TABLES
+from world.enums import QuantumLatticeType
+from .prototypes import get_library
+
+# same as the +-5 levels in `PrototypeManager.droppables_by_level`
+_LEVEL_DISTANCE = 5
+# same as the weight `ItemSpawner.roll_drop_table` gives the caller's class
+_CCLASS_BONUS = 5
+
+_QUANTUM_LATTICE_TYPECLASS = "typeclasses.objects.QuantumLatticeObject"
+# three of a lattice combine into one of the next, so each is worth 3x the one before
+_QUANTUM_LATTICE_VALUES = {ql_type: 3 ** tier for tier, ql_type in enumerate(QuantumLatticeType)}
+
+
+# disable too-many-instance-attributes since the report keeps a tally for every pipeline step
+# pylint: disable=too-many-instance-attributes
+@dataclass
+class LootReport:
+    """ Counts from a batch of simulated drops for one level and character class. """
+
+    level: int
+    cclass: str | None
+    samples: int
+    drop_table: str = "generic"
+    tier_table: str = "tiers"
+    nothing: int = 0
+    drops: Counter = field(default_factory=Counter)
+    quantum_lattices: Counter = field(default_factory=Counter)
+    materials: Counter = field(default_factory=Counter)
+    tiers: Counter = field(default_factory=Counter)
+    affixes: Counter = field(default_factory=Counter)
+    affix_counts: Counter = field(default_factory=Counter)
+
+    def rates(self, counts: Counter) -> dict:
+        """ Turn one of the counters into per-drop rates. """
+        return {key: count / self.samples for key, count in counts.most_common()}
+
+    @property
+    def nothing_rate(self) -> float:
+        """ Fraction of drops that dropped nothing. """
+        return self.nothing / self.samples
+
+    def quantum_lattices_per_hour(self, drops_per_hour: float) -> dict[str, float]:
+        """ Expected quantum lattices of each type gained per hour of play. """
+        return {
+            key: rate * drops_per_hour
+            for key, rate in self.rates(self.quantum_lattices).items()
+        }
+
+    def dust_shard_value_per_hour(self, drops_per_hour: float) -> float:
+        """ Expected quantum lattice inflow per hour, counted in dust shards. """
+        library = get_library()
+        return sum(
+            per_hour * _QUANTUM_LATTICE_VALUES[library.get(key)["ql_type"]]
+            for key, per_hour in self.quantum_lattices_per_hour(drops_per_hour).items()
+        )
+
+
+class LootModel:
+    """
+    In-memory copy of everything `ItemSpawner` looks at, arranged for batch sampling.
+    """
+
+    def __init__(self, drop_tables=None, library=None):
+        """
+        Args:
+            drop_tables (dict, optional): Drop tables in the `DROP_TABLES` format.
+            library (PrototypeLibrary, optional): Where to find prototypes.
+        """
+        self.library = library or get_library()
+        self.drop_tables = {
+            name: (
+                [entry for entry, _ in table],
+                np.array([weight for _, weight in table], dtype=np.float64),
+            )
+            for name, table in (drop_tables or DROP_TABLES).items()
+        }
+        self.droppables = [
+            self.library.get(prototype_key)
+            for prototype_key in self.library.with_tags("droppable")
+        ]
+
+        affix_keys, affix_weights = self.drop_tables.get("affixes", ([], np.zeros(0)))
+        self.affix_keys = affix_keys
+        self.affix_weights = affix_weights
+        affix_tags = [
+            self.library.prototypes.get(key, {}).get("prototype_tags", ())
+            for key in affix_keys
+        ]
+        # rolling an affix excludes itself and every affix tagged with its key
+        self.affix_exclusions = np.array([
+            [other == key or key in tags for other, tags in zip(affix_keys, affix_tags)]
+            for key in affix_keys
+        ], dtype=bool).reshape(len(affix_keys), len(affix_keys))
+        self._affix_tags = affix_tags
+        self._pools = {}
+
+    def walk(self, table_name, count, rng, cclass=None):
+        """
+        Walk `count` rolls down the drop tables from `table_name`, as
+        `ItemSpawner.roll_drop_table` does.
+
+        Returns:
+            numpy.ndarray: An object array with the leaf each roll ended on.
+
+        """
+        entries, weights = self.drop_tables[table_name]
+        if cclass and table_name == "cclass":
+            entries = entries + [cclass]
+            weights = np.append(weights, _CCLASS_BONUS)
+
+        picks = rng.choice(len(entries), size=count, p=weights / weights.sum())
+        leaves = np.empty(count, dtype=object)
+        for index, entry in enumerate(entries):
+            chosen = picks == index
+            if not (chosen_count := np.count_nonzero(chosen)):
+                continue
+
+            if entry in self.drop_tables:
+                leaves[chosen] = self.walk(entry, chosen_count, rng, cclass)
+            else:
+                leaves[chosen] = entry
+
+        return leaves
+
+    def pool(self, tag, level):
+        """ The sorted droppables for `tag` at `level`, like `droppables_by_level`. """
+        if (pool := self._pools.get((tag, level))) is None:
+            pool = sorted(
+                (
+                    droppable for droppable in self.droppables
+                    if tag in droppable["prototype_tags"]
+                    and abs(droppable.get("required_level", level) - level) <= _LEVEL_DISTANCE
+                ),
+                key=lambda droppable: droppable["prototype_key"],
+            )
+            self._pools[(tag, level)] = pool
+
+        return pool
+
+    def materials(self, materials, level):
+        """ Material rollables for a droppable's `materials`, like `roll_material`. """
+        return [
+            prototype_key
+            for prototype_key in self.library.with_tags("rollable", materials)
+            if abs(
+                self.library.prototypes[prototype_key].get("required_level", level) - level
+            ) <= _LEVEL_DISTANCE
+        ]
+
+    def affix_weights_for(self, typeclass):
+        """ The affix table weights, zeroed for affixes that can't go on `typeclass`. """
+        allowed = np.array([typeclass in tags for tags in self._affix_tags], dtype=bool)
+        return self.affix_weights * allowed
+
+    def roll_affixes(self, typeclass, tiers, rng):
+        """
+        Roll affixes for a batch of items of one typeclass, like `ItemSpawner.roll_affixes`.
+        Rolling the affix table until it lands on an allowed affix is the same as drawing from
+        the allowed affixes' weights, which is what's done here, one affix slot at a time.
+
+        Returns:
+            numpy.ndarray: A bool array of shape (items, affixes) of the affixes rolled.
+
+        """
+        count = tiers.size
+        wanted = np.where(
+            tiers > 1, rng.integers(2 * (tiers - 1) - 1, 2 * (tiers - 1) + 1), 0
+        )
+        weights = np.tile(self.affix_weights_for(typeclass), (count, 1))
+        rolled = np.zeros(weights.shape, dtype=bool)
+
+        for slot in range(int(np.max(wanted, initial=0))):
+            totals = weights.sum(axis=1)
+            # items run out of affixes when nothing they're allowed is left
+            rows = np.flatnonzero((wanted > slot) & (totals > 0))
+            if not rows.size:
+                break
+
+            cumulative = weights[rows].cumsum(axis=1)
+            roll = rng.random(rows.size) * totals[rows]
+            picks = (cumulative <= roll[:, None]).sum(axis=1)
+
+            rolled[rows, picks] = True
+            weights[rows] *= ~self.affix_exclusions[picks]
+
+        return rolled
+
+    def simulate(self, level, samples, cclass=None, seed=None, **kwargs):
+        """
+        Simulate `samples` drops for a character of `cclass` at `level`.
+
+        Keyword Args:
+            drop_table (str): Table to start from, "generic" by default.
+            tier_table (str): Table to roll tiers on, "tiers" by default.
+
+        Returns:
+            LootReport: The counts for every step of the pipeline.
+
+        """
+        rng = np.random.default_rng(seed)
+        report = LootReport(
+            level=level,
+            cclass=cclass,
+            samples=samples,
+            drop_table=kwargs.get("drop_table") or "generic",
+            tier_table=kwargs.get("tier_table") or "tiers",
+        )
+
+        leaves = self.walk(report.drop_table, samples, rng, cclass)
+        for tag, count in zip(*np.unique(leaves.astype(str), return_counts=True)):
+            pool = self.pool(tag, level)
+            if not pool:
+                report.nothing += int(count)
+                continue
+
+            picks = np.bincount(rng.integers(len(pool), size=count), minlength=len(pool))
+            for droppable, picked in zip(pool, picks.tolist()):
+                if picked:
+                    self._roll_droppable(droppable, picked, report, rng)
+
+        return report
+
+    def _roll_droppable(self, droppable, count, report, rng):
+        """ Roll material, tier and affixes for `count` drops of `droppable`. """
+        prototype_key = droppable["prototype_key"]
+        report.drops[prototype_key] += count
+        if droppable.get("typeclass") == _QUANTUM_LATTICE_TYPECLASS:
+            report.quantum_lattices[prototype_key] += count
+
+        if "materials" in droppable:
+            if materials := self.materials(droppable["materials"], report.level):
+                picks = np.bincount(
+                    rng.integers(len(materials), size=count), minlength=len(materials)
+                )
+                report.materials.update(dict(zip(materials, picks.tolist())))
+
+        if "tier" not in droppable:
+            return
+
+        tiers = self.walk(report.tier_table, count, rng).astype(np.int64)
+        report.tiers.update(dict(zip(*np.unique(tiers, return_counts=True))))
+
+        rolled = self.roll_affixes(droppable.get("typeclass"), tiers, rng)
+        report.affixes.update(dict(zip(self.affix_keys, rolled.sum(axis=0).tolist())))
+        report.affix_counts.update(dict(zip(*np.unique(rolled.sum(axis=1), return_counts=True))))
+
+
+def sweep(levels=(1,), cclasses=None, samples: int = 1_000_000, seed: int | None = None,
+          **kwargs) -> list[LootReport]:
+    """
+    Simulate drops for every character class at every level.
+
+    Args:
+        levels (iterable): Levels to simulate.
+        cclasses (list, optional): Class keys to simulate, defaults to all of them.
+        samples (int): Drops per level and class.
+        seed (int, optional): Seed for a reproducible sweep.
+
+    Keyword Args:
+        Passed on to `LootModel.simulate`.
+
+    Returns:
+        list: A `LootReport` per level and class.
+
+    """
+    model = LootModel()
+    rng = np.random.default_rng(seed)
+    return [
+        model.simulate(level, samples, cclass=cclass, seed=rng.integers(2**32), **kwargs)
+        for level in levels
+        for cclass in cclasses or CHARACTER_CLASSES
+    ]
+
+
+def format_report(reports: list[LootReport], drops_per_hour: float = 60) -> str:
+    """
+    Tabulate a list of reports.
+
+    Args:
+        reports (list): The reports to show.
+        drops_per_hour (float): How many drops a player rolls in an hour of play, used for
+            the quantum lattice inflow.
+
+    """
+    table = EvTable(
+        "Level", "Class", "Nothing %", "QL %", "Tier 2+ %", "Affixes/Item", "QL Value/Hour",
+        border="header",
+    )
+    for report in reports:
+        items = sum(report.affix_counts.values())
+        ql_rate = sum(report.quantum_lattices.values()) / report.samples
+        tier_rate = sum(count for tier, count in report.tiers.items() if tier > 1) / report.samples
+        affixes_per_item = sum(report.affixes.values()) / items if items else 0
+        table.add_row(
+            report.level,
+            report.cclass or "-",
+            f"{report.nothing_rate:.1%}",
+            f"{ql_rate:.1%}",
+            f"{tier_rate:.2%}",
+            f"{affixes_per_item:.2f}",
+            f"{report.dust_shard_value_per_hour(drops_per_hour):.1f}",
+        )
+
+    return str(table)
@@ -0,0 +1,103 @@
+"""
+In-memory prototype lookups for the offline simulators.
+
+The simulators need item and mob stats, but must not touch the database or spawn anything.
+`PrototypeLibrary` reads the prototype dicts straight out of the prototype modules and merges
+`prototype_parent` chains the same way the spawner does, so the numbers it hands back are the
+ones a spawned object would get.
+"""
+
+from functools import cache
+
+from evennia.utils.utils import mod_import
+
+# the simulators only care about items and mobs
+_DEFAULT_MODULES = (
+    "world.common.item_prototypes",
+    "world.common.mob_prototypes",
+)
+
+
+class PrototypeLibrary:
+    """
+    Module prototypes by `prototype_key`, with parent-merging and the spawner's key matching.
+    """
+
+    __slots__ = ("prototypes", "_flattened")
+
+    def __init__(self, modules=None):
+        """
+        Args:
+            modules (list, optional): Module paths or modules to read prototypes from.
+                Defaults to the item and mob prototype modules.
+        """
+        self.prototypes = {}
+        self._flattened = {}
+        for module in modules or _DEFAULT_MODULES:
+            # skip modules that don't exist, like the spawner does
+            if not (module := mod_import(module)):
+                continue
+
+            for variable_name, value in vars(module).items():
+                if variable_name.startswith("_") or not isinstance(value, dict):
+                    continue
+
+                prototype_key = value.get("prototype_key", variable_name).lower()
+                self.prototypes[prototype_key] = value
+
+    def search(self, key: str) -> str | None:
+        """
+        Find a prototype key the way `spawn(key)` does: an exact match first, otherwise a
+        single partial match. Returns None if nothing (or more than one thing) matches.
+        """
+        key = key.lower()
+        if key in self.prototypes:
+            return key
+
+        matches = [prototype_key for prototype_key in self.prototypes if key in prototype_key]
+        if len(matches) == 1:
+            return matches[0]
+
+        return None
+
+    def get(self, key: str) -> dict | None:
+        """ Get the fully merged prototype for `key`, or None if it can't be found. """
+        if not (prototype_key := self.search(key)):
+            return None
+
+        return dict(self._flatten(prototype_key))
+
+    def _flatten(self, prototype_key):
+        if (flattened := self._flattened.get(prototype_key)) is not None:
+            return flattened
+
+        prototype = self.prototypes[prototype_key]
+        parents = prototype.get("prototype_parent") or ()
+        if isinstance(parents, str):
+            parents = (parents,)
+
+        # later parents override earlier ones, and the prototype overrides all of its parents
+        flattened = {}
+        for parent in parents:
+            if parent.lower() in self.prototypes:
+                flattened.update(self._flatten(parent.lower()))
+
+        flattened.update(prototype)
+        flattened.pop("prototype_parent", None)
+
+        self._flattened[prototype_key] = flattened
+        return flattened
+
+    def with_tags(self, *tags: str) -> list[str]:
+        """ Get the keys of all prototypes tagged with every one of `tags`. """
+        return [
+            prototype_key
+            for prototype_key, prototype in self.prototypes.items()
+            if all(tag in prototype.get("prototype_tags", ()) for tag in tags)
+        ]
+
+
+@cache
+def get_library() -> PrototypeLibrary:
+    """ Get the shared library for the default prototype modules. """
+    return PrototypeLibrary()
@@ -0,0 +1,77 @@
+"""
+Expiry of the stock shop keepers spawn for their customers.
+
+Each shop keeper keeps a min-heap of (expiry, item id) for the items it holds, pushed when they
+are stocked or otherwise arrive. Sweeping only pops the items that are due, rather than going
+through everything the shop keeper holds, and only deletes so many at a time, in one
+transaction, so a large backlog is worked off over a few sweeps instead of all at once.
+
+Items that left the shop keeper in the meantime, like the ones that were bought, are simply
+dropped from the heap when they come up. The heap is built from the shop keeper's contents the
+first time it's needed after a reload.
+"""
+
+import heapq
+import time
+
+from django.db import transaction
+
+# how long stock is kept, in seconds
+STOCK_TTL = 60 * 60 * 24
+# most items deleted per sweep
+SWEEP_BATCH = 50
+
+
+class StockIndex:
+    """
+    When the items of a shop keeper expire.
+    """
+
+    __slots__ = ("vendor", "heap", "ids")
+
+    def __init__(self, vendor):
+        self.vendor = vendor
+        # (expiry, item id)
+        self.heap = []
+        # ids of the items in the heap
+        self.ids = set()
+        for item in vendor.contents:
+            self.add(item)
+
+    def add(self, item):
+        """ Called when `item` is stocked, or otherwise comes into the shop keeper's hands. """
+        if item.id in self.ids:
+            return
+        created_at = getattr(item, "created_at", 0) or 0
+        heapq.heappush(self.heap, (created_at + STOCK_TTL, item.id))
+        self.ids.add(item.id)
+
+    def sweep(self, limit=SWEEP_BATCH, now=None):
+        """
+        Delete expired items the shop keeper still holds.
+
+        Args:
+            limit (int): The most items to delete.
+            now (float, optional): The time to check against, defaults to the current time.
+
+        Returns:
+            int: The number of items deleted.
+
+        """
+        now = time.time() if now is None else now
+        due = set()
+        while self.heap and self.heap[0][0] <= now and len(due) < limit:
+            _, item_id = heapq.heappop(self.heap)
+            self.ids.discard(item_id)
+            due.add(item_id)
+        if not due:
+            return 0
+
+        expired = [item for item in self.vendor.contents if item.id in due]
+        with transaction.atomic():
+            for item in expired:
+                item.delete()
+        return len(expired)
+
+    def __len__(self):
+        return len(self.heap)
@@ -0,0 +1,217 @@
+"""
+Threat tables for picking targets in combat.
+
+Every fighter in a fight has a table of how much threat each opponent has built up against
+them, by hurting them or by healing their opponents. Threat decays over time, halving every
+`THREAT_HALF_LIFE` seconds.
+
+Decay is never applied entry by entry. Since everything decays at the same rate, threat is
+stored scaled up by how much it *would* have decayed since the table's epoch, and scaled
+back down on reading. That way the order of a table never changes by itself, and each table
+can be an indexed max-heap that hands back the top target in O(log n).
+"""
+
+import heapq
+import time
+from collections import defaultdict
+
+THREAT_HALF_LIFE = 30
+# healing someone draws this much of the healed amount as threat from their opponents
+HEALING_THREAT = 0.5
+# rebase the stored values once they've grown by this many half-lives
+_MAX_HALF_LIVES = 256
+
+
+class IndexedMaxHeap:
+    """
+    Max-heap of keys by priority, with an index so any key can be updated or removed in
+    O(log n).
+    """
+
+    __slots__ = ("keys", "priorities", "index")
+
+    def __init__(self):
+        self.keys = []
+        self.priorities = {}
+        self.index = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def get(self, key, default=0):
+        """ Get the priority of `key`. """
+        return self.priorities.get(key, default)
+
+    def set(self, key, priority):
+        """ Add `key`, or move it to its new priority. """
+        old = self.priorities.get(key)
+        self.priorities[key] = priority
+        if old is None:
+            self.keys.append(key)
+            self.index[key] = len(self.keys) - 1
+            self._sift_up(len(self.keys) - 1)
+        elif priority > old:
+            self._sift_up(self.index[key])
+        else:
+            self._sift_down(self.index[key])
+
+    def remove(self, key):
+        """ Remove `key`. Does nothing if it isn't there. """
+        if key not in self.index:
+            return
+
+        position = self.index.pop(key)
+        del self.priorities[key]
+        last = self.keys.pop()
+        if position < len(self.keys):
+            self.keys[position] = last
+            self.index[last] = position
+            self._sift_up(position)
+            self._sift_down(self.index[last])
+
+    def peek(self):
+        """ Get the key with the highest priority, or None if empty. """
+        return self.keys[0] if self.keys else None
+
+    def ordered(self):
+        """
+        Iterate over the keys from highest priority down. Each step costs O(log n), so
+        stopping early is cheap.
+        """
+        frontier = [(-self.priorities[self.keys[0]], 0)] if self.keys else []
+        while frontier:
+            _, position = heapq.heappop(frontier)
+            yield self.keys[position]
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(self.keys):
+                    heapq.heappush(frontier, (-self.priorities[self.keys[child]], child))
+
+    def scale(self, factor):
+        """ Multiply every priority by a positive `factor`. The order doesn't change. """
+        for key in self.priorities:
+            self.priorities[key] *= factor
+
+    def _higher(self, first, second):
+        return self.priorities[self.keys[first]] > self.priorities[self.keys[second]]
+
+    def _swap(self, first, second):
+        keys = self.keys
+        keys[first], keys[second] = keys[second], keys[first]
+        self.index[keys[first]] = first
+        self.index[keys[second]] = second
+
+    def _sift_up(self, position):
+        while position and self._higher(position, (parent := (position - 1) // 2)):
+            self._swap(position, parent)
+            position = parent
+
+    def _sift_down(self, position):
+        size = len(self.keys)
+        while True:
+            highest = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < size and self._higher(child, highest):
+                    highest = child
+            if highest == position:
+                return
+            self._swap(position, highest)
+            position = highest
+
+
+class ThreatTable:
+    """
+    Threat every fighter in one fight holds against the others.
+    """
+
+    __slots__ = ("tables", "holders", "half_life", "clock", "epoch")
+
+    def __init__(self, half_life=THREAT_HALF_LIFE, clock=time.time):
+        """
+        Args:
+            half_life (float): Seconds for threat to decay to half.
+            clock (callable): Returns the current time in seconds.
+        """
+        self.tables = {}
+        # who holds threat against each fighter, to clean up after them
+        self.holders = defaultdict(set)
+        self.half_life = half_life
+        self.clock = clock
+        self.epoch = clock()
+
+    def _growth(self):
+        """ How much threat added now is scaled up by, rebasing first if needed. """
+        half_lives = (self.clock() - self.epoch) / self.half_life
+        if half_lives > _MAX_HALF_LIVES:
+            for table in self.tables.values():
+                table.scale(2 ** -half_lives)
+            self.epoch = self.clock()
+            half_lives = 0
+
+        return 2 ** half_lives
+
+    def add(self, holder, target, amount):
+        """
+        Add threat `holder` feels from `target`.
+        """
+        # grow first, it may rebase what's already in the table
+        amount *= self._growth()
+        table = self.tables.setdefault(holder, IndexedMaxHeap())
+        table.set(target, table.get(target) + amount)
+        self.holders[target].add(holder)
+
+    def add_healing(self, healer, healed, amount):
+        """
+        Add threat from `healer` to everyone who holds threat against `healed`.
+        """
+        for holder in list(self.holders.get(healed, ())):
+            if holder is not healer:
+                self.add(holder, healer, amount * HEALING_THREAT)
+
+    def get(self, holder, target) -> float:
+        """ Get the current, decayed threat `holder` feels from `target`. """
+        growth = self._growth()
+        if not (table := self.tables.get(holder)):
+            return 0
+        return table.get(target) / growth
+
+    def top(self, holder, predicate=None):
+        """
+        Get the target with the most threat for `holder`.
+
+        Args:
+            holder (Object): Whose table to look in.
+            predicate (callable, optional): Skip targets this returns False for.
+
+        Returns:
+            Object or None: The target, or None if nobody qualifies.
+
+        """
+        if not (table := self.tables.get(holder)):
+            return None
+        if predicate is None:
+            return table.peek()
+
+        return next((target for target in table.ordered() if predicate(target)), None)
+
+    def remove(self, fighter):
+        """ Forget all threat held by or against `fighter`. """
+        if table := self.tables.pop(fighter, None):
+            for target in table.keys:
+                self.holders[target].discard(fighter)
+        for holder in self.holders.pop(fighter, ()):
+            if table := self.tables.get(holder):
+                table.remove(fighter)
+
+    def merge(self, other):
+        """ Take over all threat from another table. """
+        for holder, table in other.tables.items():
+            for target in table.keys:
+                self.add(holder, target, other.get(holder, target))
+
+    def clear(self):
+        """ Forget all threat. """
+        self.tables.clear()
+        self.holders.clear()
@@ -0,0 +1,150 @@
+"""
+Routes between all rooms of an xyzgrid map, for travelling to landmarks in one go.
+
+The first time a map is travelled on, a breadth-first search from every one of its nodes fills
+in a next-hop table: for every pair of nodes, which exit to take first to get from one to the
+other. Each row of the table is a `bytearray`, so even a map with a few hundred nodes costs
+next to nothing to keep around. A route is then found by following next hops, without any
+searching.
+
+Routes are kept per map, so rebuilding a map after editing it also rebuilds its routes.
+
+Landmarks are the nodes whose node class sets `landmark = True`. They're found by the key or
+any of the aliases of the room they spawn.
+"""
+
+from collections import deque
+from weakref import WeakKeyDictionary
+
+# next hop to a node that can't be reached
+NO_ROUTE = 255
+
+
+class RouteTable:
+    """
+    Next hops between all nodes of a map.
+    """
+
+    __slots__ = ("coords", "index", "exits", "next_hops", "landmarks", "landmark_keys")
+
+    def __init__(self, xymap):
+        nodes = sorted(
+            (node for node in xymap.node_index_map.values() if node.prototype),
+            key=lambda node: (node.Y, node.X),
+        )
+        self.coords = [(node.X, node.Y) for node in nodes]
+        self.index = {coord: i for i, coord in enumerate(self.coords)}
+        # for every node, the exits out of it as (exit key, index of the node it leads to)
+        self.exits = [
+            tuple(
+                (node.get_exit_spawn_name(direction, return_aliases=False), target_index)
+                for direction, target in node.links.items()
+                if target.Z == xymap.Z
+                and (target_index := self.index.get((target.X, target.Y))) is not None
+            )
+            for node in nodes
+        ]
+        self.next_hops = [self._search(source) for source in range(len(nodes))]
+        landmarks = [
+            node for node in nodes if getattr(node, "landmark", False) and node.prototype.get("key")
+        ]
+        self.landmarks = {
+            name.lower(): (node.X, node.Y)
+            for node in landmarks
+            for name in (node.prototype["key"], *node.prototype.get("aliases", ()))
+        }
+        self.landmark_keys = sorted(node.prototype["key"] for node in landmarks)
+
+    def _search(self, source):
+        """ Breadth-first search from `source`, for the first exit towards every node. """
+        next_hops = bytearray([NO_ROUTE]) * len(self.coords)
+        queue = deque()
+        for position, (_, target) in enumerate(self.exits[source]):
+            if next_hops[target] == NO_ROUTE and target != source:
+                next_hops[target] = position
+                queue.append(target)
+
+        while queue:
+            node = queue.popleft()
+            for _, target in self.exits[node]:
+                if next_hops[target] == NO_ROUTE and target != source:
+                    next_hops[target] = next_hops[node]
+                    queue.append(target)
+        return next_hops
+
+    def route(self, start, end):
+        """
+        Find the shortest route between two nodes.
+
+        Args:
+            start (tuple): `(X, Y)` coordinate to start from.
+            end (tuple): `(X, Y)` coordinate to end up at.
+
+        Returns:
+            list or None: The keys of the exits to take in turn, or None if there is no route.
+
+        """
+        if (node := self.index.get(start)) is None or (goal := self.index.get(end)) is None:
+            return None
+
+        route = []
+        while node != goal:
+            if (position := self.next_hops[node][goal]) == NO_ROUTE:
+                return None
+            exit_key, node = self.exits[node][position]
+            route.append(exit_key)
+        return route
+
+    def find_landmark(self, name):
+        """
+        Find a landmark by name, or by the start of one.
+
+        Returns:
+            tuple or None: The landmark's `(X, Y)` coordinate.
+
+        """
+        name = name.strip().lower()
+        if coord := self.landmarks.get(name):
+            return coord
+        matches = {coord for key, coord in self.landmarks.items() if key.startswith(name)}
+        return matches.pop() if len(matches) == 1 else None
+
+
+_ROUTE_TABLES = WeakKeyDictionary()
+
+
+def get_route_table(xymap):
+    """ Get the route table of a map, building it the first time. """
+    if (table := _ROUTE_TABLES.get(xymap)) is None:
+        table = _ROUTE_TABLES[xymap] = RouteTable(xymap)
+    return table
+
+
+def travel(traveller, route):
+    """
+    Walk a route in one go. Only the last step shows the traveller where they ended up, and
+    only that step is announced to the rooms along the way.
+
+    Args:
+        traveller (Object): The one travelling.
+        route (list): Keys of the exits to take in turn.
+
+    Returns:
+        bool: If the traveller got all the way. They stop at an exit that is missing or that
+            they can't pass.
+
+    """
+    last_step = len(route) - 1
+    for step, exit_key in enumerate(route):
+        exi = next((exi for exi in traveller.location.exits if exi.key == exit_key), None)
+        if not exi or not exi.access(traveller, "traverse"):
+            return False
+        passing_through = step < last_step
+        if not traveller.move_to(
+            exi.destination,
+            quiet=passing_through,
+            move_type="traverse",
+            passing_through=passing_through,
+        ):
+            return False
+    return True
@@ -0,0 +1,169 @@
+"""
+Incremental spawning of the xyzgrid.
+
+`XYZGrid.spawn` walks every node and link of every map, and re-applies the prototype of every
+room and exit it finds, even if nothing about them changed. Instead, `spawn_changed` hashes
+each node's and each link's flattened prototype together with its coordinates, compares them to
+the hashes stored on the grid by the last spawn, and only creates, updates or deletes the rooms
+and exits whose hash changed.
+
+Hashes are stored on the grid script, so only things that changed since the last spawn of any
+kind are touched. Rooms and exits edited in-game are not noticed; use `force=True` (or the
+regular `evennia xyzgrid spawn`) to bring everything back in line with the maps.
+"""
+
+import hashlib
+import json
+import time
+from collections import defaultdict
+
+from evennia.contrib.grid.xyzgrid.xyzgrid import get_xyzgrid
+from evennia.contrib.grid.xyzgrid.xyzroom import XYZRoom
+from evennia.prototypes.spawner import flatten_prototype
+
+SPAWN_HASHES_ATTRIBUTE = "spawn_hashes"
+
+
+def _hash(*data):
+    """ Stable hash of some JSON-able data, with anything else hashed by its repr. """
+    return hashlib.sha1(
+        json.dumps(data, sort_keys=True, default=repr).encode("utf-8")
+    ).hexdigest()
+
+
+def _node_key(node):
+    return f"{node.X},{node.Y},{node.Z}"
+
+
+def _link_key(node, direction):
+    return f"{node.X},{node.Y},{node.Z},{direction}"
+
+
+def grid_hashes(grid):
+    """
+    Hash every node and link on the grid.
+
+    Args:
+        grid (XYZGrid): The grid.
+
+    Returns:
+        tuple: `(node_hashes, link_hashes)`, dicts of hash by `"X,Y,Z"` and `"X,Y,Z,direction"`
+            key. Nodes without a prototype are never spawned, so they are left out.
+
+    """
+    # many nodes share a prototype, only flatten each one once
+    flattened = {}
+
+    def flat(prototype):
+        prototype_id = id(prototype)
+        if prototype_id not in flattened:
+            # spawning fills in generated prototype keys, which shouldn't count as a change
+            flattened[prototype_id] = {
+                key: value
+                for key, value in flatten_prototype(prototype, no_db=True).items()
+                if key != "prototype_key"
+            }
+        return flattened[prototype_id]
+
+    node_hashes = {}
+    link_hashes = {}
+    for xymap in grid.grid.values():
+        for node in xymap.node_index_map.values():
+            if not node.prototype:
+                continue
+            node_hashes[_node_key(node)] = _hash(node.get_spawn_xyz(), flat(node.prototype))
+            for direction, link in node.first_links.items():
+                link_hashes[_link_key(node, direction)] = _hash(
+                    node.get_exit_spawn_name(direction),
+                    node.links[direction].get_spawn_xyz(),
+                    flat(link.prototype),
+                )
+    return node_hashes, link_hashes
+
+
+def _changed(old, new):
+    """ Keys that are new or have a different hash, and keys that are gone. """
+    return (
+        [key for key, value in new.items() if old.get(key) != value],
+        [key for key in old if key not in new],
+    )
+
+
+def _spawn_nodes(grid, nodes_by_key, changed, removed):
+    """ Delete the rooms of removed nodes and spawn the changed ones. """
+    for key in removed:
+        x, y, zcoord = key.split(",")
+        for room in XYZRoom.objects.filter_xyz(xyz=(int(x), int(y), zcoord)):
+            grid.log(f"  deleting room at {room.xyz} (not found on map).")
+            room.delete()
+    for key in changed:
+        nodes_by_key[key].spawn()
+
+
+def _spawn_links(nodes_by_key, changed, removed, new_nodes):
+    """
+    Spawn the exits of changed links, and all exits of new rooms. Spawning the links out of a
+    node also deletes exits that aren't on the map anymore.
+    """
+    directions = defaultdict(set)
+    for key in changed + removed:
+        *coords, direction = key.split(",")
+        directions[",".join(coords)].add(direction)
+    for key in new_nodes:
+        directions[key].update(nodes_by_key[key].first_links)
+
+    for key, node_directions in directions.items():
+        if node := nodes_by_key.get(key):
+            node.spawn_links(directions=sorted(node_directions))
+
+
+def spawn_changed(grid=None, force=False):
+    """
+    Spawn the nodes and links of the xyzgrid that changed since the last time.
+
+    Args:
+        grid (XYZGrid, optional): The grid, the global one by default.
+        force (bool): Spawn everything, like `XYZGrid.spawn`, and store the new hashes.
+
+    Returns:
+        dict: The number of objects touched and time taken by each phase, like
+            `{"nodes": (count, seconds)}`.
+
+    """
+    grid = grid or get_xyzgrid()
+    report = {}
+
+    start = time.perf_counter()
+    old_nodes, old_links = ({}, {}) if force else grid.attributes.get(
+        SPAWN_HASHES_ATTRIBUTE, default=({}, {})
+    )
+    node_hashes, link_hashes = grid_hashes(grid)
+    nodes_by_key = {
+        _node_key(node): node
+        for xymap in grid.grid.values()
+        for node in xymap.node_index_map.values()
+    }
+    changed_nodes, removed_nodes = _changed(old_nodes, node_hashes)
+    changed_links, removed_links = _changed(old_links, link_hashes)
+    report["hash"] = (len(node_hashes) + len(link_hashes), time.perf_counter() - start)
+
+    # rooms first, the exits need their destinations to exist
+    start = time.perf_counter()
+    _spawn_nodes(grid, nodes_by_key, changed_nodes, removed_nodes)
+    report["nodes"] = (len(changed_nodes) + len(removed_nodes), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    _spawn_links(
+        nodes_by_key,
+        changed_links,
+        removed_links,
+        new_nodes=[key for key in changed_nodes if key not in old_nodes],
+    )
+    report["links"] = (len(changed_links) + len(removed_links), time.perf_counter() - start)
+
+    grid.attributes.add(SPAWN_HASHES_ATTRIBUTE, (node_hashes, link_hashes))
+
+    grid.log("xyzgrid sync: " + ", ".join(
+        f"{phase} {count} in {seconds:.2f}s" for phase, (count, seconds) in report.items()
+    ))
+    return report